@@ -43,7 +43,7 @@ def update_context(series=None, year=None, team=None, player=None, opponent=None
     if opponent: st.session_state.chat_context["last_opponent"] = opponent
     if player: st.session_state.chat_context["last_player"] = player
 async def process_user_message(user_query, conversation_history=None):
-    matches_task = asyncio.create_task(get_todays_matches(use_cache=False, ttl=5))
+    matches_task = asyncio.create_task(get_todays_matches())
     analysis_task = asyncio.create_task(analyze_intent(user_query, conversation_history))
     analysis = await analysis_task
     analysis["intent"] = str(analysis.get("intent", "general")).upper()
@@ -121,12 +121,8 @@ async def process_user_message(user_query, conversation_history=None):
         return needs_clarification
     api_results = {}
     ctx_logger.info("Checking Tournament Specialist Logic...")
-    specialist_res = await handle_tournament_specialist_logic(analysis, user_query, s_name, year)
-    if specialist_res and "error" not in specialist_res:
-         ctx_logger.info(f"Specialist returned data for {s_name}")
-         api_results["specialist_analytics"] = specialist_res
-    else:
-         ctx_logger.info("No specialist data found.")
+    # Independent of the routing below: runs while the RAG pipeline queries the database
+    specialist_task = asyncio.create_task(handle_tournament_specialist_logic(analysis, user_query, s_name, year))
     if analysis.get("retrieve_chat_history") and conversation_history:
         api_results["personal_conversation_history"] = conversation_history
     # --- YEAR EXTRACTION & ROUTING LOGIC (CASE A, B, C) ---
@@ -194,6 +190,12 @@ async def process_user_message(user_query, conversation_history=None):
     if is_pure_database or is_mixed or (no_year_detected and intent != "GENERAL"):
          ctx_logger.info("📡 Executing RAG Pipeline for Database context...")
          rag_result = await execute_rag_pipeline(user_query, analysis)
+    specialist_res = await specialist_task
+    if specialist_res and "error" not in specialist_res:
+         ctx_logger.info(f"Specialist returned data for {s_name}")
+         api_results["specialist_analytics"] = specialist_res
+    else:
+         ctx_logger.info("No specialist data found.")
     
     # Configure Internal Knowledge permission based on routing
     if is_pure_historical or is_mixed or no_year_detected:
@@ -617,6 +619,8 @@ async def process_user_message(user_query, conversation_history=None):
             m for m in m_data.get("data", [])
             if m.get("date") == today_iso or any(s in str(m.get("status", "")).lower() for s in active_statuses)
         ]
+        if m_data.get("as_of"):
+            api_results["today_data_as_of"] = m_data["as_of"]
         if not api_results.get("live_matches") and not api_results.get("generic_today_data"):
              api_results["upcoming_broad_schedule"] = m_data.get("data", [])[:10]
         
@@ -14,6 +14,8 @@ from src.agents.prompts import (
 _TODAY_OBJ = datetime.strptime(TODAY, "%Y-%m-%d").date()
 
 logger = get_logger("ai_core", "router.log")
+# "India: 145/3 (16.2)" segments of a live score_string (fallback when there is no live_state)
+_INNINGS_SCORE = re.compile(r"([^|:]+?):\s*(\d+)/(\d+)\s*\((\d+\.?\d*)\)")
 
 async def cricket_api(**kwargs):
     """Internal proxy to backend tools"""
@@ -63,18 +65,19 @@ async def predict_live_match(match_data):
     status = str(match_data.get("status", "")).lower()
     note = match_data.get("note", "")
     
+    # A team's first innings, as the per-team score_string search always used (Tests bat twice)
+    innings = {}
+    live_state = match_data.get("live_state") or {}
+    for inn in live_state.get("innings") or []:
+        try:
+            innings.setdefault(inn["team"], {"runs": int(inn.get("runs") or 0), "wickets": int(inn.get("wickets") or 0), "overs": float(inn.get("overs") or 0)})
+        except (TypeError, ValueError):
+            continue
+    if not innings:
+        for name, r, w, o in _INNINGS_SCORE.findall(match_data.get("score_string", "")):
+            innings.setdefault(name.strip(), {"runs": int(r), "wickets": int(w), "overs": float(o)})
     def get_inn_data(m_data, team_name):
-        runs_list = m_data.get("runs") or []
-        score_str = m_data.get("score_string", "")
-        pattern = re.compile(rf"{re.escape(team_name)}:\s*(\d+)/(\d+)\s*\((\d+\.?\d*)\)")
-        match = pattern.search(score_str)
-        if match:
-            return {
-                "runs": int(match.group(1)),
-                "wickets": int(match.group(2)),
-                "overs": float(match.group(3))
-            }
-        return None
+        return innings.get(team_name)
 
     is_chasing = False
     chasing_team = None
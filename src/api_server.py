@@ -5,37 +5,103 @@ import json
 import sys
 import os
 from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from dotenv import load_dotenv
 load_dotenv(override=True)
 from src.environment.history_service import sync_recent_finished_matches
+from src.environment.live_poller import live_poller
+from src.environment.live_state import match_view
 from src.utils.utils_core import get_logger
 logger = get_logger("api_server", "API_SERVER.log")
 PORT = 8000
+HEARTBEAT_SECONDS = 15
 class SyncHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, indent=2, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def _live_snapshot(self, match_id=None):
+        matches = asyncio.run(live_poller.current())
+        matches = [match_view({k: v for k, v in m.items() if k != "raw_data"}) for m in matches]
+        if match_id:
+            matches = [m for m in matches if str(m.get("id")) == str(match_id)]
+        return matches
+    def _sse(self, event, data, event_id=None):
+        msg = ""
+        if event_id is not None: msg += f"id: {event_id}\n"
+        msg += f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        self.wfile.write(msg.encode('utf-8'))
+        self.wfile.flush()
+    def _stream_live(self, match_id=None):
+        """
+        Server-Sent Events: a "snapshot" of the live matches, then "started"/"update"/"ended"
+        events from the shared live poller as they happen, with a comment heartbeat every
+        HEARTBEAT_SECONDS so proxies keep the connection open.
+        """
+        sub = live_poller.subscribe(match_id)
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.close_connection = True
+        logger.info(f"Live stream opened (match={match_id or 'all'})")
+        try:
+            self._sse("snapshot", {"matches": self._live_snapshot(match_id), **live_poller.get_stats()})
+            while True:
+                event = sub.get(timeout=HEARTBEAT_SECONDS)
+                if event is None:
+                    self.wfile.write(b": heartbeat\n\n")
+                    self.wfile.flush()
+                    continue
+                self._sse(event["type"], {**event, "match": match_view(event["match"])}, event_id=event.get("version"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            logger.error(f"Live stream error: {e}")
+        finally:
+            sub.close()
+            logger.info(f"Live stream closed (match={match_id or 'all'}, dropped={sub.dropped})")
     def do_GET(self):
-        if self.path.startswith('/sync-finished'):
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        match_id = (query.get("match_id") or [None])[0]
+        if url.path == '/live/stream':
+            self._stream_live(match_id)
+        elif url.path == '/live':
+            try:
+                self._send_json(200, {"matches": self._live_snapshot(match_id), **live_poller.get_stats()})
+            except Exception as e:
+                logger.error(f"Live snapshot error: {e}")
+                self._send_json(503, {"status": "error", "message": str(e)})
+        elif self.path.startswith('/sync-finished'):
             logger.info("Received Sync Request")
             try:
                 result = asyncio.run(sync_recent_finished_matches(days_back=2))
-                response = json.dumps(result, indent=2).encode('utf-8')
-                self.wfile.write(response)
+                self._send_json(200, result)
             except Exception as e:
                 logger.error(f"Sync Error: {e}")
-                err_resp = json.dumps({"status": "error", "message": str(e)}).encode('utf-8')
-                self.wfile.write(err_resp)
+                self._send_json(200, {"status": "error", "message": str(e)})
         else:
+            body = b'Not Found. Use /sync-finished, /live or /live/stream'
             self.send_response(404)
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(b'Not Found. Use /sync-finished')
+            self.wfile.write(body)
 def run_server():
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("", PORT), SyncHandler) as httpd:
+    # Threaded: each SSE client holds its connection open
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    with socketserver.ThreadingTCPServer(("", PORT), SyncHandler) as httpd:
         print(f"Serving API at http://localhost:{PORT}")
         print(f"Endpoint: GET http://localhost:{PORT}/sync-finished")
+        print(f"Endpoint: GET http://localhost:{PORT}/live/stream[?match_id=ID] (Server-Sent Events)")
         logger.info(f"Server started on port {PORT}")
         try:
             httpd.serve_forever()
@@ -65,47 +65,35 @@ async def get_player_recent_performance(player_name, series_id=None):
         "player": formal_name,
         "recent_matches": recent_stats
     }
+def _season_champion_from_db(series_name, year):
+    from psycopg2.extras import RealDictCursor
+    from src.core.db_pool import db_pool
+    with db_pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        # Query season_champions table
+        cur.execute("""
+            SELECT 
+                wt.name as winner_team,
+                rt.name as runner_up_team,
+                s.name as season_name,
+                s.year
+            FROM season_champions sc
+            JOIN teams wt ON sc.winner_team_id = wt.id
+            LEFT JOIN teams rt ON sc.runner_up_team_id = rt.id
+            JOIN seasons s ON sc.season_id = s.id
+            JOIN leagues l ON s.league_id = l.id
+            WHERE (l.name ILIKE %s OR l.code ILIKE %s)
+              AND s.year = %s
+            LIMIT 1
+        """, (f'%{series_name}%', f'%{series_name}%', str(year)))
+        return cur.fetchone()
 async def handle_tournament_specialist_logic(analysis, user_query, series_name=None, year=None):
     if not series_name: return None
     
     # PRIORITY 1: Check DATABASE for season champion data
     if year:
         try:
-            import psycopg2
-            from psycopg2.extras import RealDictCursor
-            
-            DB_CONFIG = {
-                "dbname": "cricket_db",
-                "user": "postgres",
-                "password": "1234",
-                "host": "localhost",
-                "port": "5432"
-            }
-            
-            conn = psycopg2.connect(**DB_CONFIG)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Query season_champions table
-            cur.execute("""
-                SELECT 
-                    wt.name as winner_team,
-                    rt.name as runner_up_team,
-                    s.name as season_name,
-                    s.year
-                FROM season_champions sc
-                JOIN teams wt ON sc.winner_team_id = wt.id
-                LEFT JOIN teams rt ON sc.runner_up_team_id = rt.id
-                JOIN seasons s ON sc.season_id = s.id
-                JOIN leagues l ON s.league_id = l.id
-                WHERE (l.name ILIKE %s OR l.code ILIKE %s)
-                  AND s.year = %s
-                LIMIT 1
-            """, (f'%{series_name}%', f'%{series_name}%', str(year)))
-            
-            champion = cur.fetchone()
-            cur.close()
-            conn.close()
-            
+            from src.core.db_pool import run_db
+            champion = await run_db(_season_champion_from_db, series_name, year)
             if champion:
                 logger.info(f"✅ Found champion in DATABASE: {champion['winner_team']} (IPL {year})")
                 return {
@@ -1,7 +1,8 @@
 import asyncio
 from datetime import datetime, timedelta
 from src.utils.utils_core import get_logger
-from src.environment.backend_core import sportmonks_cric, _normalize_sportmonks_to_app_format
+from src.environment.backend_core import _normalize_sportmonks_to_app_format
+from src.environment.fixture_tiles import get_fixtures_between
 logger = get_logger("ipl_svc", "IPL.log")
 async def get_todays_matches_full(use_cache=True):
     """
@@ -11,11 +12,7 @@ async def get_todays_matches_full(use_cache=True):
     today_str = datetime.now().strftime("%Y-%m-%d")
     includes = "localteam,visitorteam,runs,venue"
     logger.info(f"Fetching Today's Full Schedule: {today_str}")
-    res = await sportmonks_cric("/fixtures", {
-        "filter[starts_between]": f"{today_str},{today_str}",
-        "include": includes,
-        "sort": "starting_at"
-    }, use_cache=use_cache, ttl=120)
+    res = await get_fixtures_between(today_str, today_str, includes, sort="starting_at", use_cache=use_cache)
     matches = []
     seen_ids = set()
     if res.get("ok"):
@@ -26,10 +23,7 @@ async def get_todays_matches_full(use_cache=True):
     try:
         past_date = (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d")
         yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        res_ongoing = await sportmonks_cric("/fixtures", {
-            "filter[starts_between]": f"{past_date},{yesterday}",
-            "include": includes,
-        }, use_cache=use_cache, ttl=300)
+        res_ongoing = await get_fixtures_between(past_date, yesterday, includes, use_cache=use_cache)
         if res_ongoing.get("ok"):
             raw_ongoing = res_ongoing.get("data", [])
             for m in raw_ongoing:
@@ -55,10 +49,7 @@ async def get_matches_by_date(target_date, team_name=None, use_cache=True):
     """
     logger.info(f"Fetching Matches for Date: {target_date} (Team: {team_name})")
     includes = "localteam,visitorteam,runs,venue,manofmatch,batting.batsman,bowling.bowler"
-    res = await sportmonks_cric("/fixtures", {
-        "filter[starts_between]": f"{target_date},{target_date}",
-        "include": includes
-    }, use_cache=use_cache, ttl=600 if target_date != datetime.now().strftime("%Y-%m-%d") else 120)
+    res = await get_fixtures_between(target_date, target_date, includes, use_cache=use_cache)
     raw_matches = res.get("data", []) if res.get("ok") else []
     if not raw_matches:
         logger.info(f"No matches found on {target_date}, expanding search window +/- 1 day...")
@@ -66,10 +57,7 @@ async def get_matches_by_date(target_date, team_name=None, use_cache=True):
             dt_obj = datetime.strptime(target_date, "%Y-%m-%d")
             start = (dt_obj - timedelta(days=1)).strftime("%Y-%m-%d")
             end = (dt_obj + timedelta(days=1)).strftime("%Y-%m-%d")
-            res_expanded = await sportmonks_cric("/fixtures", {
-                "filter[starts_between]": f"{start},{end}",
-                "include": includes
-            })
+            res_expanded = await get_fixtures_between(start, end, includes)
             if res_expanded.get("ok"):
                 raw_matches = res_expanded.get("data", [])
         except Exception as e:
@@ -97,11 +85,7 @@ async def get_recent_matches(days=3):
     start_date = (today - timedelta(days=days)).strftime("%Y-%m-%d")
     end_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")
     logger.info(f"Fetching Recent Matches: {start_date} to {end_date}")
-    res = await sportmonks_cric("/fixtures", {
-        "filter[starts_between]": f"{start_date},{end_date}",
-        "include": "localteam,visitorteam,runs,venue",
-        "sort": "-starting_at"
-    })
+    res = await get_fixtures_between(start_date, end_date, "localteam,visitorteam,runs,venue", sort="-starting_at")
     matches = []
     if res.get("ok"):
         data = res.get("data", [])
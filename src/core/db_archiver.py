@@ -4,6 +4,7 @@ import os
 import asyncio
 from src.environment.backend_core import sportmonks_cric, getMatchScorecard
 from src.utils.utils_core import get_logger
+from src.utils.rate_limiter import PRIORITY_BACKGROUND
 logger = get_logger("db_archiver", "archiver.log")
 DB_PATH = os.path.join("data", "full_raw_history.db")
 _ARCHIVED_CACHE = set()
@@ -36,7 +37,7 @@ async def archive_match(match_id):
         return
     logger.info(f"Archiving Finished Match: {match_id}")
     includes = "localteam,visitorteam,venue,runs,scoreboards,batting.batsman,bowling.bowler,manofmatch"
-    res = await sportmonks_cric(f"/fixtures/{match_id}", params={"include": includes})
+    res = await sportmonks_cric(f"/fixtures/{match_id}", params={"include": includes}, priority=PRIORITY_BACKGROUND)
     if not res.get("ok"):
         logger.error(f"Failed to fetch match {match_id} for archiving: {res.get('error')}")
         return
@@ -0,0 +1,91 @@
+import os
+import sys
+import sqlite3
+from src.utils.utils_core import get_logger
+from src.core.db_pool import db_pool
+from src.core.schema_state import MIGRATIONS_DDL, SQLITE_MIGRATIONS_DDL, schema_state
+from src.core.player_innings import migrate_innings
+from src.core.fixture_columns import migrate_fixture_columns
+from src.core.fuzzy_lookup import migrate_fuzzy, migrate_sqlite_fts
+from src.core.probability_engine import migrate_archive_indexes
+logger = get_logger("db_migrations", "db_migrations.log")
+# One-off schema migrations for the read-model tables/columns; run by an operator, never per request:
+#   python -m src.core.db_migrations [name ...]
+# Every step is idempotent. It runs on an autocommit connection without a statement timeout, builds
+# indexes CONCURRENTLY and backfills in short id-window transactions. A short lock_timeout means DDL
+# gives up instead of queueing behind (and blocking) live queries. Read paths switch over once a step
+# is recorded in schema_migrations.
+# ARCHIVE_MIGRATIONS run against the SQLite archive and are recorded in its own schema_migrations table.
+MIGRATIONS = {
+    "innings": migrate_innings,
+    "fixture_columns": migrate_fixture_columns,
+    "fuzzy": migrate_fuzzy
+}
+ARCHIVE_MIGRATIONS = {
+    "archive_indexes": migrate_archive_indexes,
+    "archive_fts": migrate_sqlite_fts
+}
+ARCHIVE_DB_PATH = os.path.join("data", "full_raw_history.db")
+LOCK_TIMEOUT = "5s"
+def run_migrations(names=None):
+    """Runs the named migrations (default: all, in order). Returns {name: "ok" | error message}."""
+    results = {}
+    with db_pool.connection(statement_timeout_ms=0) as conn:
+        conn.raw.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET lock_timeout = %s", (LOCK_TIMEOUT,))
+                cur.execute(MIGRATIONS_DDL)
+            for name in names or MIGRATIONS:
+                logger.info(f"Migration {name}: starting")
+                try:
+                    MIGRATIONS[name](conn)
+                    results[name] = "ok"
+                    logger.info(f"Migration {name}: done")
+                except Exception as e:
+                    results[name] = str(e)
+                    logger.error(f"Migration {name} failed: {e}")
+        finally:
+            conn.raw.autocommit = False
+            with conn.cursor() as cur:
+                cur.execute("RESET lock_timeout")
+            conn.commit()
+    schema_state(refresh=True)
+    return results
+def run_archive_migrations(names=None, path=ARCHIVE_DB_PATH):
+    """Runs the named SQLite archive migrations (default: all). Returns {name: "ok" | "skipped: ..." | error message}."""
+    names = names or list(ARCHIVE_MIGRATIONS)
+    if not os.path.exists(path):
+        return {name: f"skipped: no archive at {path}" for name in names}
+    results = {}
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(SQLITE_MIGRATIONS_DDL)
+        for name in names:
+            logger.info(f"Archive migration {name}: starting")
+            try:
+                ARCHIVE_MIGRATIONS[name](conn)
+                results[name] = "ok"
+                logger.info(f"Archive migration {name}: done")
+            except Exception as e:
+                conn.rollback()
+                results[name] = str(e)
+                logger.error(f"Archive migration {name} failed: {e}")
+    finally:
+        conn.close()
+    return results
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    unknown = [n for n in names if n not in MIGRATIONS and n not in ARCHIVE_MIGRATIONS]
+    if unknown:
+        sys.exit(f"Unknown migrations {unknown}; available: {', '.join([*MIGRATIONS, *ARCHIVE_MIGRATIONS])}")
+    postgres = [n for n in names if n in MIGRATIONS]
+    archive = [n for n in names if n in ARCHIVE_MIGRATIONS]
+    results = {}
+    if postgres or not names:
+        results.update(run_migrations(postgres))
+    if archive or not names:
+        results.update(run_archive_migrations(archive))
+    for name, result in results.items():
+        print(f"{name}: {result}")
+    sys.exit(0 if all(r == "ok" or r.startswith("skipped") for r in results.values()) else 1)
@@ -0,0 +1,180 @@
+import time
+import asyncio
+import threading
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from psycopg2 import pool as pg_pool
+from src.utils.utils_core import get_logger, Config
+logger = get_logger("db_pool", "db_pool.log")
+# The single PostgreSQL configuration; every module that used to carry its own copy imports this
+DB_CONFIG = {
+    "dbname": Config.DB_NAME,
+    "user": Config.DB_USER,
+    "password": Config.DB_PASSWORD,
+    "host": Config.DB_HOST,
+    "port": Config.DB_PORT
+}
+class PoolTimeout(pg_pool.PoolError):
+    """No connection became free within the pool wait timeout."""
+class PooledConnection:
+    """
+    A checked-out connection. Behaves like the psycopg2 connection; `close()` hands it back
+    to the pool instead of closing it, so existing `conn = ...; conn.close()` code keeps working.
+    """
+    __slots__ = ("_pool", "_conn", "_broken", "_checked_out_at")
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._broken = False
+        self._checked_out_at = time.monotonic()
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+    @property
+    def raw(self):
+        return self._conn
+    def mark_broken(self):
+        self._broken = True
+    def close(self):
+        if self._conn is None: return
+        conn, self._conn = self._conn, None
+        self._pool._release(conn, self._broken or conn.closed, time.monotonic() - self._checked_out_at)
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL pool shared by every DB access path.
+    - `minconn`..`maxconn` connections, opened lazily on first use.
+    - A checkout waits up to `wait_timeout` for a free connection instead of failing.
+    - Each checkout sets `statement_timeout`, which doubles as a health check. A dead
+      connection is discarded and replaced.
+    - Wait and usage metrics are reported by `get_stats()`.
+    - Code holding a connection passes it to helpers (e.g. `schema_state(conn)`) rather than checking
+      out a second one: with every slot held by a caller waiting on a nested checkout, the pool stalls
+      until PoolTimeout. A nested `connection()` on the same thread is logged and counted.
+    """
+    def __init__(self, config, minconn=1, maxconn=10, wait_timeout=10.0, statement_timeout_ms=15000):
+        self.config = config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.wait_timeout = wait_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._held = threading.local()
+        self._stats = {
+            "checkouts": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0,
+            "in_use": 0, "peak_in_use": 0, "replaced": 0, "held_ms_total": 0.0, "nested": 0
+        }
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = pg_pool.ThreadedConnectionPool(self.minconn, self.maxconn, **self.config)
+                logger.info(f"PostgreSQL pool opened ({self.minconn}-{self.maxconn} connections to {self.config.get('host')}/{self.config.get('dbname')})")
+            return self._pool
+    def _prepare(self, conn, statement_timeout_ms):
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout = %s", (int(statement_timeout_ms),))
+        conn.commit()
+    def checkout(self, statement_timeout_ms=None):
+        """Returns a PooledConnection; call `.close()` (or use `connection()`) to give it back."""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No database connection free after {self.wait_timeout}s ({self.maxconn} in use)")
+        waited_ms = (time.monotonic() - start) * 1000
+        timeout_ms = self.statement_timeout_ms if statement_timeout_ms is None else statement_timeout_ms
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+            try:
+                self._prepare(conn, timeout_ms)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                # Stale connection (server restart, idle kill): drop it and open a fresh one
+                logger.warning(f"Replacing dead pooled connection: {e}")
+                pool.putconn(conn, close=True)
+                with self._lock:
+                    self._stats["replaced"] += 1
+                conn = pool.getconn()
+                self._prepare(conn, timeout_ms)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            s = self._stats
+            s["checkouts"] += 1
+            if waited_ms >= 1:
+                s["waited"] += 1
+            s["wait_ms_total"] += waited_ms
+            s["wait_ms_max"] = max(s["wait_ms_max"], waited_ms)
+            s["in_use"] += 1
+            s["peak_in_use"] = max(s["peak_in_use"], s["in_use"])
+        return PooledConnection(self, conn)
+    def _release(self, conn, broken, held_seconds):
+        try:
+            self._get_pool().putconn(conn, close=bool(broken))
+        except Exception as e:
+            logger.warning(f"Returning connection to pool failed: {e}")
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+                self._stats["held_ms_total"] += held_seconds * 1000
+            self._slots.release()
+    @contextmanager
+    def connection(self, statement_timeout_ms=None):
+        """`with db_pool.connection() as conn:`; rolls back (and discards the connection if it broke) on error."""
+        depth = getattr(self._held, "depth", 0)
+        if depth:
+            with self._lock:
+                self._stats["nested"] += 1
+            logger.warning(f"Nested checkout on {threading.current_thread().name} ({depth} already held); pass the held connection instead")
+        conn = self.checkout(statement_timeout_ms)
+        self._held.depth = depth + 1
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            conn.mark_broken()
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                conn.mark_broken()
+            raise
+        finally:
+            self._held.depth = depth
+            conn.close()
+    def close_all(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+    def get_stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["wait_ms_avg"] = round(s["wait_ms_total"] / s["checkouts"], 2) if s["checkouts"] else 0.0
+        s["held_ms_avg"] = round(s["held_ms_total"] / s["checkouts"], 2) if s["checkouts"] else 0.0
+        s["max_size"] = self.maxconn
+        return s
+db_pool = ConnectionPool(
+    DB_CONFIG,
+    minconn=Config.DB_POOL_MIN,
+    maxconn=Config.DB_POOL_MAX,
+    wait_timeout=Config.DB_POOL_WAIT_SECONDS,
+    statement_timeout_ms=Config.DB_STATEMENT_TIMEOUT_MS
+)
+# Blocking psycopg2 work runs here, off the event loop. One worker per pooled connection,
+# so queued calls wait in the executor rather than holding threads blocked on the pool.
+_executor = ThreadPoolExecutor(max_workers=Config.DB_POOL_MAX, thread_name_prefix="db")
+async def run_db(fn, *args, **kwargs):
+    """Awaits `fn(*args, **kwargs)` on the DB executor; the signature of `fn` is unchanged."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+def get_pool_stats():
+    stats = db_pool.get_stats()
+    stats["executor_queued"] = _executor._work_queue.qsize()
+    return stats
@@ -0,0 +1,59 @@
+from src.utils.utils_core import get_logger
+from src.core.schema_state import mark_applied, create_index, fixture_batches
+logger = get_logger("fixture_columns", "fixture_columns.log")
+# Team ids, match day and format as real columns, so team/date filters are index range scans
+# instead of raw_json extraction, `starting_at::date` or `name ILIKE`.
+# Nullable columns without a default: each ADD COLUMN is a catalog-only change.
+FIXTURE_COLUMNS_DDL = (
+    "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS localteam_id INTEGER",
+    "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS visitorteam_id INTEGER",
+    "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS match_date DATE",
+    "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS format TEXT"
+)
+FIXTURE_INDEXES = (
+    ("idx_fixtures_localteam_date", "fixtures (localteam_id, match_date)"),
+    ("idx_fixtures_visitorteam_date", "fixtures (visitorteam_id, match_date)"),
+    ("idx_fixtures_season_date", "fixtures (season_id, match_date)"),
+    ("idx_fixtures_venue_date", "fixtures (venue_id, match_date)"),
+    ("idx_fixtures_match_date", "fixtures (match_date)")
+)
+_RAW_LOCAL = "COALESCE(NULLIF(f.raw_json->'localteam'->>'id', '')::int, NULLIF(f.raw_json->>'localteam_id', '')::int)"
+_RAW_VISITOR = "COALESCE(NULLIF(f.raw_json->'visitorteam'->>'id', '')::int, NULLIF(f.raw_json->>'visitorteam_id', '')::int)"
+# Same definition for sync (`f.id = ANY(...)`) and backfill (rows still missing a value)
+_FILL = f"""
+UPDATE fixtures f SET
+    localteam_id = COALESCE({_RAW_LOCAL}, f.localteam_id),
+    visitorteam_id = COALESCE({_RAW_VISITOR}, f.visitorteam_id),
+    match_date = f.starting_at::date,
+    format = COALESCE(NULLIF(f.raw_json->>'type', ''), f.format)
+WHERE {{where}}
+"""
+_MISSING = """
+(f.match_date IS NULL AND f.starting_at IS NOT NULL)
+OR (f.localteam_id IS NULL AND COALESCE(f.raw_json->'localteam'->>'id', f.raw_json->>'localteam_id') IS NOT NULL)
+OR (f.visitorteam_id IS NULL AND COALESCE(f.raw_json->'visitorteam'->>'id', f.raw_json->>'visitorteam_id') IS NOT NULL)
+OR (f.format IS NULL AND f.raw_json->>'type' IS NOT NULL)
+"""
+def migrate_fixture_columns(conn):
+    """
+    One-off migration (src/core/db_migrations.py, autocommit connection): adds the columns, fills
+    them in id batches, then builds the indexes concurrently.
+    """
+    with conn.cursor() as cur:
+        for ddl in FIXTURE_COLUMNS_DDL:
+            cur.execute(ddl)
+        filled = fixture_batches(cur, _FILL.format(where=f"f.id BETWEEN %(lo)s AND %(hi)s AND ({_MISSING})"))
+        logger.info(f"Fixture columns backfilled for {filled} fixtures")
+        for name, definition in FIXTURE_INDEXES:
+            create_index(cur, name, definition)
+        mark_applied(cur, "fixture_columns")
+def refresh_fixture_columns(cursor, fixture_ids):
+    """Recomputes the columns of `fixture_ids` from their stored row (caller commits)."""
+    ids = [int(i) for i in fixture_ids if i]
+    if not ids: return
+    cursor.execute(_FILL.format(where="f.id = ANY(%s)"), (ids,))
+def fixture_exprs(ready):
+    """SQL for the team ids and match day of `fixtures f`: the indexed columns once migrated, raw_json/starting_at before."""
+    if ready:
+        return {"local": "f.localteam_id", "visitor": "f.visitorteam_id", "day": "f.match_date"}
+    return {"local": _RAW_LOCAL, "visitor": _RAW_VISITOR, "day": "f.starting_at::date"}
@@ -0,0 +1,216 @@
+import sqlite3
+import threading
+from difflib import SequenceMatcher
+from psycopg2.extras import RealDictCursor
+from src.utils.utils_core import get_logger
+from src.utils.match_utils import _normalize, _is_initials_match
+from src.core.db_pool import db_pool
+from src.core.schema_state import schema_state, mark_applied, create_index, sqlite_is_applied, sqlite_mark_applied
+logger = get_logger("fuzzy_lookup", "fuzzy_lookup.log")
+# entity -> (table, name column, short-code column or None)
+ENTITIES = {
+    "player": ("players", "fullname", None),
+    "team": ("teams", "name", "code"),
+    "league": ("leagues", "name", "code"),
+    "season": ("seasons", "name", None),
+    "venue": ("venues", "name", None),
+    "fixture": ("fixtures", "name", None)
+}
+# Built-in aliases (lower-case alias -> canonical name); extended by the entity_aliases table
+ALIASES = {
+    "team": {
+        "csk": "Chennai Super Kings", "mi": "Mumbai Indians", "rcb": "Royal Challengers Bengaluru",
+        "kkr": "Kolkata Knight Riders", "srh": "Sunrisers Hyderabad", "dc": "Delhi Capitals",
+        "pbks": "Punjab Kings", "kxip": "Punjab Kings", "rr": "Rajasthan Royals", "lsg": "Lucknow Super Giants",
+        "gt": "Gujarat Titans", "ind": "India", "aus": "Australia", "eng": "England", "pak": "Pakistan",
+        "sa": "South Africa", "rsa": "South Africa", "nz": "New Zealand", "sl": "Sri Lanka", "ban": "Bangladesh",
+        "afg": "Afghanistan", "wi": "West Indies", "ire": "Ireland", "zim": "Zimbabwe"
+    },
+    "league": {
+        "ipl": "Indian Premier League", "bbl": "Big Bash League", "psl": "Pakistan Super League",
+        "cpl": "Caribbean Premier League", "t20 wc": "T20 World Cup", "t20wc": "T20 World Cup",
+        "odi wc": "ODI World Cup", "cwc": "ODI World Cup", "wtc": "World Test Championship"
+    }
+}
+ALIASES_DDL = """
+CREATE TABLE IF NOT EXISTS entity_aliases (
+    entity_type TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    PRIMARY KEY (entity_type, alias)
+)
+"""
+CODE_INDEXES = (
+    ("idx_teams_code_upper", "teams (upper(code))"),
+    ("idx_leagues_code_upper", "leagues (upper(code))")
+)
+TRGM_INDEXES = (
+    ("idx_players_fullname_trgm", "players USING gin (fullname gin_trgm_ops)"),
+    ("idx_teams_name_trgm", "teams USING gin (name gin_trgm_ops)"),
+    ("idx_leagues_name_trgm", "leagues USING gin (name gin_trgm_ops)"),
+    ("idx_seasons_name_trgm", "seasons USING gin (name gin_trgm_ops)"),
+    ("idx_venues_name_trgm", "venues USING gin (name gin_trgm_ops)"),
+    ("idx_fixtures_name_trgm", "fixtures USING gin (name gin_trgm_ops)")
+)
+# Ranked candidates need MIN_SCORE. A single resolved entity also needs RESOLVE_SCORE and a
+# RESOLVE_MARGIN lead over the runner-up (an exact name always wins), so an unknown or ambiguous
+# name gives "no match" instead of an unrelated player or team.
+MIN_SCORE = 0.4
+RESOLVE_SCORE = 0.6
+RESOLVE_MARGIN = 0.1
+# The trigram operators (%, <%) use the GIN indexes; `%%` is psycopg2's escape for a literal %
+_LOOKUP_SQL = """
+SELECT id, {col} AS name,
+       GREATEST(similarity({col}, %(q)s), word_similarity(%(q)s, {col}){code_score}) AS score
+FROM {table}
+WHERE {col} %% %(q)s OR %(q)s <%% {col}{code_where}
+ORDER BY score DESC, length({col}) ASC
+LIMIT %(limit)s
+"""
+_aliases = {entity: dict(names) for entity, names in ALIASES.items()}
+_state = {"aliases_loaded": False}
+_lock = threading.Lock()
+def migrate_fuzzy(conn):
+    """
+    One-off migration (src/core/db_migrations.py, autocommit connection): alias table, code indexes
+    and, where the role may create pg_trgm, the trigram indexes. Without pg_trgm lookups use ILIKE.
+    """
+    with conn.cursor() as cur:
+        cur.execute(ALIASES_DDL)
+        rows = [(entity, alias, canonical) for entity, names in ALIASES.items() for alias, canonical in names.items()]
+        cur.executemany("INSERT INTO entity_aliases (entity_type, alias, canonical) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING", rows)
+        for name, definition in CODE_INDEXES:
+            create_index(cur, name, definition)
+        mark_applied(cur, "fuzzy")
+        try:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            raise RuntimeError(f"pg_trgm unavailable, name lookups stay on ILIKE (a superuser can run CREATE EXTENSION pg_trgm, then re-run this step): {e}")
+        for name, definition in TRGM_INDEXES:
+            create_index(cur, name, definition)
+        mark_applied(cur, "fuzzy_trgm")
+def _load_aliases(conn, present):
+    """Merges the entity_aliases table into the built-in aliases, once it exists."""
+    if _state["aliases_loaded"] or not present.get("aliases"): return
+    with _lock:
+        if _state["aliases_loaded"]: return
+        with conn.cursor() as cur:
+            cur.execute("SELECT entity_type, alias, canonical FROM entity_aliases")
+            for entity, alias, canonical in cur.fetchall():
+                _aliases.setdefault(entity, {})[alias.lower()] = canonical
+        _state["aliases_loaded"] = True
+def add_alias(entity, alias, canonical):
+    """Registers `alias` for `canonical` (persisted in entity_aliases)."""
+    alias = _normalize(alias)
+    _aliases.setdefault(entity, {})[alias] = canonical
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO entity_aliases (entity_type, alias, canonical) VALUES (%s, %s, %s)
+            ON CONFLICT (entity_type, alias) DO UPDATE SET canonical = excluded.canonical
+        """, (entity, alias, canonical))
+        conn.commit()
+def canonical_name(entity, query):
+    """Alias -> canonical name ('csk' -> 'Chennai Super Kings'); anything else is returned stripped."""
+    query = str(query or "").strip()
+    return _aliases.get(entity, {}).get(_normalize(query), query)
+def name_score(query, name):
+    """0..1 similarity used to rank SQLite candidates (exact > acronym > substring > edit ratio)."""
+    q, n = _normalize(query), _normalize(name)
+    if not q or not n: return 0.0
+    if q == n: return 1.0
+    score = SequenceMatcher(None, q, n).ratio()
+    if _is_initials_match(query, name): score = max(score, 0.85)
+    if q in n: score = max(score, 0.7 + 0.3 * len(q) / len(n))
+    return round(score, 3)
+def fuzzy_lookup(entity, query, limit=5, min_score=MIN_SCORE):
+    """
+    Ranked PostgreSQL lookup: [{"id", "name", "score"}], best first. Aliases are resolved first.
+    Uses pg_trgm similarity (index-backed) once the fuzzy_trgm migration has run; ILIKE before that.
+    """
+    table, col, code = ENTITIES[entity]
+    if not str(query or "").strip(): return []
+    with db_pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        state = schema_state(conn)
+        _load_aliases(conn, state["present"])
+        q = canonical_name(entity, query)
+        params = {"q": q, "code": str(query).strip(), "limit": limit}
+        if "fuzzy_trgm" in state["applied"]:
+            code_score = f", CASE WHEN upper({code}) = upper(%(code)s) THEN 1.0 ELSE 0 END" if code else ""
+            code_where = f" OR upper({code}) = upper(%(code)s)" if code else ""
+            cur.execute(_LOOKUP_SQL.format(table=table, col=col, code_score=code_score, code_where=code_where), params)
+            rows = [dict(r) for r in cur.fetchall()]
+        else:
+            params["like"] = f"%{q}%"
+            code_where = f" OR upper({code}) = upper(%(code)s)" if code else ""
+            cur.execute(f"SELECT id, {col} AS name FROM {table} WHERE {col} ILIKE %(like)s{code_where} LIMIT 50", params)
+            rows = [{"id": r["id"], "name": r["name"], "score": name_score(q, r["name"])} for r in cur.fetchall()]
+            rows.sort(key=lambda r: (-r["score"], len(r["name"] or "")))
+    return [dict(r, score=round(float(r["score"]), 3)) for r in rows[:limit] if float(r["score"]) >= min_score]
+def _confident(matches, query):
+    """The best match if it is an exact name, or scores RESOLVE_SCORE and leads the runner-up by RESOLVE_MARGIN."""
+    if not matches: return None
+    best = matches[0]
+    if _normalize(best["name"]) == _normalize(query): return best
+    if best["score"] < RESOLVE_SCORE: return None
+    if len(matches) > 1 and best["score"] - matches[1]["score"] < RESOLVE_MARGIN: return None
+    return best
+def resolve(entity, query):
+    """Best match {"id", "name", "score"}, or None when nothing is close or the name is ambiguous."""
+    return _confident(fuzzy_lookup(entity, query, limit=2), canonical_name(entity, query))
+# --- SQLite archive (FTS5 trigram index) ---
+def _fts_table(table):
+    return f"{table}_name_fts"
+def _fts_triggers(table, col, fts):
+    """Keep `fts` in step with `table`; the insert trigger also covers INSERT OR REPLACE (rowid = entity id)."""
+    add = f"INSERT INTO {fts} (rowid, {col}) SELECT CAST(new.id AS INTEGER), new.{col} WHERE new.id IS NOT NULL AND new.{col} IS NOT NULL;"
+    return {
+        f"{fts}_ai": f"AFTER INSERT ON {table} BEGIN DELETE FROM {fts} WHERE rowid = CAST(new.id AS INTEGER); {add} END",
+        f"{fts}_au": f"AFTER UPDATE OF id, {col} ON {table} BEGIN DELETE FROM {fts} WHERE rowid = CAST(old.id AS INTEGER); {add} END",
+        f"{fts}_ad": f"AFTER DELETE ON {table} BEGIN DELETE FROM {fts} WHERE rowid = CAST(old.id AS INTEGER); END"
+    }
+def migrate_sqlite_fts(conn):
+    """
+    One-off migration of the SQLite archive (src/core/db_migrations.py): an FTS5 trigram copy of each
+    name column, filled once and kept current by triggers, so `sqlite_lookup` only queries it.
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table, col, _ in ENTITIES.values():
+        if table not in tables: continue
+        fts = _fts_table(table)
+        conn.execute(f"DROP TABLE IF EXISTS {table}_fts")  # rebuilt-on-read copy of earlier versions
+        conn.execute(f"DROP TABLE IF EXISTS {fts}")
+        conn.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({col}, tokenize='trigram')")
+        conn.execute(f"INSERT INTO {fts} (rowid, {col}) SELECT CAST(id AS INTEGER), {col} FROM {table} WHERE id IS NOT NULL AND {col} IS NOT NULL")
+        for name, body in _fts_triggers(table, col, fts).items():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(f"CREATE TRIGGER {name} {body}")
+    sqlite_mark_applied(conn, "archive_fts")
+    conn.commit()
+def sqlite_lookup(conn, entity, query, limit=5, min_score=MIN_SCORE):
+    """
+    Ranked lookup in a SQLite archive: candidates from the FTS5 trigram index (any shared
+    trigram), re-ranked with `name_score`. Queries under 3 characters, and archives without the
+    archive_fts migration, use the code column/LIKE.
+    """
+    table, col, code = ENTITIES[entity]
+    q = canonical_name(entity, query)
+    qn = _normalize(q)
+    if not qn: return []
+    rows = None
+    if len(qn) >= 3 and sqlite_is_applied(conn, "archive_fts"):
+        fts = _fts_table(table)
+        grams = {qn[i:i + 3] for i in range(len(qn) - 2)}
+        match = " OR ".join('"' + g.replace('"', '""') + '"' for g in sorted(grams))
+        try:
+            rows = conn.execute(f"SELECT rowid, {col} FROM {fts} WHERE {fts} MATCH ? ORDER BY rank LIMIT 50", (match,)).fetchall()
+        except sqlite3.OperationalError:
+            rows = None  # table absent from this archive when the migration ran
+    if rows is None:
+        where = f"{col} LIKE ?" + (f" OR upper({code}) = upper(?)" if code else "")
+        args = [f"%{q}%"] + ([q] if code else [])
+        rows = conn.execute(f"SELECT id, {col} FROM {table} WHERE {where} LIMIT 50", args).fetchall()
+    ranked = sorted(({"id": r[0], "name": r[1], "score": name_score(q, r[1])} for r in rows), key=lambda r: (-r["score"], len(r["name"] or "")))
+    return [r for r in ranked[:limit] if r["score"] >= min_score]
+def sqlite_resolve(conn, entity, query):
+    """`resolve` for a SQLite archive."""
+    return _confident(sqlite_lookup(conn, entity, query, limit=2), canonical_name(entity, query))
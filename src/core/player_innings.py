@@ -0,0 +1,149 @@
+from psycopg2.extras import RealDictCursor
+from src.utils.utils_core import get_logger
+from src.core.db_pool import db_pool
+from src.core.schema_state import is_applied, mark_applied, create_index, fixture_batches
+logger = get_logger("player_innings", "player_innings.log")
+# One row per player per innings (scoreboard S1/S2/...), extracted from fixtures.raw_json
+INNINGS_DDL = """
+CREATE TABLE IF NOT EXISTS batting_innings (
+    fixture_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    scoreboard TEXT NOT NULL DEFAULT 'S1',
+    season_id INTEGER,
+    team_id INTEGER,
+    runs INTEGER NOT NULL DEFAULT 0,
+    balls INTEGER NOT NULL DEFAULT 0,
+    fours INTEGER NOT NULL DEFAULT 0,
+    sixes INTEGER NOT NULL DEFAULT 0,
+    strike_rate NUMERIC,
+    dismissed BOOLEAN NOT NULL DEFAULT FALSE,
+    fow_balls NUMERIC,
+    PRIMARY KEY (fixture_id, player_id, scoreboard)
+);
+CREATE TABLE IF NOT EXISTS bowling_innings (
+    fixture_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    scoreboard TEXT NOT NULL DEFAULT 'S1',
+    season_id INTEGER,
+    team_id INTEGER,
+    overs NUMERIC NOT NULL DEFAULT 0,
+    maidens INTEGER NOT NULL DEFAULT 0,
+    runs_conceded INTEGER NOT NULL DEFAULT 0,
+    wickets INTEGER NOT NULL DEFAULT 0,
+    economy NUMERIC,
+    PRIMARY KEY (fixture_id, player_id, scoreboard)
+);
+"""
+INNINGS_INDEXES = (
+    ("idx_batting_innings_player", "batting_innings (player_id, season_id)"),
+    ("idx_batting_innings_season", "batting_innings (season_id, player_id)"),
+    ("idx_bowling_innings_player", "bowling_innings (player_id, season_id)"),
+    ("idx_bowling_innings_season", "bowling_innings (season_id, player_id)")
+)
+# Extraction runs in PostgreSQL over the stored raw_json, so sync and backfill share one definition.
+# `{where}` selects the fixtures to (re)materialize.
+_BATTING_INSERT = """
+INSERT INTO batting_innings (fixture_id, player_id, scoreboard, season_id, team_id, runs, balls, fours, sixes, strike_rate, dismissed, fow_balls)
+SELECT f.id,
+       COALESCE(NULLIF(b->>'player_id', ''), b->'batsman'->>'id')::int,
+       COALESCE(NULLIF(b->>'scoreboard', ''), 'S1'),
+       f.season_id,
+       NULLIF(b->>'team_id', '')::int,
+       COALESCE(NULLIF(b->>'score', '')::int, 0),
+       COALESCE(NULLIF(b->>'ball', '')::int, 0),
+       COALESCE(NULLIF(b->>'four_x', '')::int, 0),
+       COALESCE(NULLIF(b->>'six_x', '')::int, 0),
+       NULLIF(b->>'rate', '')::numeric,
+       COALESCE(b->>'bowling_player_id', b->>'catch_stump_player_id', b->>'runout_by_id', b->>'batsmanout_id') IS NOT NULL,
+       NULLIF(b->>'fow_balls', '')::numeric
+FROM fixtures f, jsonb_array_elements(CASE WHEN jsonb_typeof(f.raw_json->'batting') = 'array' THEN f.raw_json->'batting' ELSE '[]'::jsonb END) b
+WHERE {where} AND COALESCE(NULLIF(b->>'player_id', ''), b->'batsman'->>'id') IS NOT NULL
+ON CONFLICT (fixture_id, player_id, scoreboard) DO NOTHING
+"""
+_BOWLING_INSERT = """
+INSERT INTO bowling_innings (fixture_id, player_id, scoreboard, season_id, team_id, overs, maidens, runs_conceded, wickets, economy)
+SELECT f.id,
+       COALESCE(NULLIF(bw->>'player_id', ''), bw->'bowler'->>'id')::int,
+       COALESCE(NULLIF(bw->>'scoreboard', ''), 'S1'),
+       f.season_id,
+       NULLIF(bw->>'team_id', '')::int,
+       COALESCE(NULLIF(bw->>'overs', '')::numeric, 0),
+       COALESCE(NULLIF(bw->>'medians', '')::int, 0),
+       COALESCE(NULLIF(bw->>'runs', '')::int, 0),
+       COALESCE(NULLIF(bw->>'wickets', '')::int, 0),
+       NULLIF(bw->>'rate', '')::numeric
+FROM fixtures f, jsonb_array_elements(CASE WHEN jsonb_typeof(f.raw_json->'bowling') = 'array' THEN f.raw_json->'bowling' ELSE '[]'::jsonb END) bw
+WHERE {where} AND COALESCE(NULLIF(bw->>'player_id', ''), bw->'bowler'->>'id') IS NOT NULL
+ON CONFLICT (fixture_id, player_id, scoreboard) DO NOTHING
+"""
+def migrate_innings(conn):
+    """
+    One-off migration (src/core/db_migrations.py, autocommit connection): creates the tables,
+    backfills them from existing fixtures in id batches, then builds the indexes concurrently.
+    """
+    with conn.cursor() as cur:
+        cur.execute(INNINGS_DDL)
+        backfill_innings(cur)
+        for name, definition in INNINGS_INDEXES:
+            create_index(cur, name, definition)
+        mark_applied(cur, "innings")
+def refresh_innings(cursor, fixture_ids):
+    """Re-materializes the innings rows of `fixture_ids` from their stored raw_json (caller commits)."""
+    ids = [int(i) for i in fixture_ids if i]
+    if not ids: return
+    cursor.execute("DELETE FROM batting_innings WHERE fixture_id = ANY(%s)", (ids,))
+    cursor.execute("DELETE FROM bowling_innings WHERE fixture_id = ANY(%s)", (ids,))
+    cursor.execute(_BATTING_INSERT.format(where="f.id = ANY(%s)"), (ids,))
+    cursor.execute(_BOWLING_INSERT.format(where="f.id = ANY(%s)"), (ids,))
+def backfill_innings(cur):
+    """Materializes every fixture that has no innings rows yet. Returns (batting, bowling) rows added."""
+    window = "f.id BETWEEN %(lo)s AND %(hi)s AND NOT EXISTS (SELECT 1 FROM {table} x WHERE x.fixture_id = f.id)"
+    batting = fixture_batches(cur, _BATTING_INSERT.format(where=window.format(table="batting_innings")))
+    bowling = fixture_batches(cur, _BOWLING_INSERT.format(where=window.format(table="bowling_innings")))
+    logger.info(f"Innings backfill: {batting} batting rows, {bowling} bowling rows")
+    return batting, bowling
+def season_leaders(year, category="runs", series_name=None, limit=10):
+    """
+    Top run scorers (Orange Cap) or wicket takers (Purple Cap) of a season, straight from the
+    innings tables. Ties break on strike rate / economy. Returns None for other categories and
+    until the innings migration has run.
+    """
+    if category in ("runs", "batting", "orange_cap"):
+        sql = """
+        SELECT p.fullname AS player, SUM(bi.runs) AS runs, COUNT(*) AS innings, MAX(bi.runs) AS highest_score,
+               SUM(bi.fours) AS fours, SUM(bi.sixes) AS sixes,
+               ROUND(SUM(bi.runs) * 100.0 / NULLIF(SUM(bi.balls), 0), 2) AS strike_rate
+        FROM batting_innings bi
+        JOIN seasons s ON s.id = bi.season_id
+        JOIN leagues l ON l.id = s.league_id
+        LEFT JOIN players p ON p.id = bi.player_id
+        WHERE s.year = %s {series}
+        GROUP BY bi.player_id, p.fullname
+        ORDER BY runs DESC, strike_rate DESC NULLS LAST
+        LIMIT %s
+        """
+    elif category in ("wickets", "bowling", "purple_cap"):
+        sql = """
+        SELECT p.fullname AS player, SUM(bo.wickets) AS wickets, COUNT(*) AS innings, SUM(bo.runs_conceded) AS runs_conceded,
+               ROUND(SUM(bo.runs_conceded) / NULLIF(SUM(TRUNC(bo.overs) + (bo.overs - TRUNC(bo.overs)) * 10 / 6), 0), 2) AS economy
+        FROM bowling_innings bo
+        JOIN seasons s ON s.id = bo.season_id
+        JOIN leagues l ON l.id = s.league_id
+        LEFT JOIN players p ON p.id = bo.player_id
+        WHERE s.year = %s {series}
+        GROUP BY bo.player_id, p.fullname
+        ORDER BY wickets DESC, economy ASC NULLS LAST
+        LIMIT %s
+        """
+    else:
+        return None
+    params = [str(year)]
+    series = ""
+    if series_name:
+        series = "AND (l.name ILIKE %s OR l.code ILIKE %s OR s.name ILIKE %s)"
+        params += [f"%{series_name}%"] * 3
+    params.append(limit)
+    with db_pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        if not is_applied("innings", conn): return None
+        cur.execute(sql.format(series=series), tuple(params))
+        return [dict(r) for r in cur.fetchall()]
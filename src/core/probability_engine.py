@@ -2,23 +2,37 @@ import sqlite3
 import os
 import json
 from src.utils.utils_core import get_logger
+from src.core.fuzzy_lookup import sqlite_resolve
+from src.core.schema_state import sqlite_mark_applied
 logger = get_logger("prob_engine")
 DB_PATH = os.path.join("data", "full_raw_history.db")
+# (team, team, date) serves both orientations of the head-to-head OR; (venue, team, date) the venue record.
+# Built by the archive_indexes step of src/core/db_migrations.py, never on a request.
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_fixtures_teams_date ON fixtures (localteam_id, visitorteam_id, starting_at)",
+    "CREATE INDEX IF NOT EXISTS idx_fixtures_venue_date ON fixtures (venue_id, localteam_id, visitorteam_id, starting_at)",
+    "CREATE INDEX IF NOT EXISTS idx_fixtures_season_date ON fixtures (season_id, starting_at)"
+)
+def migrate_archive_indexes(conn):
+    """One-off migration of the SQLite archive: the fixture indexes used by the head-to-head and venue queries."""
+    for ddl in _INDEXES:
+        conn.execute(ddl)
+    sqlite_mark_applied(conn, "archive_indexes")
+    conn.commit()
 def get_db():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 def resolve_team(name):
-    """Fuzzy match team name to ID"""
+    """Fuzzy match team name to ID (ranked FTS5 trigram lookup, aliases like 'CSK' included)"""
     try:
         conn = get_db()
-        cursor = conn.cursor()
-        search = f"%{name}%"
-        cursor.execute("SELECT id, name FROM teams WHERE name LIKE ? LIMIT 1", (search,))
-        res = cursor.fetchone()
+        match = sqlite_resolve(conn, "team", name)
         conn.close()
-        return res if res else None
-    except: return None
+        return match
+    except Exception as e:
+        logger.error(f"Team lookup error for {name}: {e}")
+        return None
 def get_head_to_head_stats(team_a_id, team_b_id):
     """Get last 10 matches result between two teams"""
     try:
@@ -53,9 +67,11 @@ def get_venue_win_rate(team_id, venue_name):
     try:
         conn = get_db()
         cursor = conn.cursor()
-        v_search = f"%{venue_name}%"
-        cursor.execute("SELECT id FROM venues WHERE name LIKE ? OR city LIKE ? LIMIT 1", (v_search, v_search))
-        v_res = cursor.fetchone()
+        v_res = sqlite_resolve(conn, "venue", venue_name)
+        if not v_res:
+            # Venue given as a city
+            cursor.execute("SELECT id FROM venues WHERE city LIKE ? LIMIT 1", (f"%{venue_name}%",))
+            v_res = cursor.fetchone()
         if not v_res:
             conn.close()
             return 0.0
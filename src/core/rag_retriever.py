@@ -11,23 +11,19 @@ Features:
 - Multi-source aggregation
 """
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime, timedelta
+import asyncio
 import json
 from typing import Dict, List, Any, Optional
 from src.utils.utils_core import get_logger
+from src.core.db_pool import db_pool, run_db, DB_CONFIG
+from src.core.schema_state import is_applied
+from src.core.fixture_columns import fixture_exprs
+from src.core.fuzzy_lookup import fuzzy_lookup, resolve
 
 logger = get_logger("rag_retriever", "rag_retriever.log")
 
-DB_CONFIG = {
-    "dbname": "cricket_db",
-    "user": "postgres",
-    "password": "1234",
-    "host": "localhost",
-    "port": "5432"
-}
-
 class SmartRetriever:
     """
     Intelligent data retrieval system that knows EXACTLY where to look
@@ -38,23 +34,19 @@ class SmartRetriever:
         self.db_config = DB_CONFIG
         
     def _get_connection(self):
-        """Get PostgreSQL connection"""
-        return psycopg2.connect(**self.db_config)
+        """Get a pooled PostgreSQL connection (close() returns it to the pool)"""
+        return db_pool.checkout()
     
     def _execute_query(self, sql: str, params: tuple = None) -> List[Dict]:
         """Execute SQL and return results as list of dicts"""
         try:
-            conn = self._get_connection()
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            
-            if params:
-                cur.execute(sql, params)
-            else:
-                cur.execute(sql)
-            
-            results = cur.fetchall()
-            cur.close()
-            conn.close()
+            with db_pool.connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    if params:
+                        cur.execute(sql, params)
+                    else:
+                        cur.execute(sql)
+                    results = cur.fetchall()
             
             # Convert to list of dicts and handle datetime
             output = []
@@ -71,6 +63,28 @@ class SmartRetriever:
             logger.error(f"SQL: {sql}")
             return []
     
+    async def _query(self, sql: str, params: tuple = None) -> List[Dict]:
+        """`_execute_query` on the DB executor, so the event loop keeps serving other work"""
+        return await run_db(self._execute_query, sql, params)
+    
+    def _lookup_ids(self, entity: str, name: str, limit: int = 1) -> List[int]:
+        """Ids of the best fuzzy matches for `name` (aliases resolved); [] when nothing is close (or, for one id, ambiguous)"""
+        try:
+            if limit == 1:
+                match = resolve(entity, name)
+                return [match["id"]] if match else []
+            return [m["id"] for m in fuzzy_lookup(entity, name, limit=limit)]
+        except Exception as e:
+            logger.warning(f"Fuzzy {entity} lookup failed for '{name}': {e}")
+            return []
+    
+    async def _resolve_ids(self, entity: str, name: str, limit: int = 1) -> List[int]:
+        return await run_db(self._lookup_ids, entity, name, limit)
+    
+    async def _fixture_exprs(self) -> Dict[str, str]:
+        """Team id / match day SQL for `fixtures f`: the indexed columns once their migration has run"""
+        return fixture_exprs(await run_db(is_applied, "fixture_columns"))
+    
     async def retrieve_match_by_date(self, target_date: str, team_name: Optional[str] = None) -> List[Dict]:
         """
         Retrieve matches on a specific date.
@@ -84,18 +98,20 @@ class SmartRetriever:
         """
         logger.info(f"📅 Retrieving matches for date: {target_date}, team: {team_name}")
         
+        cols = await self._fixture_exprs()
         if team_name:
             sql = """
             SELECT 
                 f.id, f.name, f.starting_at, f.status,
                 f.raw_json
             FROM fixtures f
-            WHERE f.starting_at::date = %s
-            AND f.name ILIKE %s
+            WHERE {day} = %s
+            AND ({local} = ANY(%s) OR {visitor} = ANY(%s) OR f.name ILIKE %s)
             ORDER BY f.starting_at DESC
             LIMIT 10
-            """
-            results = self._execute_query(sql, (target_date, f"%{team_name}%"))
+            """.format(**cols)
+            team_ids = await self._resolve_ids("team", team_name)
+            results = await self._query(sql, (target_date, team_ids, team_ids, f"%{team_name}%"))
         else:
             sql = """
             SELECT 
@@ -104,14 +120,14 @@ class SmartRetriever:
                 v.name as venue_name, v.city as city
             FROM fixtures f
             LEFT JOIN venues v ON f.venue_id = v.id
-            WHERE f.starting_at::date = %s
+            WHERE {day} = %s
             ORDER BY f.starting_at DESC
             LIMIT 10
-            """
-            results = self._execute_query(sql, (target_date,))
+            """.format(**cols)
+            results = await self._query(sql, (target_date,))
         
         logger.info(f"✅ Found {len(results)} matches")
-        return self._process_match_results(results)
+        return await run_db(self._process_match_results, results)
 
     async def retrieve_live_matches(self) -> List[Dict]:
         """
@@ -131,9 +147,9 @@ class SmartRetriever:
         WHERE f.status IN ('Live', '1st Innings', '2nd Innings', 'Innings Break', 'Tea Break', 'Lunch', 'Stumps', 'Int.', 'Delay')
         ORDER BY f.starting_at DESC
         """
-        results = self._execute_query(sql)
+        results = await self._query(sql)
         logger.info(f"✅ Found {len(results)} LIVE matches")
-        return self._process_match_results(results)
+        return await run_db(self._process_match_results, results)
 
     async def retrieve_upcoming_matches(self, limit: int = 5) -> List[Dict]:
         """
@@ -155,9 +171,9 @@ class SmartRetriever:
         ORDER BY f.starting_at ASC
         LIMIT %s
         """
-        results = self._execute_query(sql, (limit,))
+        results = await self._query(sql, (limit,))
         logger.info(f"✅ Found {len(results)} UPCOMING matches")
-        return self._process_match_results(results)
+        return await run_db(self._process_match_results, results)
     
     async def retrieve_player_stats(
         self, 
@@ -178,14 +194,23 @@ class SmartRetriever:
         """
         logger.info(f"🏏 Retrieving stats for player: {player_name}, season: {season_id}, year: {year}")
         
-        # Get player ID first
-        player_sql = """
-        SELECT id, fullname, position_name, country_id
-        FROM players
-        WHERE fullname ILIKE %s
-        LIMIT 1
-        """
-        player_data = self._execute_query(player_sql, (f"%{player_name}%",))
+        # Get player ID first: ranked trigram match, so "Kohli" or "Virat Kholi" still resolve
+        player_ids = await self._resolve_ids("player", player_name)
+        if player_ids:
+            player_sql = """
+            SELECT id, fullname, position_name, country_id
+            FROM players
+            WHERE id = %s
+            """
+            player_data = await self._query(player_sql, (player_ids[0],))
+        else:
+            player_sql = """
+            SELECT id, fullname, position_name, country_id
+            FROM players
+            WHERE fullname ILIKE %s
+            LIMIT 1
+            """
+            player_data = await self._query(player_sql, (f"%{player_name}%",))
         
         if not player_data:
             logger.warning(f"❌ Player not found: {player_name}")
@@ -194,59 +219,87 @@ class SmartRetriever:
         player = player_data[0]
         player_id = player["id"]
         
-        # Build batting stats query
-        batting_sql = """
-        SELECT 
-            bat->>'batsman'->>'fullname' AS player,
-            COUNT(*) as innings,
-            SUM((bat->>'score')::int) as total_runs,
-            AVG((bat->>'score')::int) as average,
-            MAX((bat->>'score')::int) as highest_score,
-            SUM((bat->>'four_x')::int) as fours,
-            SUM((bat->>'six_x')::int) as sixes,
-            AVG(((bat->>'score')::float * 100.0 / NULLIF((bat->>'balls')::float, 0))) as strike_rate
-        FROM fixtures f, jsonb_array_elements(f.raw_json->'batting') bat
-        WHERE bat->'batsman'->>'id' = %s
-        """
-        
-        params = [str(player_id)]
-        
-        if season_id:
-            batting_sql += " AND f.season_id = %s"
-            params.append(season_id)
-        elif year:
-            batting_sql += " AND EXTRACT(YEAR FROM f.starting_at) = %s"
-            params.append(year)
-        
-        batting_sql += " GROUP BY bat->>'batsman'->>'fullname'"
-        
-        batting_stats = self._execute_query(batting_sql, tuple(params))
-        
-        # Build bowling stats query
-        bowling_sql = """
-        SELECT 
-            bowl->>'bowler'->>'fullname' AS player,
-            COUNT(*) as matches,
-            SUM((bowl->>'wickets')::int) as total_wickets,
-            SUM((bowl->>'runs')::int) as runs_conceded,
-            AVG((bowl->>'rate')::float) as economy,
-            MAX((bowl->>'wickets')::int) as best_figures
-        FROM fixtures f, jsonb_array_elements(f.raw_json->'bowling') bowl
-        WHERE bowl->'bowler'->>'id' = %s
-        """
-        
-        params = [str(player_id)]
+        if await run_db(is_applied, "innings"):
+            # Build batting stats query (index range scan on batting_innings.player_id)
+            batting_sql = """
+            SELECT 
+                p.fullname AS player,
+                COUNT(*) as innings,
+                SUM(bi.runs) as total_runs,
+                AVG(bi.runs) as average,
+                MAX(bi.runs) as highest_score,
+                SUM(bi.fours) as fours,
+                SUM(bi.sixes) as sixes,
+                AVG(bi.runs * 100.0 / NULLIF(bi.balls, 0)) as strike_rate
+            FROM batting_innings bi
+            JOIN players p ON p.id = bi.player_id
+            JOIN fixtures f ON f.id = bi.fixture_id
+            WHERE bi.player_id = %s
+            """
+            bowling_sql = """
+            SELECT 
+                p.fullname AS player,
+                COUNT(*) as matches,
+                SUM(bo.wickets) as total_wickets,
+                SUM(bo.runs_conceded) as runs_conceded,
+                AVG(bo.economy) as economy,
+                MAX(bo.wickets) as best_figures
+            FROM bowling_innings bo
+            JOIN players p ON p.id = bo.player_id
+            JOIN fixtures f ON f.id = bo.fixture_id
+            WHERE bo.player_id = %s
+            """
+            batting_params, params = [player_id], [player_id]
+            batting_season, bowling_season = "bi.season_id", "bo.season_id"
+        else:
+            # Innings migration not run yet: extract from raw_json
+            batting_sql = """
+            SELECT 
+                bat->'batsman'->>'fullname' AS player,
+                COUNT(*) as innings,
+                SUM((bat->>'score')::int) as total_runs,
+                AVG((bat->>'score')::int) as average,
+                MAX((bat->>'score')::int) as highest_score,
+                SUM((bat->>'four_x')::int) as fours,
+                SUM((bat->>'six_x')::int) as sixes,
+                AVG(((bat->>'score')::float * 100.0 / NULLIF((bat->>'ball')::float, 0))) as strike_rate
+            FROM fixtures f, jsonb_array_elements(f.raw_json->'batting') bat
+            WHERE bat->'batsman'->>'id' = %s
+            """
+            bowling_sql = """
+            SELECT 
+                bowl->'bowler'->>'fullname' AS player,
+                COUNT(*) as matches,
+                SUM((bowl->>'wickets')::int) as total_wickets,
+                SUM((bowl->>'runs')::int) as runs_conceded,
+                AVG((bowl->>'rate')::float) as economy,
+                MAX((bowl->>'wickets')::int) as best_figures
+            FROM fixtures f, jsonb_array_elements(f.raw_json->'bowling') bowl
+            WHERE bowl->'bowler'->>'id' = %s
+            """
+            batting_params, params = [str(player_id)], [str(player_id)]
+            batting_season, bowling_season = "f.season_id", "f.season_id"
         
         if season_id:
-            bowling_sql += " AND f.season_id = %s"
+            batting_sql += f" AND {batting_season} = %s"
+            batting_params.append(season_id)
+            bowling_sql += f" AND {bowling_season} = %s"
             params.append(season_id)
         elif year:
-            bowling_sql += " AND EXTRACT(YEAR FROM f.starting_at) = %s"
-            params.append(year)
+            year_range = " AND {day} >= make_date(%s, 1, 1) AND {day} < make_date(%s + 1, 1, 1)".format(**await self._fixture_exprs())
+            batting_sql += year_range
+            batting_params += [int(year), int(year)]
+            bowling_sql += year_range
+            params += [int(year), int(year)]
         
-        bowling_sql += " GROUP BY bowl->>'bowler'->>'fullname'"
+        batting_sql += " GROUP BY 1"
+        bowling_sql += " GROUP BY 1"
         
-        bowling_stats = self._execute_query(bowling_sql, tuple(params))
+        # Batting and bowling aggregates are independent: run them side by side
+        batting_stats, bowling_stats = await asyncio.gather(
+            self._query(batting_sql, tuple(batting_params)),
+            self._query(bowling_sql, tuple(params))
+        )
         
         result = {
             "player_info": player,
@@ -270,16 +323,30 @@ class SmartRetriever:
         """
         logger.info(f"🏆 Retrieving season data: {season_name} {year}")
         
-        # Get season ID by joined name/code and year
-        season_sql = """
-        SELECT s.id, s.name, s.year, l.name as league_name
-        FROM seasons s
-        JOIN leagues l ON s.league_id = l.id
-        WHERE (l.name ILIKE %s OR l.code ILIKE %s OR s.name ILIKE %s)
-          AND s.year = %s
-        LIMIT 1
-        """
-        season_data = self._execute_query(season_sql, (f"%{season_name}%", f"%{season_name}%", f"%{season_name}%", str(year)))
+        # Get season ID: best-ranked leagues for the name/code/alias ("IPL"), then the year
+        season_data = []
+        league_ids = await self._resolve_ids("league", season_name, limit=3)
+        if league_ids:
+            season_sql = """
+            SELECT s.id, s.name, s.year, l.name as league_name
+            FROM seasons s
+            JOIN leagues l ON s.league_id = l.id
+            WHERE s.league_id = ANY(%s)
+              AND s.year = %s
+            ORDER BY array_position(%s, s.league_id)
+            LIMIT 1
+            """
+            season_data = await self._query(season_sql, (league_ids, str(year), league_ids))
+        if not season_data:
+            season_sql = """
+            SELECT s.id, s.name, s.year, l.name as league_name
+            FROM seasons s
+            JOIN leagues l ON s.league_id = l.id
+            WHERE (l.name ILIKE %s OR l.code ILIKE %s OR s.name ILIKE %s)
+              AND s.year = %s
+            LIMIT 1
+            """
+            season_data = await self._query(season_sql, (f"%{season_name}%", f"%{season_name}%", f"%{season_name}%", str(year)))
         
         if not season_data:
             logger.warning(f"❌ Season not found: {season_name} {year}")
@@ -301,11 +368,6 @@ class SmartRetriever:
         LEFT JOIN teams rt ON sc.runner_up_team_id = rt.id
         WHERE sc.season_id = %s
         """
-        champion_rows = self._execute_query(champion_sql, (season_id,))
-        champion = champion_rows[0] if champion_rows else None
-        
-        # Extract Final Match ID from champions record if exists
-        explicit_final_id = champion.get("final_match_id") if champion else None
         
         # Get awards
         awards_sql = """
@@ -318,7 +380,6 @@ class SmartRetriever:
         LEFT JOIN players p ON sa.player_id = p.id
         WHERE sa.season_id = %s
         """
-        awards = self._execute_query(awards_sql, (season_id,))
         
         # Get all matches list (lightweight)
         matches_sql = """
@@ -329,7 +390,17 @@ class SmartRetriever:
         WHERE f.season_id = %s
         ORDER BY f.starting_at ASC
         """
-        matches = self._execute_query(matches_sql, (season_id,))
+        
+        # Champion, awards and the match list only depend on the season: fetch them concurrently
+        champion_rows, awards, matches = await asyncio.gather(
+            self._query(champion_sql, (season_id,)),
+            self._query(awards_sql, (season_id,)),
+            self._query(matches_sql, (season_id,))
+        )
+        champion = champion_rows[0] if champion_rows else None
+        
+        # Extract Final Match ID from champions record if exists
+        explicit_final_id = champion.get("final_match_id") if champion else None
         
         key_matches = []
         final_match = None
@@ -365,8 +436,8 @@ class SmartRetriever:
             WHERE f.id IN %s
             ORDER BY f.starting_at DESC
             """
-            raw_key_matches = self._execute_query(key_matches_sql, (tuple(candidate_ids),))
-            processed_key_matches = self._process_match_results(raw_key_matches)
+            raw_key_matches = await self._query(key_matches_sql, (tuple(candidate_ids),))
+            processed_key_matches = await run_db(self._process_match_results, raw_key_matches)
             key_matches = processed_key_matches
             
             # Final is either the identified match or the top one in key matches
@@ -409,24 +480,43 @@ class SmartRetriever:
         """
         logger.info(f"⚔️ Retrieving H2H: {team_a} vs {team_b}")
         
-        sql = """
-        SELECT 
-            f.id, f.name, f.starting_at, f.status,
-            f.raw_json->>'note' as result,
-            f.raw_json,
-            v.name as venue_name, v.city as city
-        FROM fixtures f
-        LEFT JOIN venues v ON f.venue_id = v.id
-        WHERE f.name ILIKE %s
-        AND f.name ILIKE %s
-        ORDER BY f.starting_at DESC
-        LIMIT %s
-        """
-        
-        results = self._execute_query(sql, (f"%{team_a}%", f"%{team_b}%", limit))
+        results = []
+        a_ids, b_ids = await asyncio.gather(self._resolve_ids("team", team_a), self._resolve_ids("team", team_b))
+        if a_ids and b_ids:
+            # Both orientations hit the (localteam_id, match_date) / (visitorteam_id, match_date) indexes once migrated
+            sql = """
+            SELECT 
+                f.id, f.name, f.starting_at, f.status,
+                f.raw_json->>'note' as result,
+                f.raw_json,
+                v.name as venue_name, v.city as city
+            FROM fixtures f
+            LEFT JOIN venues v ON f.venue_id = v.id
+            WHERE ({local} = ANY(%s) AND {visitor} = ANY(%s))
+               OR ({local} = ANY(%s) AND {visitor} = ANY(%s))
+            ORDER BY f.starting_at DESC
+            LIMIT %s
+            """.format(**await self._fixture_exprs())
+            results = await self._query(sql, (a_ids, b_ids, b_ids, a_ids, limit))
+        if not results:
+            # Teams not in the teams table (or fixtures without stored team ids): match on the fixture name
+            sql = """
+            SELECT 
+                f.id, f.name, f.starting_at, f.status,
+                f.raw_json->>'note' as result,
+                f.raw_json,
+                v.name as venue_name, v.city as city
+            FROM fixtures f
+            LEFT JOIN venues v ON f.venue_id = v.id
+            WHERE f.name ILIKE %s
+            AND f.name ILIKE %s
+            ORDER BY f.starting_at DESC
+            LIMIT %s
+            """
+            results = await self._query(sql, (f"%{team_a}%", f"%{team_b}%", limit))
         
         logger.info(f"✅ Found {len(results)} H2H matches")
-        return self._process_match_results(results)
+        return await run_db(self._process_match_results, results)
     
     async def retrieve_by_score(
         self, 
@@ -462,21 +552,23 @@ class SmartRetriever:
         """
         
         params = [score_value]
+        cols = await self._fixture_exprs()
         
         if team_name:
-            sql += " AND f.name ILIKE %s"
-            params.append(f"%{team_name}%")
+            team_ids = await self._resolve_ids("team", team_name)
+            sql += " AND ({local} = ANY(%s) OR {visitor} = ANY(%s) OR f.name ILIKE %s)".format(**cols)
+            params += [team_ids, team_ids, f"%{team_name}%"]
         
         if year:
-            sql += " AND EXTRACT(YEAR FROM f.starting_at) = %s"
-            params.append(year)
+            sql += " AND {day} >= make_date(%s, 1, 1) AND {day} < make_date(%s + 1, 1, 1)".format(**cols)
+            params += [int(year), int(year)]
         
         sql += " ORDER BY f.starting_at DESC LIMIT 10"
         
-        results = self._execute_query(sql, tuple(params))
+        results = await self._query(sql, tuple(params))
         
         logger.info(f"✅ Found {len(results)} matches with score {score_value}")
-        return self._process_match_results(results)
+        return await run_db(self._process_match_results, results)
     
     def _process_match_results(self, results: List[Dict]) -> List[Dict]:
         """
@@ -0,0 +1,119 @@
+import time
+import sqlite3
+import threading
+from src.utils.utils_core import get_logger
+from src.core.db_pool import db_pool
+logger = get_logger("schema_state", "db_migrations.log")
+# Optional read-model schema is created by `python -m src.core.db_migrations`, never from a request.
+# - "present": the objects exist, so sync keeps them current.
+# - "applied": the migration (DDL + backfill) finished and is recorded in schema_migrations, so read paths use it.
+MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+# The SQLite archive records its migrations in a table of the same name
+SQLITE_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+RECHECK_SECONDS = 60
+_PRESENT_SQL = """
+SELECT to_regclass('batting_innings') IS NOT NULL AND to_regclass('bowling_innings') IS NOT NULL AS innings,
+       (SELECT count(*) = 4 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'fixtures'
+          AND column_name IN ('localteam_id', 'visitorteam_id', 'match_date', 'format')) AS fixture_columns,
+       to_regclass('entity_aliases') IS NOT NULL AS aliases,
+       to_regclass('schema_migrations') IS NOT NULL AS schema_migrations
+"""
+_state = {"present": {}, "applied": frozenset(), "checked_at": None}
+_lock = threading.Lock()
+def _read(conn):
+    """Catalog lookups inside a savepoint, so a borrowed connection's open transaction is never aborted."""
+    with conn.cursor() as cur:
+        cur.execute("SAVEPOINT schema_state")
+        try:
+            cur.execute(_PRESENT_SQL)
+            present = dict(zip([d[0] for d in cur.description], cur.fetchone()))
+            applied = frozenset()
+            if present.get("schema_migrations"):
+                cur.execute("SELECT name FROM schema_migrations")
+                applied = frozenset(r[0] for r in cur.fetchall())
+            cur.execute("RELEASE SAVEPOINT schema_state")
+        except Exception:
+            cur.execute("ROLLBACK TO SAVEPOINT schema_state")
+            raise
+    return present, applied
+def schema_state(conn=None, refresh=False):
+    """
+    {"present": {feature: bool}, "applied": frozenset of migration names}. Cached; re-read every
+    RECHECK_SECONDS so a migration run elsewhere is picked up. Pass the connection you already hold.
+    """
+    now = time.monotonic()
+    checked = _state["checked_at"]
+    if not refresh and checked is not None and now - checked < RECHECK_SECONDS:
+        return _state
+    with _lock:
+        checked = _state["checked_at"]
+        if not refresh and checked is not None and now - checked < RECHECK_SECONDS:
+            return _state
+        try:
+            if conn is None:
+                with db_pool.connection() as own:
+                    present, applied = _read(own)
+            else:
+                present, applied = _read(conn)
+            missing = _state["applied"] - applied
+            _state.update(present=present, applied=applied)
+            if missing:
+                logger.warning(f"Migrations no longer recorded: {sorted(missing)}")
+        except Exception as e:
+            logger.warning(f"Schema state check failed, keeping {sorted(_state['applied'])}: {e}")
+        _state["checked_at"] = time.monotonic()
+    return _state
+def is_applied(name, conn=None):
+    """True once migration `name` has finished (read paths switch over at that point)."""
+    return name in schema_state(conn)["applied"]
+def is_present(feature, conn=None):
+    """True when the feature's tables/columns exist, even if their backfill is still running."""
+    return bool(schema_state(conn)["present"].get(feature))
+def mark_applied(cur, name):
+    """Records migration `name` as finished."""
+    cur.execute("INSERT INTO schema_migrations (name) VALUES (%s) ON CONFLICT (name) DO UPDATE SET applied_at = now()", (name,))
+def create_index(cur, name, definition):
+    """
+    CREATE INDEX CONCURRENTLY (needs an autocommit connection). A failed concurrent build leaves an
+    INVALID index that IF NOT EXISTS would skip, so that one is dropped and rebuilt.
+    """
+    cur.execute("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s", (name,))
+    row = cur.fetchone()
+    if row and row[0]: return
+    if row:
+        logger.warning(f"Rebuilding invalid index {name}")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+def fixture_batches(cur, sql, batch=2000):
+    """
+    Runs `sql` over fixtures in id windows (`%(lo)s`..`%(hi)s`), one short transaction each on an
+    autocommit connection, so a backfill never holds row locks on the whole table. Returns rows affected.
+    """
+    cur.execute("SELECT min(id), max(id) FROM fixtures")
+    lo, hi = cur.fetchone()
+    if lo is None: return 0
+    total = 0
+    for start in range(lo, hi + 1, batch):
+        cur.execute(sql, {"lo": start, "hi": start + batch - 1})
+        total += max(cur.rowcount, 0)
+    return total
+def sqlite_is_applied(conn, name):
+    """True once migration `name` has run on this SQLite archive (a primary-key lookup, never DDL)."""
+    try:
+        return conn.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (name,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+def sqlite_mark_applied(conn, name):
+    """Records migration `name` as finished on a SQLite archive (caller commits)."""
+    conn.execute("INSERT OR REPLACE INTO schema_migrations (name, applied_at) VALUES (?, CURRENT_TIMESTAMP)", (name,))
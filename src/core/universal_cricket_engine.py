@@ -1,48 +1,38 @@
 import os
 import json
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 from openai import AsyncOpenAI
 from src.utils.utils_core import Config
 from src.utils.utils_core import get_logger
+from src.core.db_pool import db_pool, run_db, DB_CONFIG
+from src.core.schema_state import schema_state
+from src.core.fixture_columns import fixture_exprs
 
 # -------------------------------------------------------------------------
 # 🚀 ULTRA EXPERT CRICKET SQL ENGINE (PostgreSQL Optimized - LOGIC MODE)
 # -------------------------------------------------------------------------
-DB_CONFIG = {
-    "dbname": "cricket_db",
-    "user": "postgres",
-    "password": "1234",
-    "host": "localhost",
-    "port": "5432"
-}
 
 SYSTEM_PROMPT = """You are the **CRICKET SQL ARCHITECT**. Generate accurate PostgreSQL queries.
 
 ### 🏗️ SCHEMA (Tables & JSON)
-- **fixtures**: id, season_id, venue_id, name, starting_at, status, winner_team_id, raw_json.
-  - `raw_json`: `scoreboards` (list), `batting` (list), `bowling` (list), `localteam`, `visitorteam`, `venue`.
-  - **IDs**: `COALESCE((raw_json->'localteam'->>'id')::int, (raw_json->>'localteam_id')::int)`
+- **fixtures**: id, season_id, venue_id, name, starting_at, status, winner_team_id, {FIXTURE_COLUMNS}raw_json.
+  - `raw_json`: `scoreboards` (list), `batting` (list), `bowling` (list), `localteam`, `visitorteam`, `venue`.{FIXTURE_IDS}
 - **venues**: id, name, city, capacity. (Join `fixtures.venue_id = venues.id`).
 - **seasons**: id, league_id, name, year, code.
 - **leagues**: id, name, code ('IPL').
 - **teams**: id, name, code.
 - **players**: id, fullname.
-- **season_champions**: season_id, winner_team_id.
+- **season_champions**: season_id, winner_team_id.{INNINGS_TABLES}
 
 ### 🧠 LOGIC KERNEL
 1. **Basics**: JOIN `leagues`->`seasons`->`fixtures`. Join `venues` if location/stadium is requested.
 2. **Winners**: `season_champions` (Season), `fixtures.winner_team_id` (Match).
-3. **✨ AWARDS (Dynamic Calculation)**:
-   - **Orange Cap**: `SUM((x->>'score')::int)` from `raw_json->'batting'`. Order DESC. **Tie-Break**: Higher SR.
-   - **Purple Cap**: `SUM((x->>'wickets')::int)` from `raw_json->'bowling'`. Order DESC. **Tie-Break**: Lower Eco.
+3. **✨ AWARDS (Dynamic Calculation)**:{AWARDS}
 4. **📊 POINTS TABLE**:
    - **Formula**: `(Wins * 2) + (No Result * 1)`.
    - **Query**: agg wins/NR from `fixtures`. Order by Points DESC.
-5. **⚡ PHASE ANALYSIS (Wickets)**:
-   - **Powerplay**: `(bat->>'fow_balls')::float < 6.0`.
-   - **Death**: `(bat->>'fow_balls')::float >= 16.0`.
+5. **⚡ PHASE ANALYSIS (Wickets)**:{PHASE}
    - **Rate**: `Count(Wickets) / Count(Matches)`.
 6. **📈 AGGREGATE SCORES & RECORDS (CRITICAL)**:
    - **Default**: For "Lowest Total" or "Lowest Score", prioritize **Individual Team Innings Scores**.
@@ -53,7 +43,7 @@ SYSTEM_PROMPT = """You are the **CRICKET SQL ARCHITECT**. Generate accurate Post
 
 ### ⛔ RULES
 - **No Hallucinations**: Don't invent specific columns not listed.
-- **JSON**: Use `jsonb_array_elements`. `COALESCE` nulls.
+{NAMES_RULE}- **JSON**: {JSON_RULE} `COALESCE` nulls.
 - **Record Integrity**: For any "lowest/highest" query, ALWAYS filter for `status = 'Finished'`.
 
 ### 📝 FORMAT
@@ -65,6 +55,44 @@ SYSTEM_PROMPT = """You are the **CRICKET SQL ARCHITECT**. Generate accurate Post
 SELECT ...
 ```
 """
+# Prompt sections per optional migration: (migrated, not yet migrated). Chosen per query by `system_prompt`.
+_PROMPT_SECTIONS = {
+    "fixture_columns": {
+        "FIXTURE_COLUMNS": ("localteam_id, visitorteam_id, match_date (DATE), format ('T20', 'ODI', 'Test/5day'...), ", ""),
+        "FIXTURE_IDS": ("""
+  - **IDs**: use the indexed columns `f.localteam_id` / `f.visitorteam_id` (join `teams`), never `raw_json->'localteam'`.
+  - **Dates**: filter on `f.match_date` (`= 'YYYY-MM-DD'` or a `>=`/`<` range for a year), not `starting_at::date` or `EXTRACT(YEAR ...)`. Indexed with team, season and venue.""", """
+  - **IDs**: `COALESCE((raw_json->'localteam'->>'id')::int, (raw_json->>'localteam_id')::int)`""")
+    },
+    "fuzzy_trgm": {
+        "NAMES_RULE": ("""- **Names**: `ILIKE '%x%'` on players.fullname, teams.name, leagues.name, seasons.name, venues.name and fixtures.name is trigram-indexed. For misspelled names rank with `similarity(col, 'x')` DESC.
+""", "")
+    },
+    "innings": {
+        "INNINGS_TABLES": ("""
+- **batting_innings**: fixture_id, player_id, scoreboard ('S1','S2'..), season_id, team_id, runs, balls, fours, sixes, strike_rate, dismissed (bool), fow_balls. One row per player per innings. Indexed on (player_id, season_id) and (season_id, player_id).
+- **bowling_innings**: fixture_id, player_id, scoreboard, season_id, team_id, overs, maidens, runs_conceded, wickets, economy. Same indexes.""", ""),
+        "AWARDS": ("""
+   - **Orange Cap**: `SUM(bi.runs)` from `batting_innings bi` filtered on `bi.season_id`, `GROUP BY bi.player_id`, join `players`. Order DESC. **Tie-Break**: Higher SR (`SUM(runs)*100.0/NULLIF(SUM(balls),0)`).
+   - **Purple Cap**: `SUM(bo.wickets)` from `bowling_innings bo` filtered on `bo.season_id`, `GROUP BY bo.player_id`, join `players`. Order DESC. **Tie-Break**: Lower `SUM(runs_conceded)/SUM(overs)`.
+   - **Any per-player batting/bowling stat**: use `batting_innings` / `bowling_innings`, NOT `jsonb_array_elements(raw_json->'batting'/'bowling')`.""", """
+   - **Orange Cap**: `SUM((x->>'score')::int)` from `raw_json->'batting'`. Order DESC. **Tie-Break**: Higher SR.
+   - **Purple Cap**: `SUM((x->>'wickets')::int)` from `raw_json->'bowling'`. Order DESC. **Tie-Break**: Lower Eco."""),
+        "PHASE": ("""
+   - **Powerplay**: `batting_innings.dismissed AND fow_balls < 6.0`.
+   - **Death**: `batting_innings.dismissed AND fow_balls >= 16.0`.""", """
+   - **Powerplay**: `(bat->>'fow_balls')::float < 6.0`.
+   - **Death**: `(bat->>'fow_balls')::float >= 16.0`."""),
+        "JSON_RULE": ("Use `jsonb_array_elements` only for data not in the innings tables (e.g. `scoreboards`).", "Use `jsonb_array_elements`.")
+    }
+}
+def system_prompt(applied):
+    """SYSTEM_PROMPT describing only the tables/columns whose migration has run (`applied`: migration names)."""
+    parts = {}
+    for migration, sections in _PROMPT_SECTIONS.items():
+        for key, (migrated, legacy) in sections.items():
+            parts[key] = migrated if migration in applied else legacy
+    return SYSTEM_PROMPT.format(**parts)
 
 
 def _process_raw_json_results(rows):
@@ -148,10 +176,11 @@ class UniversalCricketEngine:
     async def generate_sql(self, user_query, context=""):
         current_date = datetime.now().strftime("%Y-%m-%d")
         prompt = f"System Date: {current_date}\nUser Query: {user_query}\nContext: {context}\nGenerate the best PostgreSQL query."
+        applied = (await run_db(schema_state))["applied"]
         response = await self.client.chat.completions.create(
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "system", "content": system_prompt(applied)},
                 {"role": "user", "content": prompt}
             ],
             temperature=0
@@ -187,30 +216,33 @@ class UniversalCricketEngine:
                 import re
                 sql = re.sub(r"([a-z0-9_]+\.)?raw_json\s*->\s*['\"]scorecard['\"]", r"\1raw_json", sql, flags=re.IGNORECASE)
 
-        # GUARDRAIL: Ensure robust team identification (COALESCE)
+        # GUARDRAIL: Ensure robust team identification (team id columns once migrated, COALESCE before)
         if "JOIN teams t_local" in sql or "JOIN teams t_visitor" in sql:
             import re
+            cols = fixture_exprs("fixture_columns" in applied)
             # Much more robust regex: catches any alias, any spacing
             old_local = r"JOIN teams t_local ON \([a-z0-9_.]+\s*->\s*'localteam'\s*->>\s*'id'\)::int\s*=\s*t_local\.id"
             if re.search(old_local, sql, re.IGNORECASE):
-                logger.info("🛡️ GUARDRAIL: Old localteam JOIN detected. Injecting COALESCE...")
-                sql = re.sub(old_local, "JOIN teams t_local ON COALESCE((f.raw_json->'localteam'->>'id')::int, (f.raw_json->>'localteam_id')::int) = t_local.id", sql, flags=re.IGNORECASE)
+                logger.info("🛡️ GUARDRAIL: Old localteam JOIN detected. Normalizing the team id...")
+                sql = re.sub(old_local, f"JOIN teams t_local ON {cols['local']} = t_local.id", sql, flags=re.IGNORECASE)
             
             old_visitor = r"JOIN teams t_visitor ON \([a-z0-9_.]+\s*->\s*'visitorteam'\s*->>\s*'id'\)::int\s*=\s*t_visitor\.id"
             if re.search(old_visitor, sql, re.IGNORECASE):
-                logger.info("🛡️ GUARDRAIL: Old visitorteam JOIN detected. Injecting COALESCE...")
-                sql = re.sub(old_visitor, "JOIN teams t_visitor ON COALESCE((f.raw_json->'visitorteam'->>'id')::int, (f.raw_json->>'visitorteam_id')::int) = t_visitor.id", sql, flags=re.IGNORECASE)
+                logger.info("🛡️ GUARDRAIL: Old visitorteam JOIN detected. Normalizing the team id...")
+                sql = re.sub(old_visitor, f"JOIN teams t_visitor ON {cols['visitor']} = t_visitor.id", sql, flags=re.IGNORECASE)
 
         return sql
 
     async def execute_query(self, sql):
+        # psycopg2 blocks: run on the DB executor so LLM/API calls in flight keep progressing
+        return await run_db(self._execute_blocking, sql)
+
+    def _execute_blocking(self, sql):
         try:
-            conn = psycopg2.connect(**self.config)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute(sql)
-            results = cur.fetchall()
-            cur.close()
-            conn.close()
+            with db_pool.connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(sql)
+                    results = cur.fetchall()
             
             # Handle datetime serialization
             for row in results:
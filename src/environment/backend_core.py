@@ -1,153 +1,351 @@
 import os
+import re
 import json
 import httpx
 import asyncio
 import hashlib
-from datetime import datetime
-from src.utils.utils_core import get_logger
+import threading
+from src.utils.utils_core import get_logger, Config
+from src.utils.response_cache import ResponseCache
+from src.utils.single_flight import SingleFlight
+from src.utils.disk_cache import DiskCache
+from src.utils.background_loop import submit
+from src.utils.http_client_pool import http_pool
+from src.utils.rate_limiter import sportmonks_limiter, endpoint_family, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from src.utils.circuit_breaker import sportmonks_breakers
+from src.utils.include_sets import IncludeIndex, parse_includes, project
+from src.utils.ttl_policy import AUTO, fixture_state, ttl_for_fixture, ttl_for_payload
+from src.environment.live_state import match_view
 logger = get_logger("backend_core", "general_app.log")
-_CACHE = {}
-SPORTMONKS_BASE = "https://cricket.sportmonks.com/api/v2.0"
-_CLIENT = None
-_LOOP_REF = None
+_CACHE = ResponseCache(
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    max_bytes=Config.CACHE_MAX_MB * 1024 * 1024,
+    sweep_interval=Config.CACHE_SWEEP_SECONDS
+)
+_INFLIGHT = SingleFlight()
+_DISK_CACHE = DiskCache(Config.DISK_CACHE_PATH) if Config.DISK_CACHE_PATH else None
+_INCLUDES = IncludeIndex(max_resources=Config.CACHE_MAX_ENTRIES)
+# Single-resource endpoints whose include= variants can be answered from a cached superset
+_SUPERSET_ENDPOINT = re.compile(r"^/fixtures/\d+$")
+_REVALIDATING = set()
+_REVALIDATE_LOCK = threading.Lock()
+SPORTMONKS_BASE = Config.SPORTMONKS_BASE_URL
 def _get_cache_key(endpoint, params):
     param_str = json.dumps(params or {}, sort_keys=True, default=str)
     return hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
 def _get_from_cache(cache_key, ttl=300):
-    if cache_key in _CACHE:
-        cached_data, timestamp = _CACHE[cache_key]
-        if (datetime.now() - timestamp).total_seconds() < ttl:
-            return cached_data
-        del _CACHE[cache_key]
+    return _CACHE.get(cache_key, ttl)
+def _save_to_cache(cache_key, data, ttl=300):
+    # Entries are kept past their TTL so an outage can still be answered from cache (see _lookup_stale)
+    keep = ttl + Config.STALE_IF_ERROR_SECONDS
+    _CACHE.set(cache_key, data, keep)
+    if _DISK_CACHE:
+        try:
+            asyncio.get_running_loop().run_in_executor(None, _DISK_CACHE.set, cache_key, data, keep)
+        except RuntimeError:
+            _DISK_CACHE.set(cache_key, data, keep)
+def _store_result(cache_key, result, ttl, stale_ttl=0):
+    """Caches a successful response. With ttl=AUTO the freshness comes from the fixtures in it (see ttl_policy)."""
+    fresh_for = ttl
+    if ttl == AUTO:
+        fresh_for = ttl_for_payload(result.get("data"))
+        result = {**result, "cache_ttl": fresh_for}
+    _save_to_cache(cache_key, result, fresh_for + stale_ttl)
+    return result
+async def _lookup_cache(cache_key, max_age):
+    """
+    Memory then disk lookup. Returns (data, age_seconds); disk hits are promoted into memory.
+    `max_age=None` accepts any retained entry (callers then check the entry's own "cache_ttl").
+    """
+    hit = _CACHE.get_with_age(cache_key, max_age)
+    if hit or not _DISK_CACHE: return hit
+    loop = asyncio.get_running_loop()
+    hit = await loop.run_in_executor(None, _DISK_CACHE.get, cache_key, max_age if max_age is not None else float("inf"))
+    if hit:
+        keep = max_age if max_age is not None else (hit[0] or {}).get("cache_ttl", 0)
+        _CACHE.set(cache_key, hit[0], keep + Config.STALE_IF_ERROR_SECONDS, age=hit[1])
+    return hit
+def _resource_key(endpoint, params):
+    return _get_cache_key(f"sm:{endpoint}", {k: v for k, v in params.items() if k != "include"})
+async def _lookup_superset(endpoint, params, max_age):
+    """
+    Answers an include= request from a cached response fetched with a superset of its includes,
+    e.g. getMatchInfo from a cached getMatchScorecard. Returns ((data, age), (params, cache_key)) or None.
+    """
+    base_key = _resource_key(endpoint, params)
+    requested = parse_includes(params.get("include"))
+    for key, include, tokens in _INCLUDES.find(base_key, params.get("include")):
+        hit = await _lookup_cache(key, max_age)
+        if not hit:
+            if not _CACHE.peek(key): _INCLUDES.forget(base_key, key)
+            continue
+        cached, age = hit
+        if not cached: continue
+        _INCLUDES.record_hit()
+        projected = {**cached, "data": project(cached.get("data"), tokens, requested)}
+        return (projected, age), ({**params, "include": include}, key)
     return None
-def _save_to_cache(cache_key, data):
-    _CACHE[cache_key] = (data, datetime.now())
-async def _get_client():
-    global _CLIENT, _LOOP_REF
+async def _lookup_stale(cache_key):
+    """Any retained copy regardless of freshness; served when SportMonks is failing."""
+    hit = _CACHE.get_with_age(cache_key, None)
+    if hit or not _DISK_CACHE: return hit
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _DISK_CACHE.get, cache_key, float("inf"))
+def _schedule_revalidation(endpoint, params, sm_key, cache_key, ttl, stale_ttl):
+    """Starts at most one background refresh per cache key on the shared background loop."""
+    with _REVALIDATE_LOCK:
+        if cache_key in _REVALIDATING: return
+        _REVALIDATING.add(cache_key)
+    logger.info(f"Serving stale {endpoint}, revalidating in background")
+    submit(_revalidate(endpoint, dict(params), sm_key, cache_key, ttl, stale_ttl))
+async def _revalidate(endpoint, params, sm_key, cache_key, ttl, stale_ttl):
     try:
-        current_loop = asyncio.get_running_loop()
-    except RuntimeError:
-        return httpx.AsyncClient(timeout=10.0)
-    if _CLIENT is None or _CLIENT.is_closed or _LOOP_REF != current_loop:
-        _CLIENT = httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=20))
-        _LOOP_REF = current_loop
-    return _CLIENT
-async def sportmonks_cric(endpoint, params=None, use_cache=True, ttl=60, **kwargs):
-    params = params or {}
-    sm_key = os.getenv("SPORTMONKS_API_KEY")
-    if not sm_key: return {"ok": False, "error": "API Key Missing"}
-    if kwargs.get("force_api"):
-        use_cache = False
-    cache_key = _get_cache_key(f"sm:{endpoint}", params)
-    if use_cache:
-        cached = _get_from_cache(cache_key, ttl)
-        if cached: return cached
-    params["api_token"] = sm_key
-    client = await _get_client()
+        result = await _INFLIGHT.run(cache_key, lambda: _request_sportmonks(endpoint, params, sm_key, PRIORITY_BACKGROUND))
+        if result.get("ok") and not result.get("warning"):
+            _store_result(cache_key, result, ttl, stale_ttl)
+        else:
+            logger.warning(f"Background revalidation of {endpoint} failed: {result.get('error')}")
+    except Exception as e:
+        logger.error(f"Background revalidation error on {endpoint}: {e}")
+    finally:
+        with _REVALIDATE_LOCK:
+            _REVALIDATING.discard(cache_key)
+def get_cache_stats():
+    """Hit/miss/eviction counters and current size of the SportMonks response cache."""
+    stats = {**_CACHE.get_stats(), "single_flight": _INFLIGHT.get_stats(), "include_supersets": _INCLUDES.get_stats()}
+    if _DISK_CACHE: stats["disk"] = _DISK_CACHE.get_stats()
+    stats["http_pool"] = http_pool.get_stats()
+    stats["quota"] = sportmonks_limiter.get_quota_status()
+    stats["breakers"] = sportmonks_breakers.get_status()
+    return stats
+# Longest a request waits for a rate-limit token before failing locally, per lane
+_MAX_TOKEN_WAIT = {"interactive": 15, "live": 30, "background": 120}
+async def _limited_get(endpoint, query, timeout, priority=PRIORITY_INTERACTIVE):
+    """Pooled GET that first takes a token from the shared SportMonks rate limiter. Returns None if none came in time."""
+    if not await sportmonks_limiter.acquire(priority, endpoint, max_wait=_MAX_TOKEN_WAIT.get(priority)):
+        return None
+    r = await http_pool.get(f"{SPORTMONKS_BASE}{endpoint}", params=query, timeout=timeout)
+    if r.status_code == 429:
+        sportmonks_limiter.penalize(r.headers.get("Retry-After"))
+    return r
+_RATE_LIMITED = {"ok": False, "status": 429, "error": "Rate limited locally (SportMonks quota protection)"}
+def _is_upstream_failure(result):
+    """Timeouts, connection errors and 5xx count against the breaker; 4xx and throttling do not."""
+    status = result.get("status") or 0
+    return not result.get("ok") and (status == 0 or status >= 500)
+async def _guarded(endpoint, request_fn):
+    """Runs `request_fn` through the circuit breaker of the endpoint family; fails fast while it is open."""
+    breaker = sportmonks_breakers.get(endpoint_family(endpoint))
+    if not breaker.allow():
+        return {"ok": False, "status": 503, "circuit_open": True,
+                "error": f"SportMonks unavailable for {breaker.name}, retrying in {breaker.retry_in():.0f}s"}
+    try:
+        result = await request_fn()
+    except BaseException:
+        breaker.release()
+        raise
+    if _is_upstream_failure(result):
+        breaker.record_failure()
+    elif result.get("status") == 429:
+        breaker.release()
+    else:
+        breaker.record_success()
+    return result
+async def _request_sportmonks(endpoint, params, sm_key, priority=PRIORITY_INTERACTIVE):
+    return await _guarded(endpoint, lambda: _fetch_sportmonks(endpoint, params, sm_key, priority))
+async def _fetch_sportmonks(endpoint, params, sm_key, priority=PRIORITY_INTERACTIVE):
+    query = {**params, "api_token": sm_key}
     timeout = httpx.Timeout(45.0, connect=10.0)
     try:
-        r = await client.get(f"{SPORTMONKS_BASE}{endpoint}", params=params, timeout=timeout)
+        r = await _limited_get(endpoint, query, timeout, priority)
+        if r is None:
+            return dict(_RATE_LIMITED)
         if r.status_code == 200:
-            result = {"ok": True, "status": 200, "data": r.json().get("data", [])}
-            if use_cache: _save_to_cache(cache_key, result)
+            body = r.json()
+            result = {"ok": True, "status": 200, "data": body.get("data", [])}
+            if body.get("meta"): result["meta"] = body["meta"]  # pagination info for listings
             return result
-        if r.status_code >= 500 and "include" in params:
+        if r.status_code >= 500 and "include" in query:
              logger.warning(f"Complex API call failed ({r.status_code}), retrying with simplified query...")
-             simple_params = params.copy()
+             simple_params = query.copy()
              del simple_params["include"]
-             r2 = await client.get(f"{SPORTMONKS_BASE}{endpoint}", params=simple_params, timeout=timeout)
-             if r2.status_code == 200:
+             r2 = await _limited_get(endpoint, simple_params, timeout, priority)
+             if r2 is not None and r2.status_code == 200:
                   return {"ok": True, "status": 200, "data": r2.json().get("data", []), "warning": "Simplified data"}
         return {"ok": False, "status": r.status_code, "error": r.text[:200]}
     except (httpx.TimeoutException, httpx.NetworkError) as e:
         logger.error(f"API Connection Error on {endpoint}: {e}")
-        if "include" in params:
+        if "include" in query:
              try:
-                 simple_params = params.copy()
+                 simple_params = query.copy()
                  del simple_params["include"]
-                 r2 = await client.get(f"{SPORTMONKS_BASE}{endpoint}", params=simple_params, timeout=timeout)
-                 if r2.status_code == 200:
+                 r2 = await _limited_get(endpoint, simple_params, timeout, priority)
+                 if r2 is not None and r2.status_code == 200:
                       return {"ok": True, "status": 200, "data": r2.json().get("data", []), "warning": "Simplified data after timeout"}
              except: pass
         return {"ok": False, "status": 0, "error": str(e)}
     except Exception as e:
         return {"ok": False, "status": 0, "error": str(e)}
+async def sportmonks_cric(endpoint, params=None, use_cache=True, ttl=60, stale_ttl=0, priority=PRIORITY_INTERACTIVE, **kwargs):
+    """
+    Cached SportMonks GET. `ttl=AUTO` picks the TTL from the fixtures' status (finished
+    fixtures are kept indefinitely, live ones for seconds). With `stale_ttl`, an entry older
+    than its TTL but within TTL + `stale_ttl` is returned immediately while one background
+    task refreshes it.
+    `priority` selects the rate-limiter lane (interactive, live or background).
+    If SportMonks is down or the circuit is open, any retained copy is served with "stale": True.
+    """
+    params = params or {}
+    sm_key = os.getenv("SPORTMONKS_API_KEY")
+    if not sm_key: return {"ok": False, "error": "API Key Missing"}
+    if kwargs.get("force_api"):
+        use_cache = False
+    cache_key = _get_cache_key(f"sm:{endpoint}", params)
+    auto = ttl == AUTO
+    superset_ok = bool(_SUPERSET_ENDPOINT.match(endpoint) and params.get("include"))
+    if use_cache:
+        max_age = None if auto else ttl + stale_ttl
+        hit = await _lookup_cache(cache_key, max_age)
+        source = (params, cache_key)
+        if not (hit and hit[0]) and superset_ok:
+            found = await _lookup_superset(endpoint, params, max_age)
+            if found: hit, source = found
+        if hit and hit[0]:
+            cached, age = hit
+            fresh_for = cached.get("cache_ttl", 0) if auto else ttl
+            if age < fresh_for + stale_ttl:
+                if age >= fresh_for:
+                    _schedule_revalidation(endpoint, source[0], sm_key, source[1], ttl, stale_ttl)
+                return cached
+    async def fetch():
+        result = await _request_sportmonks(endpoint, params, sm_key, priority)
+        if use_cache and result.get("ok") and not result.get("warning"):
+            result = _store_result(cache_key, result, ttl, stale_ttl)
+            if superset_ok:
+                _INCLUDES.register(_resource_key(endpoint, params), params["include"], cache_key)
+        return result
+    # Identical concurrent requests (same endpoint + params) share one HTTP call; only the leader stores it
+    result = await _INFLIGHT.run(cache_key, fetch)
+    if use_cache and (_is_upstream_failure(result) or result.get("status") == 429):
+        stale = await _lookup_stale(cache_key)
+        if stale and stale[0]:
+            logger.warning(f"Serving stale {endpoint} ({stale[1]:.0f}s old): {result.get('error')}")
+            return {**stale[0], "stale": True}
+    return result
 
+def _last_page(meta):
+    """Last page number from SportMonks listing meta (Laravel style or nested `pagination`), if present."""
+    if not isinstance(meta, dict): return None
+    pagination = meta.get("pagination") if isinstance(meta.get("pagination"), dict) else meta
+    last = pagination.get("last_page") or pagination.get("total_pages")
+    try:
+        return int(last) if last is not None else None
+    except (TypeError, ValueError):
+        return None
+async def iter_sportmonks_pages(endpoint, params=None, per_page=100, max_pages=None, prefetch=1, priority=PRIORITY_BACKGROUND, **kwargs):
+    """
+    Async generator over a paged SportMonks listing, yielding one sportmonks_cric result per page
+    (with an added "page" number). Up to `prefetch` following pages are requested while the caller
+    processes the current one, so at most prefetch + 1 pages are held in memory. Stops after the
+    last page, after `max_pages`, or after yielding a failed page (check `page["ok"]`).
+    """
+    params = dict(params or {})
+    kwargs.setdefault("use_cache", False)
+    def fetch(page):
+        return asyncio.ensure_future(sportmonks_cric(endpoint, {**params, "page": page, "per_page": per_page}, priority=priority, **kwargs))
+    pending = [(1, fetch(1))]
+    next_page = 2
+    last_page = None
+    try:
+        while pending:
+            page, task = pending.pop(0)
+            res = await task
+            res = {**res, "page": page}
+            data = res.get("data") or []
+            if res.get("ok"):
+                last_page = _last_page(res.get("meta")) or last_page
+                if last_page is None and len(data) < per_page:
+                    last_page = page
+                # Without meta, only speculate one page ahead; with it, keep `prefetch` requests in flight
+                ahead = prefetch if last_page else min(prefetch, 1)
+                while len(pending) < ahead and (last_page is None or next_page <= last_page) and (max_pages is None or next_page <= max_pages):
+                    pending.append((next_page, fetch(next_page)))
+                    next_page += 1
+                if not data:
+                    # An empty page past the end carries nothing for the caller
+                    if page > 1: break
+            else:
+                for _, t in pending: t.cancel()
+                pending = []
+            yield res
+    finally:
+        for _, t in pending:
+            t.cancel()
 async def getSeries(search=None, **kwargs):
     params = {"search": search} if search else {}
+    kwargs.setdefault("stale_ttl", 6 * 3600)
     return await sportmonks_cric("/leagues", params, **kwargs)
 async def _fetch_fixtures_from_db(season_id):
+    from src.core.db_pool import run_db
+    return await run_db(_fetch_fixtures_from_db_blocking, season_id)
+def _fetch_fixtures_from_db_blocking(season_id):
     try:
-        import psycopg2
         from psycopg2.extras import RealDictCursor
-        DB_CONFIG = {
-            "dbname": "cricket_db",
-            "user": "postgres",
-            "password": "1234",
-            "host": "localhost",
-            "port": "5432"
-        }
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        from src.core.db_pool import db_pool
+        with db_pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # 1. Fetch Fixtures (No Join on team IDs as columns might be missing)
+            cur.execute("""
+                SELECT 
+                    f.raw_json, 
+                    f.status, f.winner_team_id, f.name, f.starting_at
+                FROM fixtures f
+                WHERE f.season_id = %s
+                ORDER BY f.starting_at DESC
+            """, (str(season_id),))
         
-        # 1. Fetch Fixtures (No Join on team IDs as columns might be missing)
-        cur.execute("""
-            SELECT 
-                f.raw_json, 
-                f.status, f.winner_team_id, f.name, f.starting_at
-            FROM fixtures f
-            WHERE f.season_id = %s
-            ORDER BY f.starting_at DESC
-        """, (str(season_id),))
+            rows = cur.fetchall()
         
-        rows = cur.fetchall()
-        
-        if not rows:
-            cur.close()
-            conn.close()
-            return None
+            if not rows:
+                return None
             
-        # 2. Collect Team IDs
-        team_ids = set()
-        matches = []
-        for r in rows:
-            data = r.get("raw_json")
-            if isinstance(data, str):
-                try: data = json.loads(data)
-                except: data = {}
-            if not data: data = {}
+            # 2. Collect Team IDs
+            team_ids = set()
+            matches = []
+            for r in rows:
+                data = r.get("raw_json")
+                if isinstance(data, str):
+                    try: data = json.loads(data)
+                    except: data = {}
+                if not data: data = {}
             
-            # Enrich basic
-            data['id'] = data.get('id') or r.get('id')
-            data['status'] = r['status']
-            data['winner_team_id'] = r['winner_team_id']
-            data['name'] = r['name']
-            data['starting_at'] = str(r['starting_at']).replace(" ", "T")
+                # Enrich basic
+                data['id'] = data.get('id') or r.get('id')
+                data['status'] = r['status']
+                data['winner_team_id'] = r['winner_team_id']
+                data['name'] = r['name']
+                data['starting_at'] = str(r['starting_at']).replace(" ", "T")
             
-            # Find team IDs
-            tid1 = data.get('localteam_id')
-            tid2 = data.get('visitorteam_id')
+                # Find team IDs
+                tid1 = data.get('localteam_id')
+                tid2 = data.get('visitorteam_id')
             
-            # Fallback: check runs/scoreboards if ids missing
-            if not tid1 or not tid2:
-                 # Try to deduce from runs?
-                 pass
+                # Fallback: check runs/scoreboards if ids missing
+                if not tid1 or not tid2:
+                     # Try to deduce from runs?
+                     pass
             
-            if tid1: team_ids.add(tid1)
-            if tid2: team_ids.add(tid2)
+                if tid1: team_ids.add(tid1)
+                if tid2: team_ids.add(tid2)
             
-            matches.append(data)
+                matches.append(data)
 
-        # 3. Fetch Team Names
-        team_map = {}
-        if team_ids:
-            cur.execute("SELECT id, name, code FROM teams WHERE id IN %s", (tuple(team_ids),))
-            t_rows = cur.fetchall()
-            for tr in t_rows:
-                team_map[tr['id']] = {"id": tr['id'], "name": tr['name'], "code": tr['code']}
-        
-        cur.close()
-        conn.close()
+            # 3. Fetch Team Names
+            team_map = {}
+            if team_ids:
+                cur.execute("SELECT id, name, code FROM teams WHERE id IN %s", (tuple(team_ids),))
+                t_rows = cur.fetchall()
+                for tr in t_rows:
+                    team_map[tr['id']] = {"id": tr['id'], "name": tr['name'], "code": tr['code']}
         
         # 4. Enrich Matches
         results = []
@@ -191,44 +389,118 @@ async def getSeriesInfo(series_id, includes=None, **kwargs):
         "data": {"info": info.get("data"), "matchList": [m for m in fixtures.get("data", [])]}
     }
 async def getMatchScorecard(match_id, **kwargs):
+    kwargs.setdefault("ttl", AUTO)
     return await sportmonks_cric(f"/fixtures/{match_id}", {"include": "localteam,visitorteam,runs,scoreboards,venue,manofmatch,batting,bowling"}, **kwargs)
 async def getMatchInfo(match_id, **kwargs):
+    kwargs.setdefault("ttl", AUTO)
     return await sportmonks_cric(f"/fixtures/{match_id}", {"include": "localteam,visitorteam,venue,manofmatch"}, **kwargs)
 async def getMatchSquad(match_id, **kwargs):
+    kwargs.setdefault("ttl", AUTO)
     return await sportmonks_cric(f"/fixtures/{match_id}", {"include": "lineup"}, **kwargs)
 async def getMatchCommentary(match_id, **kwargs):
+    kwargs.setdefault("ttl", AUTO)
     return await sportmonks_cric(f"/fixtures/{match_id}", {"include": "balls"}, **kwargs)
+# Views served by getMatchBundle, with the include list each single-view getter uses
+_BUNDLE_PARTS = {
+    "scorecard": "localteam,visitorteam,runs,scoreboards,venue,manofmatch,batting,bowling",
+    "info": "localteam,visitorteam,venue,manofmatch",
+    "squad": "lineup",
+    "commentary": "balls"
+}
+_BUNDLE_TTL = {"scorecard": 15, "info": 15, "squad": 60, "commentary": 5}
+def _part_key(match_id, relation):
+    return _get_cache_key(f"sm:/fixtures/{match_id}#{relation}", {})
+async def getMatchBundle(match_id, parts=None, ttls=None, use_cache=True, priority=PRIORITY_INTERACTIVE):
+    """
+    Several /fixtures/{id} views from one request.
+    Every relation (balls, lineup, batting, ...) is cached on its own with the shortest TTL
+    of the views that need it (or the finished-fixture TTL once the match is over), and only
+    expired relations are re-fetched, in a single call with the union of their includes. Returns {part: {"ok", "status", "data"}} shaped like
+    getMatchScorecard / getMatchInfo / getMatchSquad / getMatchCommentary.
+    """
+    parts = [p for p in (parts or _BUNDLE_PARTS) if p in _BUNDLE_PARTS]
+    if not parts: return {}
+    part_ttl = {**_BUNDLE_TTL, **(ttls or {})}
+    need = {}
+    for part in parts:
+        for token in parse_includes(_BUNDLE_PARTS[part]):
+            need[token] = min(need.get(token, part_ttl[part]), part_ttl[part])
+    base_ttl = min(part_ttl[p] for p in parts)
+    pieces = {}
+    if use_cache:
+        for relation, ttl in [("#base", base_ttl)] + list(need.items()):
+            hit = await _lookup_cache(_part_key(match_id, relation), None)
+            # Pieces of a finished fixture carry the (long) policy TTL and stay fresh
+            if hit and hit[0] and hit[1] < max(ttl, hit[0].get("cache_ttl", 0)):
+                pieces[relation] = hit[0]["v"]
+    missing = sorted(t for t in need if t not in pieces)
+    error = None
+    if missing or "#base" not in pieces:
+        params = {"include": ",".join(missing)} if missing else {}
+        res = await sportmonks_cric(f"/fixtures/{match_id}", params, use_cache=False, priority=priority)
+        data = res.get("data") if res.get("ok") and not res.get("warning") else None
+        if isinstance(data, dict):
+            relations = {t.split(".")[0] for t in need}
+            final_ttl = ttl_for_fixture(data) if fixture_state(data) in ("finished", "abandoned") else 0
+            def store(relation, value, ttl):
+                entry = {"v": value, "cache_ttl": final_ttl} if final_ttl else {"v": value}
+                _save_to_cache(_part_key(match_id, relation), entry, max(ttl, final_ttl))
+            pieces["#base"] = {k: v for k, v in data.items() if k not in relations}
+            store("#base", pieces["#base"], base_ttl)
+            for token in missing:
+                pieces[token] = data.get(token.split(".")[0])
+                store(token, pieces[token], need[token])
+        else:
+            error = res.get("error") or res.get("warning") or "Fixture not found"
+            # Outage: fall back to whatever expired pieces are still retained (memory, then the disk tier)
+            for relation in ["#base"] + missing:
+                if relation in pieces: continue
+                stale = await _lookup_cache(_part_key(match_id, relation), None)
+                if stale and stale[0]:
+                    pieces[relation] = stale[0]["v"]
+    bundle = {}
+    for part in parts:
+        tokens = parse_includes(_BUNDLE_PARTS[part])
+        if "#base" not in pieces or any(t not in pieces for t in tokens):
+            bundle[part] = {"ok": False, "status": 0, "error": error or "Incomplete bundle"}
+            continue
+        data = {**pieces["#base"], **{t.split(".")[0]: pieces[t] for t in tokens}}
+        bundle[part] = {"ok": True, "status": 200, "data": data}
+        if error: bundle[part]["stale"] = True
+    return bundle
 async def getMatchPoints(match_id, **kwargs):
     return {"ok": False, "error": "Not implemented"}
 async def getPlayers(search=None, **kwargs):
     params = {"filter[lastname]": search} if search else {}
     return await sportmonks_cric("/players", params, **kwargs)
 async def getStandings(series_id, **kwargs):
+    kwargs.setdefault("stale_ttl", 1800)
     return await sportmonks_cric(f"/standings/season/{series_id}", {}, **kwargs)
 async def get_upcoming_matches(**kwargs):
     from src.environment.upcoming_service import get_upcoming_matches as svc_upcoming
     return await svc_upcoming(**kwargs)
 async def getCurrentMatches(**kwargs):
-    from src.environment.live_match_service import fetch_realtime_matches
-    from src.core.current_season_service import get_todays_matches_full, get_matches_by_date
+    from src.environment.today_board import get_today_board
+    from src.core.current_season_service import get_matches_by_date
     date_query = kwargs.get("date")
     team_query = kwargs.get("team") or kwargs.get("team_a")
     if date_query:
         logger.info(f"Fetching matches for specific date: {date_query} (Team: {team_query})")
         return await get_matches_by_date(date_query, team_name=team_query)
-    live = await fetch_realtime_matches()
-    today = await get_todays_matches_full()
-    combined = live + today.get("data", [])
-    seen = set()
-    unique = []
-    for m in combined:
-        if m["id"] not in seen:
-            unique.append(m)
-            seen.add(m["id"])
-    return {"ok": True, "data": unique}
+    # Live + today's fixtures come from the shared background snapshot, not per-message API calls
+    try:
+        board = await get_today_board()
+    except Exception as e:
+        return {"ok": False, "error": str(e), "data": []}
+    return {"ok": True, "data": [match_view(m) for m in board.current_matches()], **board.freshness()}
 async def getTodayMatches(**kwargs):
-    from src.core.current_season_service import get_todays_matches_full
-    return await get_todays_matches_full()
+    from src.environment.today_board import get_today_board
+    try:
+        board = await get_today_board()
+    except Exception as e:
+        return {"ok": False, "error": str(e), "data": []}
+    data = board.today_matches()
+    return {"ok": True, "date": board.date, "count": len(data), "data": data, **board.freshness()}
 async def get_live_matches(**kwargs): return await getCurrentMatches(**kwargs)
 
 async def get_series_matches_by_id(series_id, **kwargs):
@@ -0,0 +1,160 @@
+import time
+import threading
+from collections import OrderedDict, deque
+from src.utils.utils_core import get_logger
+from src.utils.ttl_policy import AUTO, fixture_state
+from src.utils.ball_events import BallEvent, BallColumns, max_overs_for
+from src.environment.backend_core import sportmonks_cric
+logger = get_logger("ball_events", "LIVE_COMMENTARY.log")
+BALL_INCLUDES = "balls,runs,batting,bowling,localteam,visitorteam"
+_MAX_STORES = 64
+_STORES = OrderedDict()
+_STORES_LOCK = threading.Lock()
+def _order(event):
+    """Match order of a delivery: innings, over, ball, then event id (a wide precedes the re-bowled ball)."""
+    return (event.innings, event.over, event.ball, event.event_id if isinstance(event.event_id, int) else -1)
+class BallEventStore:
+    """
+    Ball-by-ball state of one match, built incrementally.
+    Balls are stored in a BallColumns. `ingest` only converts deliveries it has not seen, in any
+    input order. The per-over aggregates and the key-event rows are kept in match order as balls
+    arrive, so the commentary views only read the most recent overs.
+    """
+    def __init__(self, match_id, max_key_events=200):
+        self.match_id = match_id
+        self.match_name = None
+        self.max_overs = 0
+        self.synced_at = 0.0
+        self.complete = False
+        self.columns = BallColumns()
+        self._seen = set()
+        self._overs = OrderedDict()  # (innings, over) -> over aggregate with row indices, in bowling order
+        self._key_events = deque(maxlen=max_key_events)  # row indices
+        self._lock = threading.Lock()
+    @property
+    def total_balls(self):
+        return len(self.columns)
+    def ingest(self, balls):
+        """
+        Adds the balls not seen before. The feed is not guaranteed to be in order and may re-send
+        balls, so every ball is checked and new ones are added in match order. Returns how many were new.
+        """
+        if not balls: return 0
+        with self._lock:
+            fresh = {}
+            for raw in balls:
+                try:
+                    event = BallEvent.from_sportmonks(raw)
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                if event.key not in self._seen:
+                    fresh.setdefault(event.key, event)
+            added = 0
+            for event in sorted(fresh.values(), key=_order):
+                try:
+                    self._add(event)
+                except OverflowError as e:
+                    logger.warning(f"Match {self.match_id}: skipped ball {event.key}: {e}")
+                    continue
+                self._seen.add(event.key)
+                added += 1
+            return added
+    def _row_order(self, row):
+        c = self.columns
+        return (c.innings[row], c.over[row], c.ball[row], c.event_id[row])
+    def _add(self, event):
+        row = self.columns.append(event)
+        key = (event.innings, event.over)
+        # Late balls (older than what is stored) are rare: re-sort only then
+        if event.kind:
+            if self._key_events and self._row_order(self._key_events[-1]) > self._row_order(row):
+                self._key_events = deque(sorted([*self._key_events, row], key=self._row_order), maxlen=self._key_events.maxlen)
+            else:
+                self._key_events.append(row)
+        over = self._overs.get(key)
+        if over is None:
+            late = self._overs and next(reversed(self._overs)) > key
+            over = self._overs[key] = {"innings": event.innings, "over_number": event.over, "rows": [], "total_runs": 0, "wickets": 0}
+            if late:
+                self._overs = OrderedDict(sorted(self._overs.items()))
+        if over["rows"] and self._row_order(over["rows"][-1]) > self._row_order(row):
+            over["rows"].append(row)
+            over["rows"].sort(key=self._row_order)
+        else:
+            over["rows"].append(row)
+        over["total_runs"] += event.runs
+        over["wickets"] += int(event.is_wicket)
+    def recent_overs(self, n=5):
+        """Latest `n` overs, newest first; balls in bowling order."""
+        with self._lock:
+            out = []
+            for key in reversed(self._overs):
+                if len(out) >= n: break
+                over = dict(self._overs[key])
+                over["balls"] = [self.columns.event(i).to_dict() for i in over.pop("rows")]
+                out.append(over)
+            return out
+    def key_events(self, event_type=None, limit=None):
+        """Wickets, fours and sixes, newest first."""
+        out = []
+        with self._lock:
+            for row in reversed(self._key_events):
+                event = self.columns.event(row)
+                if event_type and event.kind != event_type: continue
+                item = {"type": event.kind, "over": event.over, "ball": event.ball, "batsman": event.batter or "Unknown", "description": event.describe()}
+                if event.is_wicket: item["bowler"] = event.bowler or "Unknown"
+                else: item["runs"] = event.runs
+                out.append(item)
+                if limit and len(out) >= limit: break
+        return out
+    def commentary(self, n_overs=5):
+        """Same shape as `process_commentary`: recent_overs, last_over, key_events, current_over."""
+        overs = self.recent_overs(n_overs)
+        return {
+            "recent_overs": overs,
+            "last_over": overs[0]["balls"] if overs else [],
+            "key_events": self.key_events(),
+            "current_over": overs[0]["over_number"] if overs else None
+        }
+    def phase_summary(self, innings=None):
+        """Powerplay/middle/death totals for limited-overs matches ({} for Tests)."""
+        with self._lock:
+            return self.columns.phase_totals(self.max_overs, innings)
+    def get_stats(self):
+        with self._lock:
+            return {"match_id": self.match_id, "balls": self.total_balls, "overs": len(self._overs), "key_events": len(self._key_events), "bytes": self.columns.nbytes(), "complete": self.complete}
+def get_ball_store(match_id):
+    """The process-wide store for a match (least recently used matches are dropped)."""
+    key = str(match_id)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = BallEventStore(match_id)
+            while len(_STORES) > _MAX_STORES:
+                _STORES.popitem(last=False)
+        else:
+            _STORES.move_to_end(key)
+        return store
+async def sync_ball_store(match_id, max_age=5):
+    """
+    Brings the match's store up to date and returns (store, None), or (None, error_result).
+    At most one fetch per `max_age` seconds; a finished match is never fetched again.
+    The fixture is cached with an AUTO TTL, so concurrent sessions share one request.
+    """
+    store = get_ball_store(match_id)
+    if store.complete or (store.total_balls and time.time() - store.synced_at < max_age):
+        return store, None
+    result = await sportmonks_cric(f"/fixtures/{match_id}", {"include": BALL_INCLUDES}, ttl=AUTO)
+    if not result.get("ok"):
+        return None, result
+    match_data = result.get("data") or {}
+    if not isinstance(match_data, dict) or not match_data:
+        return None, {"ok": False, "status": 404, "error": "No match data found"}
+    new = store.ingest(match_data.get("balls") or [])
+    store.synced_at = time.time()
+    store.max_overs = max_overs_for(match_data.get("type"))
+    store.match_name = f"{(match_data.get('localteam') or {}).get('name', 'Team 1')} vs {(match_data.get('visitorteam') or {}).get('name', 'Team 2')}"
+    store.complete = fixture_state(match_data) == "finished" and store.total_balls > 0
+    if new:
+        logger.info(f"Match {match_id}: {new} new balls ({store.total_balls} total)")
+    return store, None
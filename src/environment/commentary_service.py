@@ -4,170 +4,71 @@ Provides detailed ball-by-ball commentary and match events
 """
 import asyncio
 from datetime import datetime
-from src.environment.backend_core import sportmonks_cric
+from src.environment.ball_event_store import BallEventStore, sync_ball_store
 from src.utils.utils_core import get_logger
 
 logger = get_logger("commentary", "LIVE_COMMENTARY.log")
 
-async def get_ball_by_ball_commentary(match_id):
+async def _get_store(match_id):
     """
-    Fetch detailed ball-by-ball commentary for a match
+    Up-to-date ball event store for a match, or a user-facing message dict
     """
     if not match_id:
-        return {"error": "No match ID provided"}
+        return None, {"error": "No match ID provided"}
         
-    logger.info(f"Fetching ball-by-ball commentary for match {match_id}")
-    
     try:
-        result = await sportmonks_cric(
-            f"/fixtures/{match_id}", 
-            {"include": "balls,runs,batting,bowling,localteam,visitorteam"}, 
-            use_cache=False, 
-            ttl=5
-        )
-        
-        if not result.get("ok"):
-            logger.warning(f"API call failed for match {match_id}: {result.get('error')}")
-            return {"message": "Ball-by-ball commentary is not available for this match. This feature works best with live or recently completed matches."}
-            
-        match_data = result.get("data", {})
-        if not match_data:
-            return {"message": "No match data found"}
-            
-        balls = match_data.get("balls", [])
-        if not balls or len(balls) == 0:
-            logger.info(f"No ball data available for match {match_id}")
-            return {"message": "Ball-by-ball commentary is not available for this match. This feature works best with live or recently completed matches."}
-            
-        commentary = process_commentary(balls, match_data)
-        
-        return {
-            "match_id": match_id,
-            "match_name": f"{match_data.get('localteam', {}).get('name', 'Team 1')} vs {match_data.get('visitorteam', {}).get('name', 'Team 2')}",
-            "commentary": commentary,
-            "total_balls": len(balls),
-            "last_updated": datetime.now().isoformat()
-        }
+        store, failed = await sync_ball_store(match_id)
     except Exception as e:
         logger.error(f"Error fetching commentary for match {match_id}: {e}")
-        return {"message": "Unable to fetch commentary at this time. This feature works best with live matches."}
+        return None, {"message": "Unable to fetch commentary at this time. This feature works best with live matches."}
+        
+    if failed:
+        logger.warning(f"API call failed for match {match_id}: {failed.get('error')}")
+        if failed.get("status") == 404:
+            return None, {"message": "No match data found"}
+        return None, {"message": "Ball-by-ball commentary is not available for this match. This feature works best with live or recently completed matches."}
+        
+    if not store.total_balls:
+        logger.info(f"No ball data available for match {match_id}")
+        return None, {"message": "Ball-by-ball commentary is not available for this match. This feature works best with live or recently completed matches."}
+    return store, None
 
-def process_commentary(balls, match_data):
+async def get_ball_by_ball_commentary(match_id):
     """
-    Process raw ball data into structured commentary
+    Fetch detailed ball-by-ball commentary for a match.
+    Served from the match's ball event store, which only processes new balls.
     """
-    commentary_data = {
-        "recent_overs": [],
-        "last_over": [],
-        "key_events": [],
-        "current_over": None
-    }
-    
-    # Sort balls: latest first
-    sorted_balls = sorted(balls, key=lambda x: (x.get("over", 0), x.get("ball", 0)), reverse=True)
-    
-    current_over_num = None
-    over_data = []
-    over_count = 0
-    
-    for ball in sorted_balls:
-        over_num = ball.get("over")
-        ball_num = ball.get("ball")
-        runs = ball.get("score", {}).get("runs", 0)
-        is_wicket = ball.get("score", {}).get("is_wicket", False)
-        
-        # Safe extraction of names
-        batsman = "Unknown"
-        if ball.get("batsman"):
-             batsman = ball.get("batsman", {}).get("fullname") or ball.get("batsman", {}).get("name") or "Unknown"
-             
-        bowler = "Unknown"
-        if ball.get("bowler"):
-             bowler = ball.get("bowler", {}).get("fullname") or ball.get("bowler", {}).get("name") or "Unknown"
-             
-        ball_desc = f"{over_num}.{ball_num}: {batsman} - "
-        
-        if is_wicket:
-            ball_desc += f"WICKET! {runs} run(s)"
-            commentary_data["key_events"].append({
-                "type": "wicket",
-                "over": over_num,
-                "ball": ball_num,
-                "batsman": batsman,
-                "bowler": bowler,
-                "description": ball_desc
-            })
-        elif runs >= 4:
-            event_type = "six" if runs == 6 else "four"
-            ball_desc += f"{runs} runs ({event_type.upper()}!)"
-            commentary_data["key_events"].append({
-                "type": event_type,
-                "over": over_num,
-                "ball": ball_num,
-                "batsman": batsman,
-                "runs": runs,
-                "description": ball_desc
-            })
-        else:
-            ball_desc += f"{runs} run(s)"
-            
-        # Grouping by over
-        if current_over_num is None:
-            current_over_num = over_num
-            commentary_data["current_over"] = over_num
-            
-        if over_num == current_over_num:
-            over_data.append({
-                "ball": ball_num,
-                "runs": runs,
-                "is_wicket": is_wicket,
-                "batsman": batsman,
-                "bowler": bowler,
-                "description": ball_desc
-            })
-        else:
-            # New over detected
-            if over_count < 5:
-                commentary_data["recent_overs"].append({
-                    "over_number": current_over_num,
-                    "balls": list(reversed(over_data)), # Sort balls within over
-                    "total_runs": sum(b["runs"] for b in over_data)
-                })
-                over_count += 1
-                
-            current_over_num = over_num
-            over_data = [{
-                "ball": ball_num,
-                "runs": runs,
-                "is_wicket": is_wicket,
-                "batsman": batsman,
-                "bowler": bowler,
-                "description": ball_desc
-            }]
-            
-            if over_count >= 5:
-                break
-                
-    # Add the last processed over
-    if over_data and over_count < 5:
-        commentary_data["last_over"] = list(reversed(over_data))
-        commentary_data["recent_overs"].append({
-            "over_number": current_over_num,
-            "balls": list(reversed(over_data)),
-            "total_runs": sum(b["runs"] for b in over_data)
-        })
+    logger.info(f"Fetching ball-by-ball commentary for match {match_id}")
+    store, message = await _get_store(match_id)
+    if message:
+        return message
         
-    return commentary_data
+    return {
+        "match_id": match_id,
+        "match_name": store.match_name,
+        "commentary": store.commentary(),
+        "total_balls": store.total_balls,
+        "phases": store.phase_summary(),
+        "last_updated": datetime.now().isoformat()
+    }
+
+def process_commentary(balls, match_data):
+    """
+    Process raw ball data into structured commentary (one-off, for ball lists outside the store)
+    """
+    store = BallEventStore(match_data.get("id") if isinstance(match_data, dict) else None)
+    store.ingest(balls)
+    return store.commentary()
 
 async def get_last_over_summary(match_id):
     """
     Get a quick summary of the last over
     """
-    commentary = await get_ball_by_ball_commentary(match_id)
-    if "error" in commentary or "message" in commentary:
-        return commentary
+    store, message = await _get_store(match_id)
+    if message:
+        return message
         
-    last_overs = commentary.get("commentary", {}).get("recent_overs", [])
+    last_overs = store.recent_overs(1)
     if not last_overs:
         return {"message": "No recent over data available"}
         
@@ -176,7 +77,7 @@ async def get_last_over_summary(match_id):
     last_over_balls = target_over.get("balls", [])
     
     total_runs = target_over.get("total_runs", 0)
-    wickets = sum(1 for ball in last_over_balls if ball["is_wicket"])
+    wickets = target_over.get("wickets", 0)
     
     summary = {
         "over_number": target_over["over_number"],
@@ -192,13 +93,11 @@ async def get_recent_events(match_id, event_type=None):
     Get recent key events (wickets, fours, sixes)
     event_type: 'wicket', 'four', 'six', or None for all
     """
-    commentary = await get_ball_by_ball_commentary(match_id)
-    if "error" in commentary or "message" in commentary:
-        return commentary
+    store, message = await _get_store(match_id)
+    if message:
+        return message
         
-    events = commentary.get("commentary", {}).get("key_events", [])
-    if event_type:
-        events = [e for e in events if e["type"] == event_type]
+    events = store.key_events(event_type)
         
     return {
         "match_id": match_id,
@@ -0,0 +1,146 @@
+import threading
+from datetime import datetime, timedelta
+from src.utils.utils_core import get_logger
+from src.utils.include_sets import IncludeIndex, parse_includes, project
+from src.utils.ttl_policy import ttl_for_payload
+from src.utils.rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from src.utils.background_loop import submit
+from src.environment.backend_core import (
+    _get_cache_key,
+    _lookup_cache,
+    _save_to_cache,
+    _INFLIGHT,
+    iter_sportmonks_pages
+)
+logger = get_logger("fixture_tiles", "general_app.log")
+_INCLUDES = IncludeIndex(max_resources=2048)
+_REFRESHING = set()
+_REFRESH_LOCK = threading.Lock()
+_STATS = {"tiles_hit": 0, "tiles_fetched": 0, "requests": 0, "range_queries": 0}
+_STATS_LOCK = threading.Lock()
+# Tile TTL cap by distance from today (days); the fixtures' own status TTL can only shorten it
+_DISTANCE_TTL = [
+    (-2, 7 * 24 * 3600),  # two or more days ago
+    (-1, 3600),           # yesterday: late finishes and result corrections
+    (0, 300),             # today
+    (1, 1800),            # tomorrow
+    (7, 3 * 3600),        # this week
+]
+_FAR_FUTURE_TTL = 12 * 3600
+def _count(name, n=1):
+    with _STATS_LOCK:
+        _STATS[name] += n
+def _days(start, end):
+    d = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    out = []
+    while d <= last:
+        out.append(d.strftime("%Y-%m-%d"))
+        d += timedelta(days=1)
+    return out
+def tile_ttl(day, fixtures):
+    """TTL of one day tile: capped by its distance from today, shortened by any live/imminent fixture in it."""
+    distance = (datetime.strptime(day, "%Y-%m-%d").date() - datetime.now().date()).days
+    cap = _FAR_FUTURE_TTL
+    for limit, ttl in _DISTANCE_TTL:
+        if distance <= limit:
+            cap = ttl
+            break
+    return min(cap, ttl_for_payload(fixtures, default=cap)) if fixtures else cap
+def _tile_key(day, tokens):
+    return _get_cache_key("tile:/fixtures", {"day": day, "include": ",".join(sorted(tokens))})
+async def _read_tile(day, tokens, stale_ttl):
+    """Returns (fixtures, is_fresh) from the exact tile or a cached include superset, or None."""
+    candidates = [(_tile_key(day, tokens), tokens)]
+    candidates += [(key, cached) for key, _, cached in _INCLUDES.find(f"tile:{day}", ",".join(tokens))]
+    for key, cached_tokens in candidates:
+        hit = await _lookup_cache(key, None)
+        if not (hit and hit[0]): continue
+        entry, age = hit
+        fresh_for = entry.get("cache_ttl", 0)
+        if age >= fresh_for + stale_ttl: continue
+        fixtures = entry["v"]
+        if cached_tokens != tokens:
+            fixtures = [project(f, cached_tokens, tokens) for f in fixtures]
+        return fixtures, age < fresh_for
+    return None
+async def _fetch_span(first, last, tokens, priority):
+    """One contiguous starts_between pull (all pages), stored as one tile per day. Returns {day: fixtures} or an error dict."""
+    params = {"filter[starts_between]": f"{first},{last}", "sort": "starting_at"}
+    if tokens: params["include"] = ",".join(sorted(tokens))
+    by_day = {day: [] for day in _days(first, last)}
+    async for page in iter_sportmonks_pages("/fixtures", params, per_page=100, priority=priority):
+        _count("requests")
+        if not page.get("ok"):
+            return {"ok": False, "error": page.get("error"), "status": page.get("status")}
+        for f in page.get("data") or []:
+            day = str(f.get("starting_at") or "")[:10]
+            if day in by_day:
+                by_day[day].append(f)
+    for day, fixtures in by_day.items():
+        key = _tile_key(day, tokens)
+        ttl = tile_ttl(day, fixtures)
+        _save_to_cache(key, {"v": fixtures, "cache_ttl": ttl}, ttl)
+        _INCLUDES.register(f"tile:{day}", ",".join(tokens), key)
+    _count("tiles_fetched", len(by_day))
+    return {"ok": True, "tiles": by_day}
+async def _fetch_span_once(first, last, tokens, priority):
+    # Concurrent range queries missing the same days share one pull
+    flight_key = _get_cache_key("tiles:/fixtures", {"span": f"{first},{last}", "include": sorted(tokens)})
+    return await _INFLIGHT.run(flight_key, lambda: _fetch_span(first, last, tokens, priority))
+async def _refresh_in_background(first, last, tokens):
+    flight_key = (first, last, tokens)
+    with _REFRESH_LOCK:
+        if flight_key in _REFRESHING: return
+        _REFRESHING.add(flight_key)
+    try:
+        res = await _fetch_span_once(first, last, tokens, PRIORITY_BACKGROUND)
+        if not res.get("ok"):
+            logger.warning(f"Background tile refresh {first}..{last} failed: {res.get('error')}")
+    finally:
+        with _REFRESH_LOCK:
+            _REFRESHING.discard(flight_key)
+async def get_fixtures_between(start, end, includes="localteam,visitorteam,venue", sort="starting_at", use_cache=True, stale_ttl=0, priority=PRIORITY_INTERACTIVE):
+    """
+    Raw SportMonks fixtures starting between `start` and `end` (YYYY-MM-DD, inclusive), composed
+    from per-day tiles. Only days without a fresh tile are fetched, as one contiguous request
+    spanning the first to the last missing day. Tiles older than their TTL but within `stale_ttl`
+    are served while a background refresh runs. Returns {"ok", "data", "tiles_fetched"} like sportmonks_cric.
+    """
+    if start > end: start, end = end, start
+    tokens = parse_includes(includes)
+    days = _days(start, end)
+    _count("range_queries")
+    tiles = {}
+    stale_days = []
+    if use_cache:
+        for day in days:
+            found = await _read_tile(day, tokens, stale_ttl)
+            if found is None: continue
+            tiles[day] = found[0]
+            if not found[1]: stale_days.append(day)
+        _count("tiles_hit", len(tiles))
+    missing = [d for d in days if d not in tiles]
+    fetched = 0
+    if missing:
+        res = await _fetch_span_once(missing[0], missing[-1], tokens, priority)
+        if not res.get("ok"):
+            # Serve whatever is cached for the rest of the range rather than nothing
+            if not tiles:
+                return {"ok": False, "error": res.get("error"), "status": res.get("status"), "data": []}
+            logger.warning(f"Fixture tiles {missing[0]}..{missing[-1]} unavailable: {res.get('error')}")
+        else:
+            for day in missing:
+                tiles[day] = res["tiles"].get(day, [])
+            fetched = len(missing)
+    if stale_days:
+        submit(_refresh_in_background(stale_days[0], stale_days[-1], tokens))
+    data = [f for day in days for f in tiles.get(day, [])]
+    reverse = str(sort or "").startswith("-")
+    data.sort(key=lambda f: str(f.get("starting_at") or ""), reverse=reverse)
+    result = {"ok": True, "status": 200, "data": data, "tiles_fetched": fetched}
+    if len(tiles) < len(days): result["partial"] = True
+    return result
+def get_tile_stats():
+    with _STATS_LOCK:
+        return {**_STATS, "include_supersets": _INCLUDES.get_stats()}
@@ -1,18 +1,22 @@
 import os
-import psycopg2
 from psycopg2.extras import RealDictCursor, Json
 from src.utils.utils_core import get_logger
 # Import the PG version of the engine
-from src.core.universal_cricket_engine import handle_universal_cricket_query, _process_raw_json_results, DB_CONFIG
+from src.core.universal_cricket_engine import handle_universal_cricket_query, _process_raw_json_results
+from src.core.db_pool import db_pool, run_db
+from src.core.player_innings import refresh_innings, season_leaders
+from src.core.fixture_columns import refresh_fixture_columns
+from src.core.schema_state import schema_state
 import json
 from datetime import datetime, timedelta
-from src.environment.backend_core import sportmonks_cric
+from src.environment.backend_core import sportmonks_cric, iter_sportmonks_pages
+from src.utils.rate_limiter import PRIORITY_BACKGROUND
 
 logger = get_logger("history_svc_pg", "PAST_HISTORY_PG.log")
 
-def get_history_conn():
-    conn = psycopg2.connect(**DB_CONFIG)
-    return conn
+def get_history_conn(statement_timeout_ms=None):
+    """Pooled connection; close() returns it to the pool."""
+    return db_pool.checkout(statement_timeout_ms)
 
 def _upsert_team(cursor, team):
     if not team or not team.get('id'): return
@@ -114,6 +118,9 @@ async def search_historical_matches(query=None, team=None, year=None, date=None,
     """
     Basic search listing. Used for simple listing.
     """
+    return await run_db(_search_historical_matches, query, team, year, limit)
+
+def _search_historical_matches(query, team, year, limit):
     conn = get_history_conn()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cursor:
@@ -161,6 +168,16 @@ async def get_historical_match_details(match_query, year=None):
     return res.get("data", [])
 
 async def get_season_leaders(year, category="runs", series_name=None):
+    # Runs / wickets of a named series come straight from the indexed innings tables. Without a series
+    # (all leagues of the year), other categories, before the innings migration or when it finds
+    # nothing, the SQL engine answers as before.
+    if series_name:
+        try:
+            leaders = await run_db(season_leaders, year, category, series_name)
+            if leaders:
+                return leaders
+        except Exception as e:
+            logger.warning(f"Innings-table leaders query failed, using the SQL engine: {e}")
     q = f"Top {category} in {series_name} {year}"
     payload = {
         "user_query": q,
@@ -222,119 +239,161 @@ async def past_db_get_standings(year, series_name=None):
     res = await execute_smart_query(payload)
     return {"data": res.get("data", [])}
 
+def _refresh_derived(cursor, fixture_ids, present):
+    """
+    Team/date/format columns and per-player innings rows of `fixture_ids`, extracted from the raw_json
+    just written (only for tables the migrations created). Runs in a savepoint, so a failure leaves the
+    fixture rows intact; returns False in that case.
+    """
+    if not fixture_ids: return True
+    cursor.execute("SAVEPOINT derived")
+    try:
+        if present.get("fixture_columns"):
+            refresh_fixture_columns(cursor, fixture_ids)
+        if present.get("innings"):
+            refresh_innings(cursor, fixture_ids)
+        cursor.execute("RELEASE SAVEPOINT derived")
+        return True
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT derived")
+        logger.error(f"❌ Derived rows refresh failed for {len(fixture_ids)} matches (run `python -m src.core.db_migrations` to backfill): {e}")
+        return False
+
+def _store_fixture_page(fixtures):
+    """
+    Upserts one page of finished fixtures (teams, venue, players, fixture row, derived rows). Runs in a
+    worker thread on a connection checked out for this page only, so a slow multi-page sync never keeps
+    one away from interactive queries while it waits on the API. Returns (stored, derived_failed).
+    """
+    if not fixtures: return 0, 0
+    count = 0
+    stored = []
+    with db_pool.connection() as conn, conn.cursor() as cursor:
+        present = schema_state(conn)["present"]
+        for f in fixtures:
+            # One savepoint per fixture: a bad row is skipped instead of aborting the whole page
+            cursor.execute("SAVEPOINT fixture_row")
+            try:
+                f_id = f.get("id")
+                s_id = f.get("season_id")
+                local_team = f.get("localteam") or {}
+                visitor_team = f.get("visitorteam") or {}
+                local = local_team.get("name") or "Team A"
+                visitor = visitor_team.get("name") or "Team B"
+                name = f"{local} vs {visitor}"
+                start_at = f.get("starting_at")
+                status = f.get("status")
+                venue_id = f.get("venue_id")
+                winner_id = f.get("winner_team_id")
+                toss_id = f.get("toss_won_team_id")
+                mom_id = f.get("manofmatch", {}).get("id") if f.get("manofmatch") else None
+                
+                # 1. Upsert Entities
+                _upsert_team(cursor, local_team)
+                _upsert_team(cursor, visitor_team)
+                _upsert_venue(cursor, f.get("venue"))
+                
+                # 2. Upsert Players from match details
+                for b in f.get("batting", []):
+                    if b.get("batsman"): _upsert_player(cursor, b["batsman"])
+                for b in f.get("bowling", []):
+                    if b.get("bowler"): _upsert_player(cursor, b["bowler"])
+                if f.get("manofmatch"):
+                    _upsert_player(cursor, f["manofmatch"])
+
+                # 3. Build Raw JSON
+                raw_data = {
+                    "batting": f.get("batting", []),
+                    "bowling": f.get("bowling", []),
+                    "scoreboards": f.get("scoreboards", []),
+                    "manofmatch": f.get("manofmatch", {}),
+                    "toss_won_team_id": toss_id,
+                    "winner_team_id": winner_id,
+                    "localteam": local_team,
+                    "visitorteam": visitor_team,
+                    "venue": f.get("venue"),
+                    "runs": f.get("runs", []),
+                    "note": f.get("note", ""),
+                    "type": f.get("type")
+                }
+                raw_json_str = json.dumps(raw_data)
+                
+                # 4. Insert/Update Fixture (ONLY FINISHED)
+                cursor.execute("""
+                    INSERT INTO fixtures (id, season_id, name, starting_at, status, venue_id, winner_team_id, toss_won_team_id, man_of_match_id, raw_json)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT(id) DO UPDATE SET 
+                        status=excluded.status, 
+                        winner_team_id=excluded.winner_team_id,
+                        toss_won_team_id=excluded.toss_won_team_id,
+                        man_of_match_id=excluded.man_of_match_id,
+                        raw_json=excluded.raw_json,
+                        starting_at=excluded.starting_at,
+                        name=excluded.name,
+                        venue_id=excluded.venue_id
+                """, (f_id, s_id, name, start_at, status, venue_id, winner_id, toss_id, mom_id, raw_json_str))
+                
+                cursor.execute("RELEASE SAVEPOINT fixture_row")
+                count += 1
+                stored.append(f_id)
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT fixture_row")
+                logger.error(f"❌ Error syncing match {f.get('id')}: {e}")
+        
+        # 5. Derived columns / innings rows
+        derived_ok = _refresh_derived(cursor, stored, present)
+        conn.commit()
+    return count, 0 if derived_ok else len(stored)
 async def sync_recent_finished_matches(days_back=7, season_id=None, start_date_str=None, end_date_str=None):
     """
     Syncs ONLY FINISHED matches from SportMonks into local PostgreSQL DB.
     Scheduled/Upcoming matches are NOT stored.
+    Walks every result page; the next page is fetched while the current one is upserted.
     """
     logger.info(f"🔄 Starting Smart Sync (Days={days_back}, Season={season_id})...")
-    conn = get_history_conn()
-    
-    try:
-        # Check params...
-        if season_id:
-            params = {"filter[season_id]": season_id, "per_page": 150}
-        else:
-             start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
-             params = {"filter[starts_between]": f"{start_date},{datetime.now().strftime('%Y-%m-%d')}", "per_page": 150}
+    count = 0
+    skipped = 0
+    fetched = 0
+    derived_failed = 0
+    complete = True
 
-        params["include"] = "localteam,visitorteam,venue,batting.batsman,bowling.bowler,runs,scoreboards,manofmatch"
-        params["sort"] = "-starting_at"
+    # Check params...
+    if season_id:
+        params = {"filter[season_id]": season_id}
+    else:
+         start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+         params = {"filter[starts_between]": f"{start_date},{datetime.now().strftime('%Y-%m-%d')}"}
 
-        res = await sportmonks_cric("/fixtures", params, use_cache=False)
-        if not res.get("ok"):
-            logger.error(f"❌ Sync Failed: {res.get('error')}")
-            return {"status": "error", "message": res.get("error")}
+    params["include"] = "localteam,visitorteam,venue,batting.batsman,bowling.bowler,runs,scoreboards,manofmatch"
+    params["sort"] = "-starting_at"
 
-        all_fixtures = res.get("data", [])
-        logger.info(f"📥 Fetched {len(all_fixtures)} total matches from API")
-        
-        # FILTER: Only process FINISHED matches
-        finished_statuses = ["Finished", "Completed", "FINISHED", "COMPLETED"]
+    # FILTER: Only process FINISHED matches
+    finished_statuses = ["Finished", "Completed", "FINISHED", "COMPLETED"]
+    async for page in iter_sportmonks_pages("/fixtures", params, per_page=150, priority=PRIORITY_BACKGROUND):
+        if not page.get("ok"):
+            if page["page"] == 1:
+                logger.error(f"❌ Sync Failed: {page.get('error')}")
+                return {"status": "error", "message": page.get("error")}
+            logger.error(f"❌ Sync stopped at page {page['page']}: {page.get('error')}")
+            complete = False
+            break
+        all_fixtures = page.get("data", [])
+        fetched += len(all_fixtures)
         fixtures = [f for f in all_fixtures if f.get("status") in finished_statuses or "won" in str(f.get("note", "")).lower()]
-        
-        skipped = len(all_fixtures) - len(fixtures)
-        logger.info(f"✅ Processing {len(fixtures)} FINISHED matches (Skipped {skipped} scheduled/in-progress)")
-        
-        count = 0
-        with conn.cursor() as cursor:
-            for f in fixtures:
-                try:
-                    f_id = f.get("id")
-                    s_id = f.get("season_id")
-                    local_team = f.get("localteam") or {}
-                    visitor_team = f.get("visitorteam") or {}
-                    local = local_team.get("name") or "Team A"
-                    visitor = visitor_team.get("name") or "Team B"
-                    name = f"{local} vs {visitor}"
-                    start_at = f.get("starting_at")
-                    status = f.get("status")
-                    venue_id = f.get("venue_id")
-                    winner_id = f.get("winner_team_id")
-                    toss_id = f.get("toss_won_team_id")
-                    mom_id = f.get("manofmatch", {}).get("id") if f.get("manofmatch") else None
-                    
-                    # 1. Upsert Entities
-                    _upsert_team(cursor, local_team)
-                    _upsert_team(cursor, visitor_team)
-                    _upsert_venue(cursor, f.get("venue"))
-                    
-                    # 2. Upsert Players from match details
-                    for b in f.get("batting", []):
-                        if b.get("batsman"): _upsert_player(cursor, b["batsman"])
-                    for b in f.get("bowling", []):
-                        if b.get("bowler"): _upsert_player(cursor, b["bowler"])
-                    if f.get("manofmatch"):
-                        _upsert_player(cursor, f["manofmatch"])
-
-                    # 3. Build Raw JSON
-                    raw_data = {
-                        "batting": f.get("batting", []),
-                        "bowling": f.get("bowling", []),
-                        "scoreboards": f.get("scoreboards", []),
-                        "manofmatch": f.get("manofmatch", {}),
-                        "toss_won_team_id": toss_id,
-                        "winner_team_id": winner_id,
-                        "localteam": local_team,
-                        "visitorteam": visitor_team,
-                        "venue": f.get("venue"),
-                        "runs": f.get("runs", []),
-                        "note": f.get("note", "")
-                    }
-                    raw_json_str = json.dumps(raw_data)
-                    
-                    # 4. Insert/Update Fixture (ONLY FINISHED)
-                    cursor.execute("""
-                        INSERT INTO fixtures (id, season_id, name, starting_at, status, venue_id, winner_team_id, toss_won_team_id, man_of_match_id, raw_json)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT(id) DO UPDATE SET 
-                            status=excluded.status, 
-                            winner_team_id=excluded.winner_team_id,
-                            toss_won_team_id=excluded.toss_won_team_id,
-                            man_of_match_id=excluded.man_of_match_id,
-                            raw_json=excluded.raw_json,
-                            starting_at=excluded.starting_at,
-                            name=excluded.name,
-                            venue_id=excluded.venue_id
-                    """, (f_id, s_id, name, start_at, status, venue_id, winner_id, toss_id, mom_id, raw_json_str))
-                    
-                    count += 1
-                except Exception as e:
-                    logger.error(f"❌ Error syncing match {f.get('id')}: {e}")
-            
-            conn.commit()
-    finally:
-        conn.close()
+        skipped += len(all_fixtures) - len(fixtures)
+        logger.info(f"📥 Page {page['page']}: {len(all_fixtures)} matches, {len(fixtures)} FINISHED")
+        stored, failed = await run_db(_store_fixture_page, fixtures)
+        count += stored
+        derived_failed += failed
     
-    logger.info(f"✅ Sync Complete. Stored {count} FINISHED matches (Skipped {skipped} scheduled)")
-    return {"status": "success", "updated": count, "skipped": skipped}
+    logger.info(f"✅ Sync Complete. Fetched {fetched}, stored {count} FINISHED matches (Skipped {skipped} scheduled, derived rows failed for {derived_failed})")
+    return {"status": "success", "updated": count, "skipped": skipped, "complete": complete, "derived_failed": derived_failed}
 
 async def sync_specific_match(match_id):
     """
     Syncs one specific match ID immediately into PostgreSQL.
     """
     logger.info(f"⚡ FAST SYNC: Fetching Match {match_id} into PostgreSQL...")
-    conn = get_history_conn()
     try:
         params = {
             "include": "localteam,visitorteam,venue,batting.batsman,bowling.bowler,runs,scoreboards,manofmatch",
@@ -346,7 +405,16 @@ async def sync_specific_match(match_id):
         
         f = res.get("data", {})
         if not f: return {"status": "error", "message": "Empty data"}
-        
+        # The connection is only taken once the fixture is in hand, and used off the event loop
+        return await run_db(_store_specific_match, match_id, f)
+    except Exception as e:
+        logger.error(f"Fast Sync Failed for {match_id}: {e}")
+        return {"status": "error", "message": str(e)}
+
+def _store_specific_match(match_id, f):
+    conn = get_history_conn()
+    try:
+        present = schema_state(conn)["present"]
         with conn.cursor() as cursor:
             f_id = f.get("id")
             s_id = f.get("season_id")
@@ -385,7 +453,8 @@ async def sync_specific_match(match_id):
                 "localteam": local_team,
                 "visitorteam": visitor_team,
                 "venue": f.get("venue"),
-                "runs": f.get("runs", [])
+                "runs": f.get("runs", []),
+                "type": f.get("type")
             }
             
             # 3. Insert Fixture
@@ -402,9 +471,10 @@ async def sync_specific_match(match_id):
                     name=excluded.name,
                     venue_id=excluded.venue_id
             """, (f_id, s_id, name, start_at, status, venue_id, winner_id, toss_id, mom_id, json.dumps(raw_data)))
+            derived_ok = _refresh_derived(cursor, [f_id], present)
             conn.commit()
             logger.info(f"✅ FAST SYNC SUCCESS: Match {match_id} is now in PostgreSQL with full parameters.")
-            return {"status": "success", "match": name}
+            return {"status": "success", "match": name, "derived_failed": not derived_ok}
     except Exception as e:
         logger.error(f"Fast Sync Failed for {match_id}: {e}")
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,255 @@
+import time
+import json
+import queue
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
+from src.utils.utils_core import get_logger, Config
+from src.utils.background_loop import submit
+from src.utils.rate_limiter import PRIORITY_LIVE
+from src.environment.poll_scheduler import PollScheduler
+logger = get_logger("live_poller", "LIVE_FEED.log")
+LIVE_INCLUDES = "localteam,visitorteam,runs,scoreboards,venue,lineup,batting,bowling"
+_ARCHIVE_SCAN_SECONDS = 600
+# Fire-and-forget archive tasks: the loop only keeps weak references, so they are held here until done
+_background_tasks = set()
+def _spawn(coro, what):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    def _done(t):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.error(f"{what} failed: {t.exception()}")
+    task.add_done_callback(_done)
+    return task
+def _public(match):
+    """Event payload: the normalized match without the raw SportMonks object (render it with `match_view`)."""
+    return {k: v for k, v in match.items() if k != "raw_data"}
+def _match_digest(match):
+    keys = ("status", "runs", "note", "current_batting", "live_state", "is_live")
+    return hashlib.md5(json.dumps([match.get(k) for k in keys], sort_keys=True, default=str).encode()).hexdigest()
+class Subscription:
+    """
+    Bounded, thread-safe stream of poller events, optionally for one match.
+    Consumed either from threads (`get`) or from one event loop (`aget`): the first `aget` moves
+    delivery to an asyncio.Queue on that loop, fed with `call_soon_threadsafe`, so no executor
+    thread is parked per waiting consumer. When the consumer falls behind, the oldest events are dropped.
+    """
+    def __init__(self, poller, match_id=None, maxsize=100):
+        self.poller = poller
+        self.match_id = str(match_id) if match_id is not None else None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._loop = None
+        self._aqueue = None
+        self._lock = threading.Lock()
+    def wants(self, event):
+        return self.match_id is None or str(event.get("match_id")) == self.match_id
+    def put(self, event):
+        with self._lock:
+            if self._loop is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._aput, event)
+                except RuntimeError:  # the consumer's loop is closed
+                    self.dropped += 1
+                return
+            while True:
+                try:
+                    self._queue.put_nowait(event)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+    def _aput(self, event):
+        # Runs on the consumer's loop
+        if self._aqueue.full():
+            self._aqueue.get_nowait()
+            self.dropped += 1
+        self._aqueue.put_nowait(event)
+    def get(self, timeout=None):
+        """Next event, or None after `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    async def aget(self, timeout=None):
+        """Next event, or None after `timeout` seconds. Binds the subscription to the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                if self._loop is not None and not self._loop.is_closed():
+                    raise RuntimeError("Subscription is already consumed on another event loop")
+                self._loop, self._aqueue = loop, asyncio.Queue(maxsize=self._queue.maxsize)
+                # Events buffered for thread consumers move over in order
+                while True:
+                    try:
+                        self._aput(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+        try:
+            return await asyncio.wait_for(self._aqueue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    def close(self):
+        self.poller.unsubscribe(self)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+class LivePoller:
+    """
+    One /livescores poll per interval for the whole process, paced by a PollScheduler.
+    Each poll is diffed against the previous state. started, update and ended events are
+    published to subscribers (chat agent, API server, push endpoints). Per-session reads
+    then come from memory. Finished matches are archived here.
+    """
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or PollScheduler()
+        self._matches = {}   # match_id -> normalized live match
+        self._digests = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._polled_at = 0.0
+        self._version = 0
+        self._started = False
+        self._inflight = None
+        self._archived = set()
+        self._stats = {"polls": 0, "failures": 0, "events": 0}
+    async def _fetch(self):
+        from src.environment.live_match_service import sportmonks_live_request, _normalize_live_match_data
+        res = await sportmonks_live_request("/livescores", {"include": LIVE_INCLUDES}, priority=PRIORITY_LIVE)
+        if not res.get("ok"):
+            raise RuntimeError(res.get("error") or "livescores failed")
+        matches, finished = {}, []
+        for m in res.get("data", []):
+            if str(m.get("status", "")).lower() in ["finished", "completed"]:
+                finished.append(m.get("id"))
+            norm = _normalize_live_match_data(m)
+            if norm: matches[norm["id"]] = norm
+        return matches, finished
+    async def poll(self):
+        """Fetches once, updates state and publishes the differences. Returns the events."""
+        try:
+            matches, finished = await self._fetch()
+        except Exception as e:
+            with self._lock:
+                self._stats["failures"] += 1
+            self.scheduler.record_failure()
+            raise
+        self.scheduler.observe(matches.values())
+        now = time.time()
+        events = []
+        with self._lock:
+            self._stats["polls"] += 1
+            for match_id, match in matches.items():
+                digest = _match_digest(match)
+                previous = self._digests.get(match_id)
+                if previous != digest:
+                    events.append({"type": "started" if previous is None else "update", "match_id": match_id, "match": _public(match)})
+                self._digests[match_id] = digest
+            for match_id in [m for m in self._matches if m not in matches]:
+                events.append({"type": "ended", "match_id": match_id, "match": _public(self._matches[match_id])})
+                self._digests.pop(match_id, None)
+            self._matches = matches
+            self._polled_at = now
+            if events:
+                self._version += 1
+            for event in events:
+                event["version"] = self._version
+                event["ts"] = now
+            subscribers = list(self._subscribers)
+            self._stats["events"] += len(events)
+        for event in events:
+            for sub in subscribers:
+                if sub.wants(event):
+                    sub.put(event)
+        self._archive(finished)
+        return events
+    def _archive(self, finished):
+        new = [m for m in finished if m not in self._archived]
+        if not new: return
+        from src.core.db_archiver import archive_match
+        self._archived.update(new)
+        for match_id in new:
+            _spawn(archive_match(match_id), f"Archiving match {match_id}")
+    def next_interval(self):
+        return self.scheduler.next_delay()
+    async def _run(self):
+        from src.environment.live_match_service import archive_finished_fixtures
+        last_scan = 0.0
+        while True:
+            try:
+                await self.refresh()
+                if time.monotonic() - last_scan > _ARCHIVE_SCAN_SECONDS:
+                    last_scan = time.monotonic()
+                    _spawn(archive_finished_fixtures(datetime.now().strftime("%Y-%m-%d")), "Finished-fixture archive scan")
+                delay = self.next_interval()
+            except Exception as e:
+                logger.error(f"Live poll failed: {e}")
+                delay = self.next_interval()
+            await asyncio.sleep(delay)
+    def start(self):
+        """Starts polling on the background loop (once per process)."""
+        with self._lock:
+            if self._started: return
+            self._started = True
+        submit(self._run())
+        logger.info("Live poller started")
+    async def refresh(self):
+        """Polls now, sharing an in-flight poll with concurrent callers on any loop."""
+        with self._lock:
+            fut = self._inflight
+            if fut is None or fut.done():
+                fut = self._inflight = submit(self.poll())
+        return await asyncio.wrap_future(fut)
+    def age(self):
+        with self._lock:
+            return time.time() - self._polled_at if self._polled_at else float("inf")
+    def is_fresh(self, max_age=None):
+        if max_age is None:
+            max_age = 2 * self.scheduler.cycle()
+        return self.age() <= max_age
+    def live_matches(self):
+        with self._lock:
+            return [dict(m) for m in self._matches.values()]
+    def get_match(self, match_id):
+        with self._lock:
+            match = self._matches.get(match_id) or self._matches.get(str(match_id))
+            if match is None:
+                match = next((m for k, m in self._matches.items() if str(k) == str(match_id)), None)
+            return dict(match) if match else None
+    async def current(self, max_age=None):
+        """Live matches from memory, polling first only if the last poll is older than `max_age`."""
+        self.start()
+        if not self.is_fresh(max_age):
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Live poll on demand failed, serving last state: {e}")
+        return self.live_matches()
+    def subscribe(self, match_id=None, maxsize=100):
+        sub = Subscription(self, match_id, maxsize)
+        with self._lock:
+            self._subscribers.append(sub)
+        self.start()
+        return sub
+    def unsubscribe(self, sub):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+    def get_stats(self):
+        schedule = self.scheduler.get_status()
+        with self._lock:
+            return {
+                **self._stats,
+                "live": len(self._matches),
+                "version": self._version,
+                "subscribers": len(self._subscribers),
+                "age_seconds": round(time.time() - self._polled_at, 1) if self._polled_at else None,
+                "schedule": schedule
+            }
+live_poller = LivePoller(PollScheduler(idle_interval=Config.LIVE_POLL_IDLE_SECONDS, max_interval=Config.LIVE_POLL_MAX_SECONDS))
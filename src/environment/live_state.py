@@ -0,0 +1,242 @@
+from src.utils.ball_events import events_from_sportmonks, max_overs_for
+_BREAK_STATES = ["LIVE", "Innings Break", "Lunch", "Tea Break", "Dinner", "Drinks", "Delayed", "Stumps"]
+def normalize_status_live(status):
+    s = str(status or "").lower()
+    if "live" in s: return "LIVE"
+    if "inning" in s and "break" in s: return "Innings Break"
+    if "inning" in s: return "LIVE"
+    if "tea" in s: return "Tea Break"
+    if "lunch" in s: return "Lunch"
+    if "dinner" in s: return "Dinner"
+    if "drinks" in s: return "Drinks"
+    if "stump" in s: return "Stumps"
+    if "delay" in s or "rain" in s or "interrupted" in s: return "Delayed"
+    if "finished" in s or "completed" in s or "won by" in s or "ended" in s: return "Finished"
+    return "Scheduled"
+def player_name(lineup_map, pid, record=None):
+    """Player name from the record's nested player, else the lineup map."""
+    if record and isinstance(record, dict) and "player" in record:
+        p_obj = record.get("player") or {}
+        name = p_obj.get("fullname") or p_obj.get("lastname")
+        if name: return name
+    p = lineup_map.get(pid)
+    if not p: return f"Player {pid}"
+    return p.get("fullname") or p.get("lastname")
+def _num(value, cast=int):
+    try:
+        return cast(float(str(value))) if value not in (None, "") else cast(0)
+    except (TypeError, ValueError):
+        return cast(0)
+def _overs_to_balls(overs):
+    """14.3 overs -> 87 balls"""
+    overs = _num(overs, float)
+    return int(overs) * 6 + int(round((overs - int(overs)) * 10))
+class LiveMatchState:
+    """
+    Structured state of one live SportMonks fixture, computed once per update:
+    innings, batters at the crease, current bowler, partnership, target and chase
+    equation, recent balls and last wicket. `score_string` is rendered from it on first
+    access (see `match_view`); `to_dict()` is the plain JSON form stored in the normalized match as "live_state".
+    """
+    __slots__ = (
+        "match_id", "team1", "team2", "status", "status_raw", "note", "starting_at", "max_overs",
+        "innings", "batting_team", "batters", "bowler", "partnership", "target", "runs_needed",
+        "balls_remaining", "current_run_rate", "required_run_rate", "projected_score",
+        "recent_balls", "last_over_runs", "last_wicket", "milestones", "powerplay", "is_finished", "is_live",
+        "_score_string"
+    )
+    @classmethod
+    def from_sportmonks(cls, sm_match):
+        self = cls()
+        self._score_string = None
+        self.match_id = sm_match.get("id")
+        local = (sm_match.get("localteam") or {}).get("name", "Team A")
+        visitor = (sm_match.get("visitorteam") or {}).get("name", "Team B")
+        self.team1, self.team2 = local, visitor
+        status_raw = sm_match.get("status", "")
+        status = normalize_status_live(status_raw)
+        note = sm_match.get("note") or ""
+        if status == "Scheduled" and note:
+            note_status = normalize_status_live(note)
+            if note_status in _BREAK_STATES:
+                status, status_raw = note_status, note
+        self.status_raw, self.note = status_raw, note
+        self.starting_at = sm_match.get("starting_at", "N/A")
+        self.max_overs = max_overs_for(sm_match.get("type"))
+        local_id = sm_match.get("localteam_id")
+        self.innings = []
+        for r in sm_match.get("runs") or []:
+            self.innings.append({
+                "inning": r.get("inning") or len(self.innings) + 1,
+                "team_id": r.get("team_id"),
+                "team": local if str(r.get("team_id")) == str(local_id) else visitor,
+                "runs": r.get("score"), "wickets": r.get("wickets"), "overs": r.get("overs")
+            })
+        current = self.innings[-1] if self.innings else None
+        self.batting_team = current["team"] if current else None
+        player_map = {p.get("id"): p for p in sm_match.get("lineup") or []}
+        batting = sm_match.get("batting") or []
+        self.batters, self.milestones = [], []
+        last_wicket = ""
+        dismissed = []
+        for b in batting:
+            is_out = b.get("catch_stump_player_id") or b.get("runout_by_id") or b.get("batsmanout_id") or b.get("bowling_player_id")
+            if not is_out:
+                self.batters.append({
+                    "name": player_name(player_map, b.get("player_id"), record=b),
+                    "runs": b.get("score", 0), "balls": b.get("ball", 0), "strike_rate": b.get("rate", 0),
+                    "active": bool(b.get("active"))
+                })
+            if b.get("bowling_player_id") or b.get("batsmanout_id"):
+                bowler_name = player_name(player_map, b.get("bowling_player_id")) if b.get("bowling_player_id") else "Unknown"
+                dismissed.append((player_name(player_map, b.get("player_id"), record=b), bowler_name))
+            if b.get("active"):
+                s = b.get("score", 0)
+                pname = player_name(player_map, b.get("player_id"))
+                if 40 <= s < 50: self.milestones.append(f"{pname} near 50 ({s})")
+                elif 90 <= s < 100: self.milestones.append(f"{pname} near 100 ({s})")
+                elif 190 <= s < 200: self.milestones.append(f"{pname} near 200 ({s})")
+        if dismissed:
+            last_wicket = f"Last Wicket: {dismissed[-1][0]} (Bowled by {dismissed[-1][1]})"
+        active_bowler = next((bw for bw in sm_match.get("bowling") or [] if bw.get("active")), None)
+        self.bowler = None
+        if active_bowler:
+            self.bowler = {
+                "name": player_name(player_map, active_bowler.get("player_id"), record=active_bowler),
+                "overs": active_bowler.get("overs", 0), "runs": active_bowler.get("runs", 0), "wickets": active_bowler.get("wickets", 0)
+            }
+        balls = sm_match.get("balls") or []
+        self.recent_balls, self.last_over_runs, self.partnership = [], None, None
+        if balls:
+            recent = balls[-12:]
+            for raw, event in zip(recent, events_from_sportmonks(recent)):
+                if event.is_wicket:
+                    out_p = player_name(player_map, raw.get("batsmanout_id")) if raw.get("batsmanout_id") else (event.batter or "Unknown")
+                    last_wicket = f"Last Wicket: {out_p} (Out)"
+                self.recent_balls.append(event.symbol())
+            self.last_over_runs = sum(e.runs for e in events_from_sportmonks(balls[-6:]))
+            self.partnership = self._partnership_from_balls(balls)
+        if self.partnership is None and self.batters:
+            # No ball data: approximate with the not-out batters' own scores
+            self.partnership = {
+                "runs": sum(_num(b["runs"]) for b in self.batters[:2]),
+                "balls": sum(_num(b["balls"]) for b in self.batters[:2]),
+                "estimated": True
+            }
+        self.last_wicket = last_wicket
+        self._chase(current)
+        self.powerplay = self._powerplay(sm_match.get("scoreboards") or [], local, visitor, local_id, current)
+        self.is_finished = (
+            status == "Finished" or sm_match.get("winner_team_id") is not None or
+            "won by" in note.lower() or "match drawn" in note.lower() or "match tied" in note.lower()
+        )
+        self.is_live = (not self.is_finished) and status in _BREAK_STATES
+        self.status = "Finished" if self.is_finished else status
+        return self
+    @staticmethod
+    def _partnership_from_balls(balls):
+        """Runs and balls since the last wicket of the current innings."""
+        events = events_from_sportmonks(balls)
+        if not events: return None
+        innings = events[-1].innings
+        runs = count = 0
+        for event in reversed(events):
+            if event.innings != innings or event.is_wicket: break
+            runs += event.runs + event.extras
+            count += 1
+        return {"runs": runs, "balls": count, "estimated": False}
+    def _chase(self, current):
+        self.target = self.runs_needed = self.balls_remaining = None
+        self.current_run_rate = self.required_run_rate = self.projected_score = None
+        if not current: return
+        overs = _num(current["overs"], float)
+        runs = _num(current["runs"])
+        if overs > 0:
+            self.current_run_rate = round(runs / overs, 2)
+        if not self.max_overs: return
+        self.balls_remaining = max(0, self.max_overs * 6 - _overs_to_balls(current["overs"]))
+        if overs > 0:
+            self.projected_score = int(runs + (runs / overs) * (self.max_overs - overs))
+        if len(self.innings) >= 2:
+            self.target = _num(self.innings[0]["runs"]) + 1
+            self.runs_needed = max(0, self.target - runs)
+            if self.balls_remaining:
+                self.required_run_rate = round(self.runs_needed * 6 / self.balls_remaining, 2)
+    @staticmethod
+    def _powerplay(scoreboards, local, visitor, local_id, current):
+        for sb in scoreboards:
+            if sb.get("type") == "powerplay" and sb.get("number") == 1:
+                t_name = local if str(sb.get("team_id")) == str(local_id) else visitor
+                return f"Powerplay (6 Ov): {t_name} {sb.get('score')}/{sb.get('wickets')}"
+        found = None
+        for sb in scoreboards:
+            if sb.get("type") in ["total", "extra"] and sb.get("overs") == 6:
+                t_name = local if str(sb.get("team_id")) == str(local_id) else visitor
+                found = f"Powerplay (6 Ov): {t_name} {sb.get('score')}/{sb.get('wickets')}"
+        if found: return found
+        if current:
+            cur_ov = _num(current["overs"], float)
+            if 0 < cur_ov <= 6.0:
+                return f"Active Powerplay ({cur_ov} Ov): {current['team']} {current['runs']}/{current['wickets']}"
+        return None
+    @property
+    def score_string(self):
+        """One-line text rendering for prompts and plain clients (rendered once, on first use)."""
+        if self._score_string is None:
+            self._score_string = self.render()
+        return self._score_string
+    def render(self):
+        scores = [f"{i['team']}: {i['runs']}/{i['wickets']} ({i['overs']})" for i in self.innings]
+        text = f"Match Date: {self.starting_at} | " + " | ".join(scores)
+        if self.powerplay: text += " | " + self.powerplay
+        if self.batters:
+            text += " | Batting: " + ", ".join(f"{b['name']}{'*' if b['active'] else ''}: {b['runs']}({b['balls']}) SR:{b['strike_rate']}" for b in self.batters)
+        if self.bowler:
+            bw = self.bowler
+            text += f" | Bowling: {bw['name']}: {bw['wickets']}/{bw['runs']} ({bw['overs']})"
+        if self.milestones: text += " | 🌟 Watch: " + ", ".join(self.milestones)
+        if self.projected_score is not None: text += f" | Projected: {self.projected_score}"
+        if self.last_over_runs is not None: text += f" | Last 6 balls: {self.last_over_runs} runs"
+        if self.target is not None and self.runs_needed:
+            text += f" | Need {self.runs_needed} from {self.balls_remaining} balls (RRR {self.required_run_rate})"
+        if self.recent_balls: text += " | Recent: " + " ".join(self.recent_balls)
+        if self.last_wicket: text += " | " + self.last_wicket
+        if self.balls_remaining is not None:
+            text += f" | Remaining: {self.balls_remaining // 6}.{self.balls_remaining % 6} Overs"
+        if self.status == "Innings Break":
+            text += " [INNINGS BREAK - 1st Inning Over, 2nd Yet to Start]"
+        return text
+    def innings_for(self, team):
+        """Latest innings of `team` as {"runs", "wickets", "overs"} numbers, or None."""
+        for inn in reversed(self.innings):
+            if inn["team"] == team:
+                return {"runs": _num(inn["runs"]), "wickets": _num(inn["wickets"]), "overs": _num(inn["overs"], float)}
+        return None
+    def to_dict(self):
+        return {
+            "innings": [dict(i) for i in self.innings],
+            "batting_team": self.batting_team,
+            "batters": [dict(b) for b in self.batters],
+            "bowler": dict(self.bowler) if self.bowler else None,
+            "partnership": dict(self.partnership) if self.partnership else None,
+            "target": self.target,
+            "runs_needed": self.runs_needed,
+            "balls_remaining": self.balls_remaining,
+            "current_run_rate": self.current_run_rate,
+            "required_run_rate": self.required_run_rate,
+            "projected_score": self.projected_score,
+            "recent_balls": list(self.recent_balls),
+            "last_wicket": self.last_wicket or None,
+            "powerplay": self.powerplay,
+            "max_overs": self.max_overs
+        }
+def match_view(match):
+    """
+    Printable copy of a normalized live match: its LiveMatchState ("state") is swapped for the
+    rendered "score_string". Only consumers that show or serialize the match call this.
+    """
+    out = dict(match)
+    state = out.pop("state", None)
+    if state is not None:
+        out["score_string"] = state.score_string
+    return out
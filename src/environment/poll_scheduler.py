@@ -0,0 +1,122 @@
+import time
+import threading
+from datetime import datetime, timezone
+from src.utils.utils_core import Config
+from src.utils.rate_limiter import sportmonks_limiter
+from src.utils.ball_events import max_overs_for
+from src.utils.ttl_policy import parse_start
+from src.environment.live_state import normalize_status_live
+# Seconds between polls for each fixture phase; None stops polling the fixture
+POLL_INTERVALS = {
+    "death": max(2.0, Config.LIVE_POLL_SECONDS / 2),  # last 20% of a limited-overs innings, or a tight chase
+    "live": Config.LIVE_POLL_SECONDS,
+    "drinks": 30,
+    "break": 120,          # innings break, lunch, tea, dinner
+    "delayed": 300,        # rain / bad light
+    "stumps": 900,
+    "starting_soon": 60,
+    "scheduled": 600,
+    "finished": None
+}
+_BREAKS = {"Innings Break", "Lunch", "Tea Break", "Dinner"}
+def _overs(runs):
+    try:
+        return float(runs[-1].get("overs") or 0) if runs else 0.0
+    except (TypeError, ValueError, AttributeError):
+        return 0.0
+def _is_tight_chase(runs, max_overs):
+    """Second innings of a limited-overs game with under 30 runs needed."""
+    if not max_overs or len(runs) < 2: return False
+    try:
+        needed = int(runs[0].get("score") or 0) + 1 - int(runs[-1].get("score") or 0)
+    except (TypeError, ValueError, AttributeError):
+        return False
+    return 0 < needed <= 30
+def match_phase(match):
+    """Polling phase of a normalized live match (see `_normalize_live_match_data`)."""
+    status = match.get("status")
+    if status == "Finished": return "finished"
+    if status == "Drinks": return "drinks"
+    if status in _BREAKS: return "break"
+    if status == "Delayed": return "delayed"
+    if status == "Stumps": return "stumps"
+    if status == "LIVE" or normalize_status_live(match.get("original_status")) == "LIVE":
+        raw = match.get("raw_data") or {}
+        runs = match.get("runs") or []
+        max_overs = (match.get("live_state") or {}).get("max_overs") or max_overs_for(raw.get("type"))
+        if max_overs and (_overs(runs) >= 0.8 * max_overs or _is_tight_chase(runs, max_overs)):
+            return "death"
+        return "live"
+    start = parse_start((match.get("raw_data") or {}).get("starting_at"))
+    if start and (start - datetime.now(timezone.utc)).total_seconds() < 1800:
+        return "starting_soon"
+    return "scheduled"
+class PollScheduler:
+    """
+    Per-fixture poll intervals from match state and phase, plus a global backoff.
+    /livescores returns every fixture in one request, so the shared poller runs at the
+    interval of the most urgent fixture. Finished fixtures drop out. With nothing left,
+    the poller falls back to `idle_interval`. All intervals stretch (up to `max_backoff`x)
+    when the SportMonks rate limiter is under pressure or polls keep failing.
+    """
+    def __init__(self, intervals=None, idle_interval=60.0, max_interval=900.0, max_backoff=8.0, limiter=sportmonks_limiter):
+        self.intervals = {**POLL_INTERVALS, **(intervals or {})}
+        self.idle_interval = idle_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.limiter = limiter
+        self._fixtures = {}  # match_id -> (phase, due_at)
+        self._cycle = idle_interval
+        self._failures = 0
+        self._lock = threading.Lock()
+    def observe(self, matches, now=None):
+        """Re-plans every fixture after a successful poll. Fixtures missing from it are dropped."""
+        now = time.monotonic() if now is None else now
+        planned = {}
+        for match in matches:
+            phase = match_phase(match)
+            interval = self.intervals.get(phase)
+            if interval is None: continue
+            planned[match.get("id")] = (phase, now + interval)
+        with self._lock:
+            self._fixtures = planned
+            self._cycle = min((due for _, due in planned.values()), default=now + self.idle_interval) - now
+            self._failures = 0
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+    def backoff(self):
+        """Global multiplier: above 50% limiter pressure, grows linearly to max_backoff; doubles per consecutive failure."""
+        pressure = self.limiter.pressure() if self.limiter else 0.0
+        factor = 1.0 + max(0.0, pressure - 0.5) * 2 * (self.max_backoff - 1)
+        with self._lock:
+            factor *= 2 ** min(self._failures, 3)
+        return min(self.max_backoff, factor)
+    def next_delay(self, now=None):
+        """Seconds until the next poll is due; after a failed poll, one full cycle."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            dues = [due for _, due in self._fixtures.values()]
+            failing = self._failures > 0
+            cycle = self._cycle
+        if failing:
+            delay = cycle
+        else:
+            delay = max(1.0, min(dues) - now) if dues else self.idle_interval
+        return min(self.max_interval, delay * self.backoff())
+    def cycle(self):
+        """Planned gap between polls (backoff included); readers treat data older than about two cycles as stale."""
+        with self._lock:
+            cycle = self._cycle
+        return min(self.max_interval, cycle * self.backoff())
+    def phases(self):
+        with self._lock:
+            return {match_id: phase for match_id, (phase, _) in self._fixtures.items()}
+    def get_status(self):
+        phases = self.phases()
+        return {
+            "fixtures": len(phases),
+            "phases": phases,
+            "backoff": round(self.backoff(), 2),
+            "next_poll_seconds": round(self.next_delay(), 1)
+        }
@@ -0,0 +1,120 @@
+import time
+import asyncio
+import hashlib
+import json
+import threading
+from datetime import datetime
+from src.utils.utils_core import get_logger, Config
+from src.utils.background_loop import submit
+from src.environment.live_poller import live_poller
+logger = get_logger("today_board", "LIVE_FEED.log")
+class BoardSnapshot:
+    """
+    Immutable view of today's fixtures and live matches at one point in time.
+    A refresh builds a new snapshot and swaps it in; readers get copies of the match dicts.
+    `version` only increases when the content changes.
+    """
+    __slots__ = ("_version", "_as_of", "_date", "_live", "_today", "_digest")
+    def __init__(self, version, as_of, date, live, today, digest):
+        object.__setattr__(self, "_version", version)
+        object.__setattr__(self, "_as_of", as_of)
+        object.__setattr__(self, "_date", date)
+        object.__setattr__(self, "_live", tuple(live))
+        object.__setattr__(self, "_today", tuple(today))
+        object.__setattr__(self, "_digest", digest)
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardSnapshot is immutable")
+    version = property(lambda self: self._version)
+    as_of = property(lambda self: self._as_of)
+    date = property(lambda self: self._date)
+    digest = property(lambda self: self._digest)
+    def age(self):
+        return time.time() - self._as_of
+    def freshness(self):
+        return {
+            "as_of": datetime.fromtimestamp(self._as_of).isoformat(timespec="seconds"),
+            "age_seconds": round(self.age(), 1),
+            "board_version": self._version
+        }
+    def live_matches(self):
+        return [dict(m) for m in self._live]
+    def today_matches(self):
+        return [dict(m) for m in self._today]
+    def current_matches(self):
+        """Live matches first, then the rest of today's board, de-duplicated by id."""
+        seen = set()
+        out = []
+        for m in self._live + self._today:
+            if m.get("id") in seen: continue
+            seen.add(m.get("id"))
+            out.append(dict(m))
+        return out
+_SNAPSHOT = None
+_LOCK = threading.Lock()
+_STARTED = False
+_REFRESH = None  # concurrent.futures.Future of an in-flight refresh
+def _digest(live, today):
+    payload = [(m.get("id"), m.get("status"), m.get("score"), m.get("runs"), m.get("note")) for m in list(live) + list(today)]
+    return hashlib.md5(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+async def _fetch_board():
+    from src.core.current_season_service import get_todays_matches_full
+    # Live matches come from the shared poller's memory; it also archives finished ones
+    live, today = await asyncio.gather(live_poller.current(), get_todays_matches_full())
+    if not live_poller.is_fresh() and not today.get("data"):
+        raise RuntimeError(today.get("error") or "Today board refresh failed")
+    return live, today.get("data", [])
+async def refresh_board():
+    """Reads the live poller and today's tiles once and publishes a new snapshot. Returns the snapshot."""
+    global _SNAPSHOT
+    live, today = await _fetch_board()
+    digest = _digest(live, today)
+    with _LOCK:
+        previous = _SNAPSHOT
+        version = (previous.version + (previous.digest != digest)) if previous else 1
+        _SNAPSHOT = BoardSnapshot(version, time.time(), datetime.now().strftime("%Y-%m-%d"), live, today, digest)
+        snapshot = _SNAPSHOT
+    if previous is None or previous.version != version:
+        logger.info(f"Today board v{version}: {len(live)} live, {len(today)} today")
+    return snapshot
+async def _refresh_loop():
+    while True:
+        interval = Config.TODAY_BOARD_IDLE_SECONDS
+        try:
+            snapshot = await _refresh_once()
+            if snapshot.live_matches():
+                interval = Config.TODAY_BOARD_REFRESH_SECONDS
+        except Exception as e:
+            logger.error(f"Today board refresh error: {e}")
+            interval = min(interval, 15)
+        await asyncio.sleep(interval)
+async def _refresh_once():
+    """Runs on the background loop; concurrent callers share one refresh."""
+    global _REFRESH
+    with _LOCK:
+        fut = _REFRESH
+        if fut is None or fut.done():
+            fut = _REFRESH = submit(refresh_board())
+    return await asyncio.wrap_future(fut)
+def start_today_board():
+    """Starts the background refresher once per process."""
+    global _STARTED
+    with _LOCK:
+        if _STARTED: return
+        _STARTED = True
+    submit(_refresh_loop())
+    logger.info("Today board refresher started")
+async def get_today_board():
+    """
+    Current snapshot, shared by every chat session. Starts the refresher on first use and
+    only waits for the API when there is no snapshot yet or the refresher has fallen behind.
+    """
+    start_today_board()
+    snapshot = _SNAPSHOT
+    max_age = max(Config.TODAY_BOARD_IDLE_SECONDS, Config.TODAY_BOARD_REFRESH_SECONDS) * 3
+    if snapshot is None or snapshot.age() > max_age or snapshot.date != datetime.now().strftime("%Y-%m-%d"):
+        try:
+            snapshot = await _refresh_once()
+        except Exception as e:
+            logger.error(f"Today board unavailable: {e}")
+            if snapshot is None: raise
+    return snapshot
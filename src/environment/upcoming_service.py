@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from src.utils.utils_core import get_logger
-from src.environment.backend_core import sportmonks_cric, _normalize_sportmonks_to_app_format
+from src.environment.backend_core import _normalize_sportmonks_to_app_format
+from src.environment.fixture_tiles import get_fixtures_between
 logger = get_logger("upcoming_svc", "UPCOMING_SCHEDULE.log")
 async def get_upcoming_matches(days=14, check_date=None):
     """
@@ -24,11 +25,7 @@ async def get_upcoming_matches(days=14, check_date=None):
         
     logger.info(f"Fetching Upcoming Matches: {start_date} to {end_date}")
     includes = "localteam,visitorteam,venue"
-    res = await sportmonks_cric("/fixtures", {
-        "filter[starts_between]": f"{start_date},{end_date}",
-        "include": includes,
-        "sort": "starting_at"
-    }, use_cache=True, ttl=3600)
+    res = await get_fixtures_between(start_date, end_date, includes, sort="starting_at", stale_ttl=6 * 3600)
     
     matches = []
     if res.get("ok"):
@@ -48,11 +45,7 @@ async def get_upcoming_matches(days=14, check_date=None):
             dt_obj = datetime.strptime(check_date, "%Y-%m-%d")
             start_exp = (dt_obj - timedelta(days=2)).strftime("%Y-%m-%d")
             end_exp = (dt_obj + timedelta(days=2)).strftime("%Y-%m-%d")
-            res_exp = await sportmonks_cric("/fixtures", {
-                "filter[starts_between]": f"{start_exp},{end_exp}",
-                "include": includes,
-                "sort": "starting_at"
-            }, use_cache=True, ttl=300)
+            res_exp = await get_fixtures_between(start_exp, end_exp, includes, sort="starting_at", stale_ttl=1800)
             if res_exp.get("ok"):
                 raw_exp = res_exp.get("data", [])
                 for m in raw_exp:
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+from src.utils.utils_core import get_logger
+logger = get_logger("background_loop", "general_app.log")
+_LOOP = None
+_THREAD = None
+_LOCK = threading.Lock()
+def _run_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+def get_background_loop():
+    """
+    Returns the process-wide asyncio loop running on a daemon thread.
+    Chat turns use a fresh asyncio.run() loop each time, so work that must outlive
+    a single message (cache revalidation, pollers, pooled connections) runs here.
+    """
+    global _LOOP, _THREAD
+    if _LOOP is not None and _THREAD is not None and _THREAD.is_alive():
+        return _LOOP
+    with _LOCK:
+        if _LOOP is None or _THREAD is None or not _THREAD.is_alive():
+            _LOOP = asyncio.new_event_loop()
+            _THREAD = threading.Thread(target=_run_loop, args=(_LOOP,), name="background-loop", daemon=True)
+            _THREAD.start()
+            logger.info("Background event loop started")
+    return _LOOP
+def is_background_loop(loop=None):
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+    return loop is _LOOP
+def submit(coro):
+    """Schedules a coroutine on the background loop; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+async def run_in_background(coro):
+    """Runs a coroutine on the background loop and awaits it from any other loop."""
+    if is_background_loop():
+        return await coro
+    return await asyncio.wrap_future(submit(coro))
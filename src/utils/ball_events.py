@@ -0,0 +1,202 @@
+from array import array
+# Phase boundaries in completed overs for limited-overs innings (Tests have no phases)
+PHASES_BY_FORMAT = {
+    20: (("powerplay", 6), ("middle", 15), ("death", 20)),
+    50: (("powerplay", 10), ("middle", 40), ("death", 50)),
+    10: (("powerplay", 2), ("middle", 7), ("death", 10))
+}
+def _int(value):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+def _clamp(value, high):
+    return max(-high - 1, min(value, high))
+def _id(value):
+    """Player and event ids go into 64-bit columns."""
+    if not -2**63 <= value < 2**63:
+        raise OverflowError(f"id out of range: {value}")
+    return value
+def _innings(scoreboard):
+    """'S2' -> 2"""
+    digits = "".join(c for c in str(scoreboard or "") if c.isdigit())
+    return int(digits) if digits else 1
+def _player(obj):
+    if not isinstance(obj, dict): return None
+    return obj.get("fullname") or obj.get("name")
+class BallEvent:
+    """
+    One delivery, compact (__slots__, no per-instance dict).
+    `runs` are off the bat, `extras` are byes, leg byes, wides and no-ball runs.
+    """
+    __slots__ = ("innings", "over", "ball", "runs", "extras", "is_wicket", "batter_id", "bowler_id", "batter", "bowler", "event_id")
+    def __init__(self, innings, over, ball, runs=0, extras=0, is_wicket=False, batter_id=None, bowler_id=None, batter=None, bowler=None, event_id=None):
+        self.innings = innings
+        self.over = over
+        self.ball = ball
+        self.runs = runs
+        self.extras = extras
+        self.is_wicket = is_wicket
+        self.batter_id = batter_id
+        self.bowler_id = bowler_id
+        self.batter = batter
+        self.bowler = bowler
+        self.event_id = event_id
+    @classmethod
+    def from_sportmonks(cls, raw):
+        """
+        From a SportMonks ball. Over/ball come from explicit fields or the over.ball float
+        (14.3 -> 14, 3). `score` may be an object or a bare run count.
+        """
+        over, num = raw.get("over"), raw.get("ball")
+        if over is None and num is not None:
+            value = float(num or 0)
+            over, num = int(value), int(round((value - int(value)) * 10))
+        score = raw.get("score")
+        if isinstance(score, dict):
+            runs = _int(score.get("runs"))
+            extras = sum(_int(score.get(k)) for k in ("bye", "leg_bye", "wide", "noball_runs"))
+            is_wicket = bool(score.get("is_wicket"))
+        else:
+            runs, extras, is_wicket = _int(score), 0, False
+        is_wicket = is_wicket or bool(raw.get("wicket") or raw.get("batsmanout_id"))
+        return cls(
+            _innings(raw.get("scoreboard")), _int(over), _int(num), runs, extras, is_wicket,
+            raw.get("batsman_id"), raw.get("bowler_id"),
+            _player(raw.get("batsman")), _player(raw.get("bowler")), raw.get("id")
+        )
+    @property
+    def key(self):
+        """Identity of the delivery; the event id separates wides/no-balls that repeat a ball number."""
+        return (self.innings, self.over, self.ball, self.event_id)
+    @property
+    def kind(self):
+        """'wicket', 'six', 'four' or None."""
+        if self.is_wicket: return "wicket"
+        if self.runs >= 6: return "six"
+        if self.runs >= 4: return "four"
+        return None
+    def symbol(self):
+        """Scoreboard glyph: W, 4, 6, . or the run count."""
+        if self.is_wicket: return "W"
+        return str(self.runs) if self.runs else "."
+    def describe(self):
+        batter = self.batter or "Unknown"
+        text = f"{self.over}.{self.ball}: {batter} - "
+        kind = self.kind
+        if kind == "wicket": return text + f"WICKET! {self.runs} run(s)"
+        if kind: return text + f"{self.runs} runs ({kind.upper()}!)"
+        return text + f"{self.runs} run(s)"
+    def to_dict(self):
+        """Commentary view of the ball (the dict shape process_commentary produces)."""
+        return {
+            "ball": self.ball,
+            "runs": self.runs,
+            "is_wicket": self.is_wicket,
+            "batsman": self.batter or "Unknown",
+            "bowler": self.bowler or "Unknown",
+            "description": self.describe()
+        }
+    def __repr__(self):
+        return f"BallEvent({self.innings}:{self.over}.{self.ball} {self.symbol()})"
+class BallColumns:
+    """
+    Struct-of-arrays ball store: one typed `array` per field plus a player-name table.
+    About 30 bytes per ball instead of a nested dict. Phase and over scans run over flat
+    integer columns.
+    """
+    __slots__ = ("innings", "over", "ball", "runs", "extras", "wicket", "batter_id", "bowler_id", "event_id", "names", "_by_name")
+    _COLUMNS = ("innings", "over", "ball", "runs", "extras", "wicket", "batter_id", "bowler_id", "event_id")
+    def __init__(self):
+        self.innings = array("b")
+        self.over = array("h")
+        self.ball = array("b")
+        self.runs = array("b")
+        self.extras = array("b")
+        self.wicket = array("b")
+        self.batter_id = array("q")
+        self.bowler_id = array("q")
+        self.event_id = array("q")
+        self.names = {}  # player id -> name; players without an id get negative ids
+        self._by_name = {}
+    def __len__(self):
+        return len(self.over)
+    def append(self, event):
+        """
+        Adds a BallEvent; returns its row index. Small fields are clamped to their column range and
+        ids are range-checked before anything is written, so an OverflowError leaves the columns intact.
+        """
+        row = (
+            _clamp(event.innings, 127), _clamp(event.over, 32767), _clamp(event.ball, 127),
+            _clamp(event.runs, 127), _clamp(event.extras, 127), 1 if event.is_wicket else 0,
+            _id(self._player_id(event.batter_id, event.batter)), _id(self._player_id(event.bowler_id, event.bowler)),
+            _id(_int(event.event_id) or -1)
+        )
+        for column, value in zip(self._COLUMNS, row):
+            getattr(self, column).append(value)
+        return len(self.over) - 1
+    def _player_id(self, player_id, name):
+        pid = _int(player_id)
+        if not pid and name:
+            pid = self._by_name.setdefault(name, -(len(self._by_name) + 1))
+        if pid and name:
+            self.names[pid] = name
+        return pid
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+    def event(self, i):
+        """Row `i` as a BallEvent."""
+        batter_id, bowler_id, event_id = self.batter_id[i], self.bowler_id[i], self.event_id[i]
+        return BallEvent(
+            self.innings[i], self.over[i], self.ball[i], self.runs[i], self.extras[i], bool(self.wicket[i]),
+            batter_id if batter_id > 0 else None, bowler_id if bowler_id > 0 else None,
+            self.names.get(batter_id), self.names.get(bowler_id), None if event_id < 0 else event_id
+        )
+    def events(self, start=0, stop=None):
+        return [self.event(i) for i in range(start, len(self) if stop is None else stop)]
+    def innings_rows(self, innings):
+        return [i for i, inn in enumerate(self.innings) if inn == innings]
+    def phase_totals(self, max_overs, innings=None):
+        """
+        Runs (incl. extras), wickets and balls per phase for limited-overs innings; {} for
+        formats without phases. `innings` restricts to one innings (default: all).
+        """
+        phases = PHASES_BY_FORMAT.get(max_overs)
+        if not phases: return {}
+        totals = {name: {"runs": 0, "wickets": 0, "balls": 0} for name, _ in phases}
+        for i in range(len(self.over)):
+            if innings is not None and self.innings[i] != innings: continue
+            over = self.over[i]
+            name = next((n for n, end in phases if over < end), phases[-1][0])
+            t = totals[name]
+            t["runs"] += self.runs[i] + self.extras[i]
+            t["wickets"] += self.wicket[i]
+            t["balls"] += 1
+        for t in totals.values():
+            t["run_rate"] = round(t["runs"] * 6 / t["balls"], 2) if t["balls"] else 0.0
+        return totals
+    def nbytes(self):
+        cols = (self.innings, self.over, self.ball, self.runs, self.extras, self.wicket, self.batter_id, self.bowler_id, self.event_id)
+        return sum(c.itemsize * len(c) for c in cols)
+def events_from_sportmonks(balls):
+    """SportMonks `balls` include -> [BallEvent], skipping malformed entries."""
+    out = []
+    for raw in balls or []:
+        if not isinstance(raw, dict): continue
+        try:
+            out.append(BallEvent.from_sportmonks(raw))
+        except (TypeError, ValueError):
+            continue
+    return out
+def columns_from_sportmonks(balls):
+    cols = BallColumns()
+    cols.extend(events_from_sportmonks(balls))
+    return cols
+def max_overs_for(match_type):
+    """Overs per innings from a SportMonks fixture type ('T20I', 'ODI', 'Test/5day', ...); 0 when unlimited/unknown."""
+    m_type = str(match_type or "").upper()
+    if "T10" in m_type: return 10
+    if "T20" in m_type: return 20
+    if "ODI" in m_type or "LIST A" in m_type: return 50
+    return 0
@@ -0,0 +1,115 @@
+import time
+import random
+import threading
+from src.utils.utils_core import get_logger, Config
+logger = get_logger("circuit_breaker", "general_app.log")
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """Exponential backoff with equal jitter: attempt 0 -> 0.25..0.5s, 1 -> 0.5..1s, ... up to `cap`."""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one endpoint family.
+    After `failure_threshold` failures in a row the circuit opens and calls fail fast.
+    Once the (jittered, exponentially growing) open period has passed, a limited number
+    of probe calls are let through; a successful probe closes the circuit, a failed one
+    re-opens it for longer.
+    """
+    def __init__(self, name, failure_threshold=5, recovery_timeout=15.0, max_recovery=300.0, half_open_probes=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery = max_recovery
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probes = 0
+        self._stats = {"successes": 0, "failures": 0, "short_circuited": 0, "opened": 0}
+        self._lock = threading.Lock()
+    def _open(self, now):
+        self._trips += 1
+        period = min(self.max_recovery, self.recovery_timeout * (2 ** (self._trips - 1)))
+        period *= random.uniform(0.8, 1.2)
+        self.state = OPEN
+        self._open_until = now + period
+        self._probes = 0
+        self._stats["opened"] += 1
+        logger.warning(f"Circuit '{self.name}' opened for {period:.0f}s after {self._failures} failures")
+    def allow(self):
+        """True if a call may go out now. Every allowed call must end in record_success, record_failure or release."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN:
+                if now < self._open_until:
+                    self._stats["short_circuited"] += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+                logger.info(f"Circuit '{self.name}' half-open, probing")
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self._stats["short_circuited"] += 1
+                    return False
+                self._probes += 1
+            return True
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            if self.state != CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._probes = 0
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self._open(now)
+    def release(self):
+        """Gives back a probe slot for a call that ended without a verdict (throttled or cancelled)."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes:
+                self._probes -= 1
+    def retry_in(self):
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic()) if self.state == OPEN else 0.0
+    def get_status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(max(0.0, self._open_until - time.monotonic()), 1) if self.state == OPEN else 0.0,
+                **self._stats
+            }
+class BreakerRegistry:
+    """Lazily creates one CircuitBreaker per endpoint family with shared settings."""
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.settings)
+            return breaker
+    def get_status(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.get_status() for b in breakers}
+sportmonks_breakers = BreakerRegistry(
+    failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=Config.BREAKER_RECOVERY_SECONDS,
+    max_recovery=Config.BREAKER_MAX_RECOVERY_SECONDS
+)
+def get_breaker_status():
+    """State of every SportMonks endpoint breaker, e.g. {'/fixtures/{id}': {'state': 'open', ...}}."""
+    return sportmonks_breakers.get_status()
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from src.utils.utils_core import get_logger
+logger = get_logger("disk_cache", "general_app.log")
+class DiskCache:
+    """
+    SQLite-backed response cache shared by every process on the host.
+    Values are stored as zlib-compressed JSON with their write time and TTL, the
+    database runs in WAL mode so Streamlit workers, the API server and the sync
+    thread can read and write concurrently.
+    """
+    PURGE_EVERY = 200
+    def __init__(self, path, busy_timeout_ms=5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                value BLOB NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires_at)")
+        conn.commit()
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+    def get(self, key, ttl):
+        """Returns (data, age_seconds) if an entry younger than `ttl` exists, else None."""
+        try:
+            row = self._conn().execute(
+                "SELECT stored_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+        if not row:
+            self._count("misses")
+            return None
+        age = time.time() - row[0]
+        if age >= ttl:
+            self._count("misses")
+            return None
+        try:
+            data = json.loads(zlib.decompress(row[1]))
+        except Exception:
+            self._count("errors")
+            return None
+        self._count("hits")
+        return data, age
+    def set(self, key, data, ttl):
+        try:
+            blob = zlib.compress(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
+            now = time.time()
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, stored_at, expires_at, value) VALUES (?, ?, ?, ?)",
+                (key, now, now + ttl, sqlite3.Binary(blob))
+            )
+            conn.commit()
+            self._count("writes")
+            with self._lock:
+                self._writes += 1
+                should_purge = self._writes % self.PURGE_EVERY == 0
+            if should_purge:
+                self.purge_expired()
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Disk cache write failed: {e}")
+    def purge_expired(self):
+        conn = self._conn()
+        cur = conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        conn.commit()
+        return cur.rowcount
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "path": self.path}
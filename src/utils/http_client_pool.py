@@ -0,0 +1,116 @@
+import atexit
+import asyncio
+import threading
+import importlib.util
+import weakref
+import httpx
+from src.utils.utils_core import get_logger, Config
+from src.utils.background_loop import run_in_background, is_background_loop
+logger = get_logger("http_pool", "general_app.log")
+class HttpClientPool:
+    """
+    One pooled httpx.AsyncClient per event loop, shared by every SportMonks caller.
+    Chat turns run inside short-lived asyncio.run() loops, so by default requests are
+    executed on the long-lived background loop where keep-alive (and HTTP/2)
+    connections survive between messages. Clients of closed loops are pruned.
+    """
+    def __init__(self, timeout=30.0, max_connections=20, max_keepalive=10, keepalive_expiry=30.0, http2=False, transport_factory=None):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        self.transport_factory = transport_factory  # default transport -> transport (record/replay)
+        self._clients = weakref.WeakKeyDictionary()  # loop -> AsyncClient
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "connections_opened": 0, "clients_created": 0, "clients_pruned": 0}
+    def _build_client(self):
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        if self.transport_factory:
+            transport = self.transport_factory(httpx.AsyncHTTPTransport(limits=limits, http2=self.http2))
+            return httpx.AsyncClient(timeout=self.timeout, transport=transport)
+        return httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=self.http2)
+    def set_transport_factory(self, factory):
+        """Wraps or replaces the transport of clients created from now on; existing clients are dropped."""
+        with self._lock:
+            self.transport_factory = factory
+            self._clients.clear()
+    def _prune(self):
+        for loop in [l for l in self._clients if l.is_closed()]:
+            del self._clients[loop]
+            self._stats["clients_pruned"] += 1
+    def get_client(self):
+        """Returns the pooled client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._prune()
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._build_client()
+                self._clients[loop] = client
+                self._stats["clients_created"] += 1
+            return client
+    async def _trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._stats["connections_opened"] += 1
+    async def _get(self, url, params=None, timeout=None):
+        client = self.get_client()
+        with self._lock:
+            self._stats["requests"] += 1
+        kwargs = {"params": params, "extensions": {"trace": self._trace}}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await client.get(url, **kwargs)
+    async def get(self, url, params=None, timeout=None, shared_loop=True):
+        """GET through the pool; `shared_loop=False` keeps the request on the caller's loop."""
+        if shared_loop and not is_background_loop():
+            return await run_in_background(self._get(url, params, timeout))
+        return await self._get(url, params, timeout)
+    async def aclose(self):
+        """Closes the client bound to the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+    def close_all(self, timeout=2.0):
+        """Closes every client whose loop is still running (used at interpreter shutdown)."""
+        with self._lock:
+            items = list(self._clients.items())
+            self._clients.clear()
+        for loop, client in items:
+            if client.is_closed or loop.is_closed() or not loop.is_running():
+                continue
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"HTTP client close failed: {e}")
+    def get_stats(self):
+        with self._lock:
+            requests = self._stats["requests"]
+            reused = max(0, requests - self._stats["connections_opened"])
+            return {
+                **self._stats,
+                "connections_reused": reused,
+                "reuse_rate": round(reused / requests, 3) if requests else 0.0,
+                "active_clients": len(self._clients),
+                "http2": self.http2
+            }
+http_pool = HttpClientPool(
+    timeout=30.0,
+    max_connections=Config.HTTP_MAX_CONNECTIONS,
+    max_keepalive=Config.HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+    http2=Config.HTTP2_ENABLED
+)
+if Config.SPORTMONKS_RECORD_DIR or Config.SPORTMONKS_REPLAY_DIR:
+    from src.utils.sportmonks_replay import install_from_config
+    install_from_config(http_pool)
+atexit.register(http_pool.close_all)
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+def parse_includes(include):
+    """'localteam, batting.batsman' -> frozenset({'localteam', 'batting.batsman'})"""
+    if not include: return frozenset()
+    if not isinstance(include, str):
+        include = ",".join(include)
+    return frozenset(t.strip() for t in include.split(",") if t.strip())
+def covers(cached, requested):
+    """
+    True if a response fetched with `cached` includes contains every relation in `requested`.
+    A nested include implies its parent ('batting.batsman' covers 'batting'), not the reverse.
+    """
+    for token in requested:
+        if token in cached: continue
+        prefix = token + "."
+        if not any(c.startswith(prefix) for c in cached):
+            return False
+    return True
+def project(data, cached, requested):
+    """Drops top-level relations that were cached but not requested. Base resource fields are kept."""
+    if not isinstance(data, dict): return data
+    drop = {c.split(".")[0] for c in cached} - {r.split(".")[0] for r in requested}
+    if not drop: return data
+    return {k: v for k, v in data.items() if k not in drop}
+class IncludeIndex:
+    """
+    Remembers which include= sets are cached for each resource (endpoint + non-include params),
+    so a narrower request can be answered from a cached superset response.
+    Bounded LRU over resources; stale pointers are dropped when the cache misses them.
+    """
+    def __init__(self, max_resources=512):
+        self.max_resources = max_resources
+        self._index = OrderedDict()  # base_key -> {frozenset(includes): (cache_key, include_str)}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0}
+    def register(self, base_key, include, cache_key):
+        tokens = parse_includes(include)
+        if not tokens: return
+        with self._lock:
+            entries = self._index.setdefault(base_key, {})
+            entries[tokens] = (cache_key, ",".join(sorted(tokens)))
+            self._index.move_to_end(base_key)
+            while len(self._index) > self.max_resources:
+                self._index.popitem(last=False)
+    def find(self, base_key, include):
+        """Cached (cache_key, include_str, tokens) supersets of `include`, smallest first."""
+        requested = parse_includes(include)
+        with self._lock:
+            self._stats["lookups"] += 1
+            entries = self._index.get(base_key)
+            if not entries or not requested: return []
+            found = [(key, inc, tokens) for tokens, (key, inc) in entries.items()
+                     if tokens != requested and covers(tokens, requested)]
+        return sorted(found, key=lambda f: len(f[2]))
+    def record_hit(self):
+        with self._lock:
+            self._stats["hits"] += 1
+    def forget(self, base_key, cache_key):
+        with self._lock:
+            entries = self._index.get(base_key)
+            if not entries: return
+            for tokens in [t for t, (key, _) in entries.items() if key == cache_key]:
+                del entries[tokens]
+            if not entries:
+                del self._index[base_key]
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "resources": len(self._index)}
@@ -0,0 +1,121 @@
+import re
+import time
+import asyncio
+import threading
+from collections import deque, Counter
+from src.utils.utils_core import get_logger, Config
+logger = get_logger("rate_limiter", "general_app.log")
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_LIVE = "live"
+PRIORITY_BACKGROUND = "background"
+def endpoint_family(endpoint):
+    """'/fixtures/123' -> '/fixtures/{id}' so quota is grouped per endpoint type."""
+    return re.sub(r"/\d+", "/{id}", str(endpoint or "").split("?")[0])
+class RateLimiter:
+    """
+    Token bucket shared by all SportMonks traffic, with priority lanes and hourly quota accounting.
+    Lower lanes may only take a token while a reserve is left for higher ones, and
+    they stop spending the hourly plan once it is mostly used. Interactive (user)
+    requests can use the whole bucket and the whole quota.
+    """
+    # Fraction of the bucket that must remain after a lane takes a token
+    LANE_RESERVE = {PRIORITY_INTERACTIVE: 0.0, PRIORITY_LIVE: 0.2, PRIORITY_BACKGROUND: 0.5}
+    # Fraction of the hourly quota a lane may consume before it backs off
+    LANE_QUOTA_SHARE = {PRIORITY_INTERACTIVE: 1.0, PRIORITY_LIVE: 0.9, PRIORITY_BACKGROUND: 0.7}
+    def __init__(self, rate_per_sec=2.0, burst=10, hourly_quota=3000):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst)
+        self.hourly_quota = hourly_quota
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._window = deque()  # wall-clock timestamps of requests in the last hour
+        self._by_endpoint = Counter()
+        self._waits = Counter()
+        self._lock = threading.Lock()
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+    def _trim_window(self, wall_now):
+        while self._window and wall_now - self._window[0] >= 3600:
+            self._window.popleft()
+    def try_acquire(self, priority=PRIORITY_INTERACTIVE):
+        """Takes a token if the lane allows it. Returns 0 on success, else seconds to wait."""
+        now = time.monotonic()
+        wall_now = time.time()
+        with self._lock:
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            self._trim_window(wall_now)
+            share = self.LANE_QUOTA_SHARE.get(priority, 1.0)
+            if self.hourly_quota and self._window and len(self._window) >= self.hourly_quota * share:
+                return max(1.0, 3600 - (wall_now - self._window[0]))
+            reserve = self.capacity * self.LANE_RESERVE.get(priority, 0.0)
+            if self._tokens - 1 >= reserve:
+                self._tokens -= 1
+                return 0
+            return (reserve + 1 - self._tokens) / self.rate
+    async def acquire(self, priority=PRIORITY_INTERACTIVE, endpoint=None, max_wait=None):
+        """Waits for a token in the given lane. Returns False if `max_wait` would be exceeded."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(priority)
+            if wait <= 0:
+                self.record(endpoint)
+                if waited:
+                    with self._lock:
+                        self._waits[priority] += 1
+                return True
+            if max_wait is not None and waited + wait > max_wait:
+                logger.warning(f"Rate limit: giving up {priority} request to {endpoint_family(endpoint)} after {waited:.1f}s")
+                return False
+            step = min(wait, 1.0)
+            await asyncio.sleep(step)
+            waited += step
+    def record(self, endpoint):
+        with self._lock:
+            self._window.append(time.time())
+            self._by_endpoint[endpoint_family(endpoint)] += 1
+    def penalize(self, retry_after=None):
+        """Called on HTTP 429: drain the bucket and pause every lane for `retry_after` seconds."""
+        try:
+            delay = float(retry_after) if retry_after else 10.0
+        except (TypeError, ValueError):
+            delay = 10.0
+        with self._lock:
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logger.warning(f"SportMonks returned 429, pausing requests for {delay:.0f}s")
+    def pressure(self):
+        """0.0 (idle) .. 1.0 (bucket empty or quota exhausted); pollers use it to slow down."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._paused_until:
+                return 1.0
+            self._refill(now)
+            self._trim_window(time.time())
+            bucket = 1.0 - self._tokens / self.capacity if self.capacity else 0.0
+            quota = len(self._window) / self.hourly_quota if self.hourly_quota else 0.0
+            return round(min(1.0, max(bucket, quota)), 3)
+    def get_quota_status(self):
+        with self._lock:
+            self._trim_window(time.time())
+            used = len(self._window)
+            return {
+                "used_last_hour": used,
+                "hourly_quota": self.hourly_quota,
+                "remaining": max(0, self.hourly_quota - used) if self.hourly_quota else None,
+                "tokens": round(self._tokens, 2),
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                "by_endpoint": dict(self._by_endpoint.most_common()),
+                "delayed_requests": dict(self._waits)
+            }
+sportmonks_limiter = RateLimiter(
+    rate_per_sec=Config.SPORTMONKS_RATE_PER_SEC,
+    burst=Config.SPORTMONKS_BURST,
+    hourly_quota=Config.SPORTMONKS_HOURLY_QUOTA
+)
+def get_quota_status():
+    """Remaining SportMonks budget and per-endpoint usage for the last hour."""
+    return sportmonks_limiter.get_quota_status()
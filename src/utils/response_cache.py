@@ -0,0 +1,133 @@
+import sys
+import json
+import time
+import threading
+from collections import OrderedDict
+from src.utils.utils_core import get_logger
+logger = get_logger("response_cache", "general_app.log")
+def _estimate_size(data):
+    """Approximate in-memory weight of a cached payload (serialized length)."""
+    try:
+        return len(json.dumps(data, default=str))
+    except Exception:
+        return sys.getsizeof(data)
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, an entry cap and a byte budget.
+    Entries are evicted least-recently-used first when either limit is exceeded,
+    and a daemon sweeper drops expired entries that are never read again.
+    """
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024, sweep_interval=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._entries = OrderedDict()  # key -> (data, stored_at, ttl, size)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._sweeper = None
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "rejected": 0}
+    def get(self, key, ttl=None):
+        """Returns the cached value if it is younger than `ttl` (or its stored TTL), else None."""
+        hit = self.get_with_age(key, ttl)
+        return hit[0] if hit else None
+    def get_with_age(self, key, max_age=None):
+        """
+        Returns (data, age_seconds) if the entry is younger than `max_age`, else None.
+        Entries are only dropped once their stored TTL (retention) has elapsed, so a
+        caller asking for a shorter max_age misses without discarding data that a
+        stale-while-revalidate reader may still serve.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            data, stored_at, stored_ttl, _ = entry
+            age = time.monotonic() - stored_at
+            if age >= stored_ttl:
+                self._remove(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            if max_age is not None and age >= max_age:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return data, age
+    def peek(self, key):
+        """(data, age_seconds) of a retained entry without counting a lookup or refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            age = time.monotonic() - entry[1]
+            return (entry[0], age) if age < entry[2] else None
+    def set(self, key, data, ttl=300, age=0):
+        """Stores `data`; `age` back-dates the entry when it was loaded from a slower tier."""
+        size = _estimate_size(data)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats["rejected"] += 1
+                logger.warning(f"Cache entry {key[:8]} ({size} bytes) exceeds budget, not cached")
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, time.monotonic() - age, ttl, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self._stats["evictions"] += 1
+        self._ensure_sweeper()
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    def sweep(self):
+        """Drops every entry whose stored TTL has elapsed. Returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, (_, stored_at, ttl, _s) in self._entries.items() if now - stored_at >= ttl]
+            for k in stale:
+                self._remove(k)
+            self._stats["expired"] += len(stale)
+        return len(stale)
+    def get_stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
+    def __len__(self):
+        return len(self._entries)
+    def __contains__(self, key):
+        return key in self._entries
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+    def _ensure_sweeper(self):
+        if self._sweeper is not None or not self.sweep_interval:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="response-cache-sweeper", daemon=True)
+            self._sweeper.start()
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"Cache sweep removed {removed} expired entries ({len(self._entries)} left)")
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+class SingleFlight:
+    """
+    Coalesces concurrent identical async calls.
+    The first caller for a key runs the coroutine; callers that arrive while it is
+    in flight await the same result instead of repeating the work. A thread-safe
+    future is used so sessions running on different threads/event loops
+    (Streamlit runs one asyncio.run per message) share a single request.
+    If the leader is cancelled, its followers are not: each retries and one becomes the new leader.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0, "retried": 0}
+    async def run(self, key, coro_fn):
+        while True:
+            with self._lock:
+                fut = self._calls.get(key)
+                is_leader = fut is None
+                if is_leader:
+                    fut = Future()
+                    self._calls[key] = fut
+                    self._stats["leaders"] += 1
+                else:
+                    self._stats["coalesced"] += 1
+            if is_leader:
+                return await self._lead(key, fut, coro_fn)
+            try:
+                # Shielded: a cancelled follower must not cancel the shared future under the others
+                return await asyncio.shield(asyncio.wrap_future(fut))
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its session's loop closed), not this caller: run it again
+                if not fut.cancelled(): raise
+                with self._lock:
+                    self._stats["retried"] += 1
+    async def _lead(self, key, fut, coro_fn):
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.cancel()
+            raise
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        fut.set_result(result)
+        return result
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
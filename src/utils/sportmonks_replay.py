@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import http.server
+import socketserver
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import httpx
+from src.utils.utils_core import get_logger, Config
+logger = get_logger("sportmonks_replay", "general_app.log")
+_API_PREFIX = "/api/v2.0"
+_SECRET_PARAMS = {"api_token"}
+def _endpoint(path):
+    """'/api/v2.0/fixtures/5' -> '/fixtures/5'"""
+    return path.split(_API_PREFIX, 1)[-1] or "/"
+def _clean_params(params):
+    return sorted((k, str(v)) for k, v in params if k not in _SECRET_PARAMS)
+def recording_name(endpoint, params):
+    """Stable file name for a request: endpoint plus sorted query params, never the API token."""
+    digest = hashlib.md5(f"{endpoint}?{urlencode(_clean_params(params))}".encode()).hexdigest()[:16]
+    slug = endpoint.strip("/").replace("/", "_") or "root"
+    return f"{slug}__{digest}.json"
+class RecordingStore:
+    """Directory of recorded SportMonks responses, one JSON file per distinct request."""
+    def __init__(self, directory):
+        self.directory = directory
+        self._memo = {}
+        self._lock = threading.Lock()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+    def save(self, endpoint, params, status, body, elapsed_ms):
+        try:
+            payload, text = json.loads(body), None
+        except ValueError:
+            payload, text = None, body.decode("utf-8", "replace")
+        record = {
+            "endpoint": endpoint,
+            "params": dict(_clean_params(params)),
+            "status": status,
+            "json": payload,
+            "text": text,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "recorded_at": datetime.now().isoformat()
+        }
+        name = recording_name(endpoint, params)
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        with self._lock:
+            self._memo.pop(name, None)
+    def load(self, endpoint, params, loose=True):
+        """
+        Returns a fresh copy of the recording for this request. With `loose`, a request that
+        was never recorded falls back to the latest recording of the same endpoint.
+        """
+        name = recording_name(endpoint, params)
+        raw = self._read(name)
+        if raw is None and loose:
+            slug = name.split("__")[0] + "__"
+            candidates = [n for n in os.listdir(self.directory) if n.startswith(slug)]
+            if candidates:
+                latest = max(candidates, key=lambda n: os.path.getmtime(os.path.join(self.directory, n)))
+                raw = self._read(latest)
+        return json.loads(raw) if raw is not None else None
+    def _read(self, name):
+        with self._lock:
+            if name in self._memo: return self._memo[name]
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path): return None
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        with self._lock:
+            self._memo[name] = raw
+        return raw
+def _overs_to_balls(overs):
+    """19.4 -> 118"""
+    value = float(overs or 0)
+    return int(value) * 6 + int(round((value - int(value)) * 10))
+class LiveSimulator:
+    """
+    Replays recorded (usually finished) fixtures as if they were live, `speed` balls per second
+    from the first time a fixture is served.
+    With a `balls` include only the balls bowled so far are visible, and `runs` and `status` are
+    recomputed from them (bat runs plus extras). Payloads without balls (e.g. /livescores with the
+    live includes) are advanced from their recorded `runs`: innings are revealed in order, and the
+    current one shows its overs so far with score and wickets pro rata, so totals are approximate.
+    """
+    def __init__(self, speed=1.0, start_ball=0):
+        self.speed = speed
+        self.start_ball = start_ball
+        self._started = {}
+        self._lock = threading.Lock()
+    def apply(self, payload):
+        data = (payload or {}).get("data")
+        for fixture in (data if isinstance(data, list) else [data]):
+            if isinstance(fixture, dict):
+                self._advance(fixture)
+        return payload
+    def _visible(self, fixture, total):
+        with self._lock:
+            started = self._started.setdefault(fixture.get("id"), time.monotonic())
+        return min(total, self.start_ball + int((time.monotonic() - started) * self.speed))
+    def _advance(self, fixture):
+        balls = fixture.get("balls")
+        if isinstance(balls, list) and balls:
+            visible = self._visible(fixture, len(balls))
+            if visible >= len(balls): return
+            shown = balls[:visible]
+            fixture["balls"] = shown
+            fixture["runs"] = self._runs(shown)
+        else:
+            runs = sorted((r for r in fixture.get("runs") or [] if isinstance(r, dict)), key=lambda r: r.get("inning") or 0)
+            total = sum(_overs_to_balls(r.get("overs")) for r in runs)
+            if not total: return
+            visible = self._visible(fixture, total)
+            if visible >= total: return
+            fixture["runs"] = self._partial_runs(runs, visible)
+        fixture["live"] = True
+        fixture["status"] = "1st Innings" if len(fixture["runs"]) <= 1 else "2nd Innings"
+        fixture["note"] = ""
+    @staticmethod
+    def _runs(balls):
+        innings = {}
+        for b in balls:
+            board = b.get("scoreboard") or "S1"
+            score = b.get("score") or {}
+            entry = innings.setdefault(board, {"team_id": b.get("team_id"), "inning": len(innings) + 1, "score": 0, "wickets": 0, "overs": 0})
+            entry["score"] += sum(int(score.get(k) or 0) for k in ("runs", "bye", "leg_bye", "wide", "noball_runs"))
+            entry["wickets"] += 1 if score.get("is_wicket") else 0
+            entry["overs"] = b.get("ball", entry["overs"])
+        return list(innings.values())
+    @staticmethod
+    def _partial_runs(runs, visible):
+        """The recorded innings totals cut to the first `visible` balls of the match."""
+        out = []
+        for r in runs:
+            balls = _overs_to_balls(r.get("overs"))
+            if visible >= balls:
+                out.append(dict(r))
+                visible -= balls
+                continue
+            share = visible / balls
+            out.append({**r, "score": int((r.get("score") or 0) * share), "wickets": int((r.get("wickets") or 0) * share), "overs": float(f"{visible // 6}.{visible % 6}")})
+            break
+        return out
+class ReplayEngine:
+    """Decides the response for a request: injected latency, injected failures, then the recording."""
+    def __init__(self, store, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503, timeout_rate=0.0, live_speed=0.0):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.simulator = LiveSimulator(live_speed) if live_speed else None
+        self._stats = {"served": 0, "missing": 0, "errors": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+    def delay(self):
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+    def respond(self, endpoint, params):
+        """Returns (status, payload), or (None, None) for an injected timeout."""
+        roll = random.random()
+        if roll < self.timeout_rate:
+            self._count("timeouts")
+            return None, None
+        if roll < self.timeout_rate + self.error_rate:
+            self._count("errors")
+            return self.error_status, {"message": "Injected replay error"}
+        record = self.store.load(endpoint, params)
+        if record is None:
+            self._count("missing")
+            return 404, {"message": f"No recording for {endpoint}"}
+        self._count("served")
+        payload = record.get("json")
+        if payload is None:
+            payload = {"message": record.get("text")}
+        if self.simulator and record.get("status") == 200:
+            payload = self.simulator.apply(payload)
+        return record.get("status", 200), payload
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to the real transport and writes every response to a RecordingStore."""
+    def __init__(self, store, inner):
+        self.store = store
+        self.inner = inner
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        params = request.url.params.multi_items()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.store.save, _endpoint(request.url.path), params, response.status_code, body, elapsed_ms
+            )
+        except Exception as e:
+            logger.warning(f"Recording failed for {request.url.path}: {e}")
+        # The body is already decoded, so drop the headers that describe the wire encoding
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, extensions=response.extensions)
+    async def aclose(self):
+        await self.inner.aclose()
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers from recordings; no network access at all."""
+    def __init__(self, engine):
+        self.engine = engine
+    async def handle_async_request(self, request):
+        await asyncio.sleep(self.engine.delay())
+        status, payload = self.engine.respond(_endpoint(request.url.path), request.url.params.multi_items())
+        if status is None:
+            raise httpx.ReadTimeout("Injected replay timeout", request=request)
+        return httpx.Response(status, json=payload, request=request)
+def engine_from_config(directory=None):
+    return ReplayEngine(
+        RecordingStore(directory or Config.SPORTMONKS_REPLAY_DIR),
+        latency_ms=Config.REPLAY_LATENCY_MS,
+        jitter_ms=Config.REPLAY_JITTER_MS,
+        error_rate=Config.REPLAY_ERROR_RATE,
+        timeout_rate=Config.REPLAY_TIMEOUT_RATE,
+        live_speed=Config.REPLAY_LIVE_SPEED
+    )
+def install_from_config(pool):
+    """Switches the shared HTTP pool to replay (SPORTMONKS_REPLAY_DIR) or recording (SPORTMONKS_RECORD_DIR) mode."""
+    if Config.SPORTMONKS_REPLAY_DIR:
+        engine = engine_from_config()
+        pool.set_transport_factory(lambda default: ReplayTransport(engine))
+        logger.warning(f"SportMonks REPLAY mode: serving recordings from {Config.SPORTMONKS_REPLAY_DIR}")
+    elif Config.SPORTMONKS_RECORD_DIR:
+        store = RecordingStore(Config.SPORTMONKS_RECORD_DIR)
+        pool.set_transport_factory(lambda default: RecordingTransport(store, default))
+        logger.warning(f"SportMonks RECORD mode: writing responses to {Config.SPORTMONKS_RECORD_DIR}")
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    engine = None
+    def do_GET(self):
+        url = urlsplit(self.path)
+        time.sleep(self.engine.delay())
+        status, payload = self.engine.respond(_endpoint(url.path), parse_qsl(url.query))
+        if status is None:
+            time.sleep(60)  # injected timeout: hold the connection past any client timeout
+            return
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, format, *args):
+        pass
+def run_replay_server(port=8765, directory=None):
+    """
+    Serves recordings over HTTP at /api/v2.0/..., for load tests against a running app
+    (set SPORTMONKS_BASE_URL=http://localhost:<port>/api/v2.0).
+    """
+    ReplayHandler.engine = engine_from_config(directory)
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    with socketserver.ThreadingTCPServer(("", port), ReplayHandler) as httpd:
+        print(f"Replaying SportMonks recordings at http://localhost:{port}{_API_PREFIX}")
+        logger.info(f"Replay server started on port {port}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            logger.info(f"Replay stats: {ReplayHandler.engine.get_stats()}")
+if __name__ == "__main__":
+    # python -m src.utils.sportmonks_replay [port] [recordings_dir]
+    run_replay_server(
+        port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765,
+        directory=sys.argv[2] if len(sys.argv) > 2 else None
+    )
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+AUTO = "auto"  # sportmonks_cric(ttl=AUTO): derive the TTL from the fixtures in the response
+# Seconds each fixture state stays fresh. Finished fixtures never change, so they only
+# leave the cache through LRU/size eviction.
+TTL_BY_STATE = {
+    "finished": 30 * 24 * 3600,
+    "abandoned": 6 * 3600,
+    "live": 5,
+    "break": 120,
+    "stumps": 900,
+    "starting_soon": 60,
+    "scheduled": 3 * 3600,
+    "unknown": 60
+}
+EMPTY_LISTING_TTL = 600
+# Listings are never refreshed faster than this; per-ball freshness comes from the fixture endpoints
+LISTING_MIN_TTL = 30
+_FINISHED = {"finished", "completed", "result"}
+_ABANDONED = {"aban.", "aban", "abandoned", "cancl.", "cancl", "cancelled", "canceled", "postp.", "postp", "postponed"}
+_SCHEDULED = {"ns", "upcoming", "scheduled", "not started"}
+def parse_start(starting_at):
+    """`starting_at` as an aware UTC datetime; SportMonks times are UTC, so a naive value is taken as UTC."""
+    text = str(starting_at or "").strip().replace("Z", "+00:00")
+    try:
+        start = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            start = datetime.strptime(text[:19], "%Y-%m-%dT%H:%M:%S")
+        except ValueError:
+            return None
+    return start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start.astimezone(timezone.utc)
+def fixture_state(fixture):
+    """Coarse state of a raw SportMonks fixture, from `status`, `winner_team_id` and `starting_at`."""
+    status = str(fixture.get("status") or "").strip().lower()
+    if status in _FINISHED:
+        return "finished"
+    if status in _ABANDONED:
+        return "abandoned"
+    if "stump" in status or "delay" in status or status.startswith("int"):
+        return "stumps"
+    if "break" in status or status in ("tea", "lunch", "dinner", "drinks"):
+        return "break"
+    if "inning" in status or "live" in status or fixture.get("live"):
+        return "live"
+    if fixture.get("winner_team_id") and status not in _SCHEDULED:
+        return "finished"
+    if status in _SCHEDULED:
+        start = parse_start(fixture.get("starting_at"))
+        # Within an hour of the start (or past it) the toss/start is close
+        if start and (start - datetime.now(timezone.utc)).total_seconds() < 3600:
+            return "starting_soon"
+        return "scheduled"
+    return "unknown"
+def ttl_for_fixture(fixture):
+    return TTL_BY_STATE[fixture_state(fixture)] if isinstance(fixture, dict) else TTL_BY_STATE["unknown"]
+def ttl_for_payload(data, default=None):
+    """
+    TTL for a SportMonks `data` payload: the fixture's own TTL, or the shortest TTL of any
+    fixture in a listing (one live match keeps the whole list short-lived, down to LISTING_MIN_TTL).
+    """
+    if isinstance(data, dict):
+        return ttl_for_fixture(data)
+    if isinstance(data, list) and data:
+        return max(LISTING_MIN_TTL, min(ttl_for_fixture(f) for f in data))
+    return default if default is not None else EMPTY_LISTING_TTL
@@ -26,6 +26,44 @@ logger = get_logger("app_main")
 class Config:
     DB_PATH = os.path.join("data", "cricket_data_v2.db")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    DB_NAME = os.getenv("DB_NAME", "cricket_db")
+    DB_USER = os.getenv("DB_USER", "postgres")
+    DB_PASSWORD = os.getenv("DB_PASSWORD", "1234")
+    DB_HOST = os.getenv("DB_HOST", "localhost")
+    DB_PORT = os.getenv("DB_PORT", "5432")
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+    DB_POOL_WAIT_SECONDS = float(os.getenv("DB_POOL_WAIT_SECONDS", "10"))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+    CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "64"))
+    CACHE_SWEEP_SECONDS = int(os.getenv("CACHE_SWEEP_SECONDS", "60"))
+    DISK_CACHE_PATH = os.getenv("DISK_CACHE_PATH")  # e.g. data/sportmonks_cache.db; unset disables the disk tier
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") == "1"
+    SPORTMONKS_RATE_PER_SEC = float(os.getenv("SPORTMONKS_RATE_PER_SEC", "2"))
+    SPORTMONKS_BURST = int(os.getenv("SPORTMONKS_BURST", "10"))
+    SPORTMONKS_HOURLY_QUOTA = int(os.getenv("SPORTMONKS_HOURLY_QUOTA", "3000"))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RECOVERY_SECONDS = float(os.getenv("BREAKER_RECOVERY_SECONDS", "15"))
+    BREAKER_MAX_RECOVERY_SECONDS = float(os.getenv("BREAKER_MAX_RECOVERY_SECONDS", "300"))
+    STALE_IF_ERROR_SECONDS = int(os.getenv("STALE_IF_ERROR_SECONDS", "1800"))
+    SPORTMONKS_BASE_URL = os.getenv("SPORTMONKS_BASE_URL", "https://cricket.sportmonks.com/api/v2.0")
+    # Offline benchmarking: record live responses to a directory, or replay them without network access
+    SPORTMONKS_RECORD_DIR = os.getenv("SPORTMONKS_RECORD_DIR")
+    SPORTMONKS_REPLAY_DIR = os.getenv("SPORTMONKS_REPLAY_DIR")
+    REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+    REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+    REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+    REPLAY_TIMEOUT_RATE = float(os.getenv("REPLAY_TIMEOUT_RATE", "0"))
+    REPLAY_LIVE_SPEED = float(os.getenv("REPLAY_LIVE_SPEED", "0"))  # balls per second; 0 serves recordings as-is
+    TODAY_BOARD_REFRESH_SECONDS = float(os.getenv("TODAY_BOARD_REFRESH_SECONDS", "10"))  # while a match is live
+    TODAY_BOARD_IDLE_SECONDS = float(os.getenv("TODAY_BOARD_IDLE_SECONDS", "60"))
+    LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "10"))  # shared /livescores poll while a match is live
+    LIVE_POLL_IDLE_SECONDS = float(os.getenv("LIVE_POLL_IDLE_SECONDS", "60"))
+    LIVE_POLL_MAX_SECONDS = float(os.getenv("LIVE_POLL_MAX_SECONDS", "900"))  # slowest poll (stumps, delays, backoff)
     @staticmethod
     def ensure_dirs():
         dirs = ["data", "fonts"]
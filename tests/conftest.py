@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+class FakeClock:
+    """Stands in for a module's `time`: monotonic/time only move when the test calls advance()."""
+    def __init__(self, start=1000.0):
+        self.now = start
+    def monotonic(self):
+        return self.now
+    def time(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+    def advance(self, seconds):
+        self.now += seconds
+@pytest.fixture
+def clock():
+    return FakeClock()
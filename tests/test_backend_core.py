@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from src.environment import backend_core, live_match_service
+class FakeSportMonks:
+    """Stands in for the HTTP layer: counts requests and holds each one open briefly so callers overlap."""
+    def __init__(self):
+        self.calls = []
+    async def request(self, endpoint, params, sm_key, priority=None):
+        self.calls.append((endpoint, dict(params)))
+        await asyncio.sleep(0.01)
+        data = {"id": 1, "status": "Finished", "include": params.get("include")}
+        for relation in (params.get("include") or "").split(","):
+            if relation: data[relation] = [{"id": 1}]
+        return {"ok": True, "data": data}
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("SPORTMONKS_API_KEY", "test")
+    monkeypatch.setattr(backend_core, "_DISK_CACHE", None)
+    backend_core._CACHE.clear()
+    fake = FakeSportMonks()
+    monkeypatch.setattr(backend_core, "_request_sportmonks", fake.request)
+    monkeypatch.setattr(live_match_service, "_live_request_with_retries", fake.request)
+    yield fake
+    backend_core._CACHE.clear()
+def test_coalesced_callers_store_once(api, monkeypatch):
+    stored = []
+    store = backend_core._store_result
+    monkeypatch.setattr(backend_core, "_store_result", lambda *args, **kwargs: stored.append(args[0]) or store(*args, **kwargs))
+    async def main():
+        return await asyncio.gather(*(backend_core.sportmonks_cric("/fixtures/1", {"include": "balls"}) for _ in range(5)))
+    results = asyncio.run(main())
+    assert all(r["ok"] for r in results)
+    assert len(api.calls) == 1 and len(stored) == 1
+def test_live_requests_do_not_join_cached_flights(api):
+    async def main():
+        return await asyncio.gather(
+            backend_core.sportmonks_cric("/livescores", {"include": "runs"}, use_cache=False),
+            live_match_service.sportmonks_live_request("/livescores", {"include": "runs"}),
+            live_match_service.sportmonks_live_request("/livescores", {"include": "runs"})
+        )
+    asyncio.run(main())
+    assert len(api.calls) == 2
+def test_include_subset_is_projected_from_cached_superset(api):
+    async def main():
+        full = await backend_core.sportmonks_cric("/fixtures/5", {"include": "balls,runs"}, ttl=60)
+        stats = backend_core._CACHE.get_stats()
+        subset = await backend_core.sportmonks_cric("/fixtures/5", {"include": "runs"}, ttl=60)
+        return full, stats, subset
+    full, before, subset = asyncio.run(main())
+    assert len(api.calls) == 1
+    assert set(full["data"]) == {"id", "status", "include", "balls", "runs"}
+    assert set(subset["data"]) == {"id", "status", "include", "runs"}
+    after = backend_core._CACHE.get_stats()
+    # One miss for the exact key, one hit for the superset; no extra miss from probing
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
@@ -0,0 +1,82 @@
+from src.utils.ball_events import BallEvent, BallColumns, columns_from_sportmonks, max_overs_for
+from src.environment.ball_event_store import BallEventStore
+def _ball(id, ball, runs=0, scoreboard="S1", wicket=False, extras=None, batsman="A Batter"):
+    score = {"runs": runs, "is_wicket": wicket, **(extras or {})}
+    return {"id": id, "ball": ball, "scoreboard": scoreboard, "score": score, "batsman_id": 10, "bowler_id": 20, "batsman": {"fullname": batsman}, "bowler": {"fullname": "A Bowler"}}
+def test_from_sportmonks():
+    event = BallEvent.from_sportmonks(_ball(7, 14.3, runs=1, scoreboard="S2", extras={"wide": 1, "bye": 2}))
+    assert (event.innings, event.over, event.ball, event.runs, event.extras) == (2, 14, 3, 1, 3)
+    assert event.key == (2, 14, 3, 7)
+    assert BallEvent.from_sportmonks({"over": 3, "ball": 2, "score": 6}).kind == "six"
+    assert BallEvent.from_sportmonks({"ball": 0.1, "score": 0, "batsmanout_id": 5}).symbol() == "W"
+def test_phase_totals_t20():
+    balls = [_ball(1, 0.1, 4), _ball(2, 5.6, 1, extras={"wide": 1}), _ball(3, 6.1, 0, wicket=True), _ball(4, 14.6, 6), _ball(5, 15.1, 2), _ball(6, 19.6, 1, wicket=True), _ball(7, 0.1, 3, scoreboard="S2")]
+    cols = columns_from_sportmonks(balls)
+    totals = cols.phase_totals(20, innings=1)
+    assert totals["powerplay"] == {"runs": 6, "wickets": 0, "balls": 2, "run_rate": 18.0}
+    assert totals["middle"] == {"runs": 6, "wickets": 1, "balls": 2, "run_rate": 18.0}
+    assert totals["death"] == {"runs": 3, "wickets": 1, "balls": 2, "run_rate": 9.0}
+    assert cols.phase_totals(20)["powerplay"]["balls"] == 3
+    assert cols.phase_totals(20, innings=3)["death"] == {"runs": 0, "wickets": 0, "balls": 0, "run_rate": 0.0}
+    assert cols.phase_totals(max_overs_for("Test/5day")) == {}
+def test_columns_round_trip():
+    cols = BallColumns()
+    cols.append(BallEvent(1, 2, 3, runs=4, batter="No Id", bowler_id=20, bowler="A Bowler", event_id=99))
+    event = cols.event(0)
+    assert (event.batter_id, event.batter, event.bowler_id, event.bowler, event.event_id) == (None, "No Id", 20, "A Bowler", 99)
+    assert cols.event(0).to_dict()["description"] == "2.3: No Id - 4 runs (FOUR!)"
+    assert cols.nbytes() < 64
+def test_ingest_skips_seen_balls():
+    store = BallEventStore(1)
+    balls = [_ball(1, 0.1, 1), _ball(2, 0.2, 4), _ball(3, 0.3, 0)]
+    assert store.ingest(balls) == 3
+    assert store.ingest(balls) == 0
+    balls += [_ball(4, 0.4, 6), _ball(5, 0.5, 0, wicket=True)]
+    assert store.ingest(balls) == 2
+    assert store.total_balls == 5
+    assert [e["type"] for e in store.key_events()] == ["wicket", "six", "four"]
+def test_ingest_keeps_repeated_ball_numbers_with_new_ids():
+    store = BallEventStore(1)
+    assert store.ingest([_ball(1, 0.1, 1), _ball(2, 0.2, 0, extras={"wide": 1}), _ball(3, 0.2, 2)]) == 3
+    over = store.recent_overs(1)[0]
+    assert (over["over_number"], over["total_runs"], len(over["balls"])) == (0, 3, 3)
+def test_ingest_ignores_malformed_balls():
+    store = BallEventStore(1)
+    assert store.ingest([_ball(1, 0.1, 1), {"ball": "x"}, _ball(2, 0.2, 1)]) == 2
+    assert store.ingest([]) == 0
+def test_commentary_shape():
+    store = BallEventStore(1)
+    store.ingest([_ball(1, 0.1, 1), _ball(2, 1.1, 4, batsman="B Batter")])
+    view = store.commentary()
+    assert view["current_over"] == 1
+    assert [o["over_number"] for o in view["recent_overs"]] == [1, 0]
+    assert view["last_over"][0]["batsman"] == "B Batter"
+def test_ingest_out_of_order_and_resent_balls():
+    store = BallEventStore(1)
+    assert store.ingest([_ball(3, 1.1, 4), _ball(1, 0.1, 1), _ball(3, 1.1, 4)]) == 2
+    # An older ball arriving late (with a re-sent one) is still added, after skipping the seen tail
+    assert store.ingest([_ball(1, 0.1, 1), _ball(2, 0.2, 6), _ball(3, 1.1, 4)]) == 1
+    assert store.total_balls == 3
+    assert [o["over_number"] for o in store.recent_overs()] == [1, 0]
+    assert [b["ball"] for b in store.recent_overs()[1]["balls"]] == [1, 2]
+    assert [e["type"] for e in store.key_events()] == ["four", "six"]
+def test_ingest_late_over_keeps_innings_order():
+    store = BallEventStore(1)
+    store.ingest([_ball(5, 0.1, 0, scoreboard="S2"), _ball(1, 19.6, 0)])
+    store.ingest([_ball(4, 19.5, 4), _ball(3, 18.1, 0)])
+    assert [(o["innings"], o["over_number"]) for o in store.recent_overs()] == [(2, 0), (1, 19), (1, 18)]
+    assert [b["ball"] for b in store.recent_overs()[1]["balls"]] == [5, 6]
+def test_columns_clamp_and_reject_without_diverging():
+    cols = BallColumns()
+    cols.append(BallEvent(1, 0, 1, runs=300, extras=200))
+    assert (cols.runs[0], cols.extras[0]) == (127, 127)
+    try:
+        cols.append(BallEvent(1, 0, 2, runs=1, event_id=2**70))
+    except OverflowError:
+        pass
+    assert {len(getattr(cols, c)) for c in BallColumns._COLUMNS} == {1}
+def test_ingest_skips_unstorable_ball():
+    store = BallEventStore(1)
+    assert store.ingest([_ball(1, 0.1, 1), _ball(2**70, 0.2, 4), _ball(3, 0.3, 6)]) == 2
+    assert store.total_balls == 2
+    assert [e["type"] for e in store.key_events()] == ["six"]
@@ -0,0 +1,68 @@
+import random
+import pytest
+from src.utils import circuit_breaker
+from src.utils.circuit_breaker import CircuitBreaker, BreakerRegistry, backoff_delay, CLOSED, OPEN, HALF_OPEN
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda a, b: (a + b) / 2)
+    return CircuitBreaker("/fixtures/{id}", failure_threshold=3, recovery_timeout=10.0, max_recovery=25.0)
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(10.0)
+    assert breaker.get_status()["short_circuited"] == 1
+def test_half_open_allows_limited_probes(breaker, clock):
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+def test_successful_probe_closes(breaker, clock):
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.get_status()["consecutive_failures"] == 0
+    _trip(breaker)
+    assert breaker.retry_in() == pytest.approx(10.0)
+def test_failed_probe_reopens_for_longer_up_to_cap(breaker, clock):
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == pytest.approx(20.0)
+    clock.advance(20)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.retry_in() == pytest.approx(25.0)
+    assert breaker.get_status()["opened"] == 3
+def test_release_returns_probe_slot(breaker, clock):
+    _trip(breaker)
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+def test_registry_shares_settings_per_family():
+    registry = BreakerRegistry(failure_threshold=2)
+    assert registry.get("/fixtures/{id}") is registry.get("/fixtures/{id}")
+    assert registry.get("/teams").failure_threshold == 2
+    assert set(registry.get_status()) == {"/fixtures/{id}", "/teams"}
+def test_backoff_delay_bounds():
+    random.seed(7)
+    for attempt, low, high in ((0, 0.25, 0.5), (1, 0.5, 1.0), (10, 4.0, 8.0)):
+        assert all(low <= backoff_delay(attempt) <= high for _ in range(50))
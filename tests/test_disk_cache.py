@@ -0,0 +1,44 @@
+import sqlite3
+import pytest
+from src.utils import disk_cache
+from src.utils.disk_cache import DiskCache
+@pytest.fixture
+def cache(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(disk_cache, "time", clock)
+    return DiskCache(str(tmp_path / "cache" / "responses.db"))
+def _rows(cache):
+    return sqlite3.connect(cache.path).execute("SELECT key FROM responses ORDER BY key").fetchall()
+def test_round_trip_with_age(cache, clock):
+    cache.set("k", {"data": [1, 2]}, ttl=60)
+    clock.advance(5)
+    assert cache.get("k", 60) == ({"data": [1, 2]}, 5)
+def test_get_misses_past_requested_ttl(cache, clock):
+    cache.set("k", [1], ttl=60)
+    clock.advance(30)
+    assert cache.get("k", 30) is None
+    assert cache.get("k", 31) == ([1], 30)
+    assert cache.get_stats()["misses"] == 1
+def test_shared_between_instances(cache, clock):
+    cache.set("k", "v", ttl=60)
+    other = DiskCache(cache.path)
+    assert other.get("k", 60) == ("v", 0)
+def test_purge_removes_only_expired(cache, clock):
+    cache.set("short", 1, ttl=10)
+    cache.set("long", 2, ttl=100)
+    clock.advance(11)
+    assert cache.purge_expired() == 1
+    assert _rows(cache) == [("long",)]
+def test_writes_trigger_periodic_purge(cache, clock, monkeypatch):
+    monkeypatch.setattr(DiskCache, "PURGE_EVERY", 3)
+    cache.set("old", 1, ttl=1)
+    clock.advance(2)
+    cache.set("a", 1, ttl=60)
+    assert len(_rows(cache)) == 2
+    cache.set("b", 1, ttl=60)
+    assert _rows(cache) == [("a",), ("b",)]
+def test_corrupt_value_counts_as_error(cache, clock):
+    conn = sqlite3.connect(cache.path)
+    conn.execute("INSERT INTO responses (key, stored_at, expires_at, value) VALUES ('bad', ?, ?, ?)", (clock.now, clock.now + 60, b"not zlib"))
+    conn.commit()
+    assert cache.get("bad", 60) is None
+    assert cache.get_stats()["errors"] == 1
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from src.utils.ttl_policy import LISTING_MIN_TTL
+from src.environment import backend_core, fixture_tiles
+from src.environment.fixture_tiles import get_fixtures_between, tile_ttl
+class FakeSportMonks:
+    """Answers /fixtures starts_between pulls with one finished fixture per day, recording each span."""
+    def __init__(self, fail=False):
+        self.spans = []
+        self.fail = fail
+    async def pages(self, endpoint, params, per_page=100, priority=None):
+        first, last = params["filter[starts_between]"].split(",")
+        self.spans.append((first, last))
+        if self.fail:
+            yield {"ok": False, "error": "timeout", "status": 504}
+            return
+        days = fixture_tiles._days(first, last)
+        yield {"ok": True, "data": [{"id": i, "status": "Finished", "starting_at": f"{day}T10:00:00.000000Z"} for i, day in enumerate(days)]}
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(backend_core, "_DISK_CACHE", None)
+    backend_core._CACHE.clear()
+    fake = FakeSportMonks()
+    monkeypatch.setattr(fixture_tiles, "iter_sportmonks_pages", fake.pages)
+    yield fake
+    backend_core._CACHE.clear()
+def _get(start, end, **kwargs):
+    return asyncio.run(get_fixtures_between(start, end, includes="localteam", **kwargs))
+def test_cold_range_is_one_request(api):
+    res = _get("2020-03-01", "2020-03-05")
+    assert api.spans == [("2020-03-01", "2020-03-05")]
+    assert res["ok"] and res["tiles_fetched"] == 5 and len(res["data"]) == 5
+    assert _get("2020-03-02", "2020-03-04")["tiles_fetched"] == 0
+    assert len(api.spans) == 1
+def test_only_missing_span_is_fetched(api):
+    _get("2020-03-03", "2020-03-04")
+    res = _get("2020-03-01", "2020-03-06")
+    assert api.spans[-1] == ("2020-03-01", "2020-03-06")
+    _get("2020-04-01", "2020-04-02")
+    _get("2020-04-05", "2020-04-06")
+    res = _get("2020-04-01", "2020-04-06")
+    assert api.spans[-1] == ("2020-04-03", "2020-04-04")
+    assert res["tiles_fetched"] == 2
+    assert [f["starting_at"][:10] for f in res["data"]] == fixture_tiles._days("2020-04-01", "2020-04-06")
+def test_reversed_bounds_and_descending_sort(api):
+    res = _get("2020-03-03", "2020-03-01", sort="-starting_at")
+    assert api.spans == [("2020-03-01", "2020-03-03")]
+    assert [f["starting_at"][:10] for f in res["data"]] == ["2020-03-03", "2020-03-02", "2020-03-01"]
+def test_failed_fetch_serves_cached_tiles(api):
+    _get("2020-03-01", "2020-03-02")
+    api.fail = True
+    res = _get("2020-03-01", "2020-03-04")
+    assert res["ok"] and res["partial"]
+    assert len(res["data"]) == 2
+    assert _get("2020-05-01", "2020-05-02") == {"ok": False, "error": "timeout", "status": 504, "data": []}
+def test_tile_ttl_by_distance():
+    today = datetime.now().date()
+    day = lambda offset: (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+    assert tile_ttl(day(-5), []) == 7 * 24 * 3600
+    assert tile_ttl(day(-1), []) == 3600
+    assert tile_ttl(day(0), []) == 300
+    assert tile_ttl(day(3), []) == 3 * 3600
+    assert tile_ttl(day(30), []) == 12 * 3600
+    assert tile_ttl(day(0), [{"status": "1st Innings"}]) == LISTING_MIN_TTL
@@ -0,0 +1,55 @@
+import sqlite3
+import pytest
+from src.core.fuzzy_lookup import sqlite_lookup, sqlite_resolve, name_score
+from src.core.db_migrations import run_archive_migrations
+TEAMS = [(1, "Mumbai Indians", "MI"), (2, "Chennai Super Kings", "CSK"), (3, "Sunrisers Hyderabad", "SRH"), (4, "Sunrisers Eastern Cape", "SEC"), (5, "India", "IND")]
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "archive.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE teams (id INTEGER PRIMARY KEY, name TEXT, code TEXT)")
+    conn.executemany("INSERT INTO teams VALUES (?, ?, ?)", TEAMS)
+    conn.commit()
+    yield path, conn
+    conn.close()
+def _schema(conn):
+    return sorted(r[0] for r in conn.execute("SELECT name FROM sqlite_master"))
+def test_lookup_before_migration_only_reads(archive):
+    path, conn = archive
+    schema = _schema(conn)
+    assert sqlite_lookup(conn, "team", "Mumbai")[0]["name"] == "Mumbai Indians"
+    assert sqlite_lookup(conn, "team", "Mumbay Indians") == []
+    assert _schema(conn) == schema
+    assert conn.total_changes == len(TEAMS)
+def test_lookup_after_migration(archive):
+    path, conn = archive
+    assert run_archive_migrations(["archive_fts"], path=path) == {"archive_fts": "ok"}
+    schema = _schema(conn)
+    assert sqlite_resolve(conn, "team", "Mumbay Indians")["id"] == 1
+    assert sqlite_resolve(conn, "team", "csk")["name"] == "Chennai Super Kings"
+    assert sqlite_resolve(conn, "team", "india")["id"] == 5
+    assert sqlite_resolve(conn, "team", "Sunrisers") is None
+    assert sqlite_resolve(conn, "team", "zz") is None
+    assert _schema(conn) == schema
+def test_triggers_keep_index_current(archive):
+    path, conn = archive
+    run_archive_migrations(path=path)
+    conn.execute("INSERT INTO teams VALUES (6, 'Rajasthan Royals', 'RR')")
+    conn.execute("UPDATE teams SET name = 'Mumbai Indians Women' WHERE id = 1")
+    conn.execute("INSERT OR REPLACE INTO teams VALUES (2, 'Chennai Super Kings XI', 'CSK')")
+    conn.execute("DELETE FROM teams WHERE id = 4")
+    conn.commit()
+    assert sqlite_lookup(conn, "team", "Rajasthan Royal")[0]["id"] == 6
+    assert sqlite_lookup(conn, "team", "Mumbai Indians Women")[0]["id"] == 1
+    assert [r["id"] for r in sqlite_lookup(conn, "team", "Chennai Super Kings XI")] == [2]
+    assert all(r["id"] != 4 for r in sqlite_lookup(conn, "team", "Sunrisers Eastern Cape"))
+    base = conn.execute("SELECT count(*) FROM teams").fetchone()[0]
+    assert conn.execute("SELECT count(*) FROM teams_name_fts").fetchone()[0] == base
+def test_migration_skips_missing_tables_and_archive(archive, tmp_path):
+    path, conn = archive
+    run_archive_migrations(path=path)
+    assert "players_name_fts" not in _schema(conn)
+    assert run_archive_migrations(path=str(tmp_path / "missing.db"))["archive_fts"].startswith("skipped")
+def test_name_score_ranks_exact_over_partial():
+    assert name_score("India", "India") == 1.0
+    assert name_score("India", "India A") > name_score("India", "West Indies")
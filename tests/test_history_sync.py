@@ -0,0 +1,78 @@
+import asyncio
+from contextlib import contextmanager
+import pytest
+from src.environment import history_service
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def execute(self, sql, params=None):
+        if "INSERT INTO fixtures" in sql and params[0] in self.pool.bad_ids:
+            raise ValueError("bad row")
+        self.pool.statements.append(sql.strip().split()[0:3])
+class FakeConn:
+    def __init__(self, pool):
+        self.pool = pool
+    def cursor(self, **kwargs):
+        return FakeCursor(self.pool)
+    def commit(self):
+        self.pool.commits += 1
+class FakePool:
+    """Counts checkouts and how many connections are out at any moment."""
+    def __init__(self):
+        self.checkouts = self.held = self.commits = 0
+        self.statements = []
+        self.bad_ids = set()
+    @contextmanager
+    def connection(self, statement_timeout_ms=None):
+        self.checkouts += 1
+        self.held += 1
+        try:
+            yield FakeConn(self)
+        finally:
+            self.held -= 1
+def _fixture(id, status="Finished", note=""):
+    return {"id": id, "season_id": 1, "status": status, "note": note, "localteam": {"id": 1, "name": "India"}, "visitorteam": {"id": 2, "name": "Australia"}}
+@pytest.fixture
+def sync(monkeypatch):
+    pool = FakePool()
+    pages = []
+    held_while_fetching = []
+    async def iter_pages(endpoint, params, per_page=100, priority=None):
+        for page in pages:
+            held_while_fetching.append(pool.held)
+            await asyncio.sleep(0)
+            yield page
+    monkeypatch.setattr(history_service, "db_pool", pool)
+    monkeypatch.setattr(history_service, "schema_state", lambda conn=None: {"present": {}})
+    monkeypatch.setattr(history_service, "iter_sportmonks_pages", iter_pages)
+    return pool, pages, held_while_fetching
+def test_one_connection_per_page_released_between_pages(sync):
+    pool, pages, held_while_fetching = sync
+    pages += [
+        {"ok": True, "page": 1, "data": [_fixture(1), _fixture(2, status="NS")]},
+        {"ok": True, "page": 2, "data": [_fixture(3, status="2nd Innings", note="India won by 5 runs")]},
+        {"ok": True, "page": 3, "data": [_fixture(4, status="NS")]}
+    ]
+    result = asyncio.run(history_service.sync_recent_finished_matches(days_back=2))
+    assert result == {"status": "success", "updated": 2, "skipped": 2, "complete": True, "derived_failed": 0}
+    assert pool.checkouts == 2 and pool.commits == 2
+    assert held_while_fetching == [0, 0, 0] and pool.held == 0
+def test_bad_row_is_skipped_within_its_page(sync):
+    pool, pages, _ = sync
+    pool.bad_ids.add(2)
+    pages.append({"ok": True, "page": 1, "data": [_fixture(1), _fixture(2), _fixture(3)]})
+    result = asyncio.run(history_service.sync_recent_finished_matches())
+    assert result["updated"] == 2
+    assert ["ROLLBACK", "TO", "SAVEPOINT"] in pool.statements
+def test_failed_page_stops_sync(sync):
+    pool, pages, _ = sync
+    pages += [{"ok": True, "page": 1, "data": [_fixture(1)]}, {"ok": False, "page": 2, "error": "timeout"}]
+    result = asyncio.run(history_service.sync_recent_finished_matches())
+    assert (result["updated"], result["complete"]) == (1, False)
+    pages[:] = [{"ok": False, "page": 1, "error": "unauthorized"}]
+    assert asyncio.run(history_service.sync_recent_finished_matches()) == {"status": "error", "message": "unauthorized"}
+    assert pool.held == 0
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+from src.environment.live_poller import Subscription
+class FakePoller:
+    def unsubscribe(self, sub):
+        pass
+def test_thread_consumer_drops_oldest():
+    sub = Subscription(FakePoller(), maxsize=2)
+    for i in range(3):
+        sub.put({"n": i})
+    assert [sub.get(0)["n"], sub.get(0)["n"], sub.get(0)] == [1, 2, None]
+    assert sub.dropped == 1
+def test_aget_receives_events_from_another_thread():
+    sub = Subscription(FakePoller(), maxsize=3)
+    sub.put({"n": 0})
+    async def main():
+        first = await sub.aget(timeout=1)
+        threading.Timer(0.02, sub.put, ({"n": 1},)).start()
+        second = await sub.aget(timeout=1)
+        # A burst while the consumer is busy keeps only the newest `maxsize` events
+        threading.Thread(target=lambda: [sub.put({"n": i}) for i in range(2, 7)]).start()
+        await asyncio.sleep(0.05)
+        rest = [await sub.aget(timeout=0.01) for _ in range(4)]
+        return first, second, rest
+    first, second, rest = asyncio.run(main())
+    assert (first["n"], second["n"]) == (0, 1)
+    assert [e and e["n"] for e in rest] == [4, 5, 6, None]
+    assert sub.dropped == 2
+def test_aget_times_out_without_an_executor():
+    sub = Subscription(FakePoller())
+    async def main():
+        loop = asyncio.get_running_loop()
+        def no_executor(*args):
+            raise AssertionError("aget must not use an executor")
+        loop.run_in_executor = no_executor
+        return await sub.aget(timeout=0.01)
+    assert asyncio.run(main()) is None
@@ -0,0 +1,72 @@
+import json
+import asyncio
+from src.environment.live_state import LiveMatchState, match_view, normalize_status_live
+from src.environment.live_match_service import _normalize_live_match_data
+from src.agents import ai_core
+def _ball(id, ball, runs=0, wicket=False, scoreboard="S2"):
+    return {"id": id, "ball": ball, "scoreboard": scoreboard, "score": {"runs": runs, "is_wicket": wicket}, "batsman": {"fullname": "Steve Smith"}}
+def _fixture(**overrides):
+    fixture = {
+        "id": 501, "status": "2nd Innings", "type": "T20I", "note": "", "starting_at": "2024-06-01T14:00:00.000000Z",
+        "localteam_id": 1, "localteam": {"id": 1, "name": "India"}, "visitorteam": {"id": 2, "name": "Australia"},
+        "venue": {"name": "Eden Gardens"},
+        "runs": [{"team_id": 1, "inning": 1, "score": 180, "wickets": 6, "overs": 20}, {"team_id": 2, "inning": 2, "score": 100, "wickets": 3, "overs": 12.2}],
+        "batting": [
+            {"player_id": 11, "score": 45, "ball": 30, "rate": 150, "active": True, "player": {"fullname": "Steve Smith"}},
+            {"player_id": 12, "score": 20, "ball": 15, "rate": 133, "active": False, "player": {"fullname": "Glenn Maxwell"}},
+            {"player_id": 13, "score": 10, "ball": 12, "bowling_player_id": 21, "player": {"fullname": "Travis Head"}}
+        ],
+        "bowling": [{"player_id": 21, "overs": 3, "runs": 20, "wickets": 1, "active": True, "player": {"fullname": "Jasprit Bumrah"}}],
+        "lineup": [{"id": 21, "fullname": "Jasprit Bumrah"}],
+        "balls": [_ball(1, 11.5, 1), _ball(2, 11.6, 0, wicket=True), _ball(3, 12.1, 4), _ball(4, 12.2, 6)]
+    }
+    fixture.update(overrides)
+    return fixture
+def test_normalize_keeps_state_and_defers_rendering():
+    match = _normalize_live_match_data(_fixture())
+    state = match["state"]
+    assert isinstance(state, LiveMatchState)
+    assert "score_string" not in match
+    assert state._score_string is None
+    assert (match["status"], match["is_live"], match["current_batting"]) == ("LIVE", True, "Australia")
+    live = match["live_state"]
+    assert (live["target"], live["runs_needed"], live["balls_remaining"], live["required_run_rate"]) == (181, 81, 46, 10.57)
+    assert live["partnership"] == {"runs": 10, "balls": 2, "estimated": False}
+    assert live["recent_balls"] == ["1", "W", "4", "6"]
+    assert live["bowler"]["name"] == "Jasprit Bumrah"
+def test_match_view_renders_once_for_printing():
+    match = _normalize_live_match_data(_fixture())
+    view = match_view(match)
+    assert "state" not in view and "state" in match
+    assert view["score_string"].startswith("Match Date: 2024-06-01T14:00:00.000000Z | India: 180/6 (20) | Australia: 100/3 (12.2)")
+    assert "Need 81 from 46 balls (RRR 10.57)" in view["score_string"]
+    assert match_view(match)["score_string"] is view["score_string"]
+    json.dumps({k: v for k, v in view.items() if k != "raw_data"})
+def test_status_from_note_and_finished():
+    assert normalize_status_live("Innings Break") == "Innings Break"
+    match = _normalize_live_match_data(_fixture(status="NS", note="Tea Break", balls=[]))
+    assert (match["status"], match["is_live"]) == ("Tea Break", True)
+    assert match["live_state"]["partnership"]["estimated"] is True
+    match = _normalize_live_match_data(_fixture(status="Finished", winner_team_id=1))
+    assert (match["status"], match["is_live"]) == ("Finished", False)
+def test_live_prediction_uses_each_teams_first_innings(monkeypatch):
+    async def predict_winner(team_a, team_b, **kwargs):
+        return {"team_a_prob": 50.0, "team_b_prob": 50.0, "reasons": []}
+    monkeypatch.setattr(ai_core, "predict_winner", predict_winner)
+    runs = [
+        {"team_id": 1, "inning": 1, "score": 300, "wickets": 10, "overs": 100},
+        {"team_id": 2, "inning": 2, "score": 250, "wickets": 10, "overs": 90},
+        {"team_id": 1, "inning": 3, "score": 60, "wickets": 1, "overs": 10}
+    ]
+    match = match_view(_normalize_live_match_data(_fixture(type="Test/5day", runs=runs, balls=[])))
+    result = asyncio.run(ai_core.predict_live_match(match))
+    assert result["narrative"].endswith("Live adjust: CRR 3.0.")
+    match.pop("live_state")
+    assert asyncio.run(ai_core.predict_live_match(match))["narrative"] == result["narrative"]
+def test_live_details_commentary_is_latest_balls_newest_first():
+    from src.environment.live_match_service import get_live_match_details
+    balls = [{"id": i, "ball": over + n / 10, "scoreboard": "S1", "score": {"runs": 1}, "batsman": {"fullname": "A Batter"}} for i, (over, n) in enumerate(((o, b) for o in range(4) for b in range(1, 7)), 1)]
+    bundle = {"scorecard": {"data": {"name": "A vs B", "status": "1st Innings", "scorecard": []}}, "commentary": {"data": {"balls": balls}}, "info": {}}
+    details = asyncio.run(get_live_match_details(9901, bundle=bundle))
+    assert len(details["commentary"]) == 15
+    assert details["commentary"][0].startswith("3.6:") and details["commentary"][-1].startswith("1.4:")
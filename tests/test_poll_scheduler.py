@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.environment.poll_scheduler import PollScheduler, match_phase, POLL_INTERVALS
+class FakeLimiter:
+    def __init__(self, pressure=0.0):
+        self.value = pressure
+    def pressure(self):
+        return self.value
+def _live(id=1, overs="5.2", max_overs=20, runs=None):
+    return {"id": id, "status": "LIVE", "runs": runs or [{"score": 40, "overs": overs}], "live_state": {"max_overs": max_overs}}
+def _upcoming(id=2, minutes=0):
+    start = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return {"id": id, "status": "NS", "raw_data": {"starting_at": start.strftime("%Y-%m-%dT%H:%M:%S.000000Z")}}
+def test_match_phase():
+    assert match_phase({"status": "Finished"}) == "finished"
+    assert match_phase({"status": "Innings Break"}) == "break"
+    assert match_phase({"status": "Delayed"}) == "delayed"
+    assert match_phase(_live()) == "live"
+    assert match_phase(_live(overs="16.1")) == "death"
+    assert match_phase(_live(runs=[{"score": 180, "overs": "20"}, {"score": 160, "overs": "10.0"}])) == "death"
+    assert match_phase(_live(overs="45", max_overs=0)) == "live"
+    assert match_phase(_upcoming(minutes=20)) == "starting_soon"
+    assert match_phase(_upcoming(minutes=120)) == "scheduled"
+def test_next_poll_follows_most_urgent_fixture():
+    scheduler = PollScheduler(limiter=FakeLimiter())
+    scheduler.observe([_upcoming(2, minutes=120), {"id": 3, "status": "Stumps"}], now=100.0)
+    assert scheduler.next_delay(now=100.0) == POLL_INTERVALS["scheduled"]
+    scheduler.observe([_upcoming(2, minutes=120), {"id": 4, "status": "Drinks"}], now=100.0)
+    assert scheduler.next_delay(now=110.0) == POLL_INTERVALS["drinks"] - 10
+    assert scheduler.phases() == {2: "scheduled", 4: "drinks"}
+def test_finished_fixtures_drop_out():
+    scheduler = PollScheduler(idle_interval=60.0, limiter=FakeLimiter())
+    scheduler.observe([{"id": 1, "status": "Finished"}], now=100.0)
+    assert scheduler.phases() == {}
+    assert scheduler.next_delay(now=100.0) == 60.0
+    assert scheduler.cycle() == 60.0
+def test_delay_never_below_one_second():
+    scheduler = PollScheduler(limiter=FakeLimiter())
+    scheduler.observe([_live()], now=100.0)
+    assert scheduler.next_delay(now=1000.0) == 1.0
+def test_limiter_pressure_stretches_intervals():
+    limiter = FakeLimiter(0.5)
+    scheduler = PollScheduler(intervals={"break": 100}, max_backoff=8.0, limiter=limiter)
+    scheduler.observe([{"id": 1, "status": "Tea Break"}], now=0.0)
+    assert scheduler.next_delay(now=0.0) == 100
+    limiter.value = 0.75
+    assert scheduler.backoff() == pytest.approx(4.5)
+    limiter.value = 1.0
+    assert scheduler.next_delay(now=0.0) == 800
+def test_failures_double_backoff_until_next_success():
+    scheduler = PollScheduler(intervals={"break": 100}, max_interval=900.0, limiter=FakeLimiter())
+    scheduler.observe([{"id": 1, "status": "Lunch"}], now=0.0)
+    scheduler.record_failure()
+    assert scheduler.next_delay(now=50.0) == 200
+    scheduler.record_failure()
+    scheduler.record_failure()
+    scheduler.record_failure()
+    assert scheduler.backoff() == 8.0
+    assert scheduler.next_delay(now=50.0) == 800
+    scheduler.observe([{"id": 1, "status": "Lunch"}], now=50.0)
+    assert scheduler.backoff() == 1.0
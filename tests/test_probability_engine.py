@@ -0,0 +1,37 @@
+import sqlite3
+import pytest
+from src.core import probability_engine
+from src.core.db_migrations import run_archive_migrations
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    path = str(tmp_path / "archive.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE teams (id INTEGER PRIMARY KEY, name TEXT, code TEXT)")
+    conn.execute("CREATE TABLE venues (id INTEGER PRIMARY KEY, name TEXT, city TEXT)")
+    conn.execute("CREATE TABLE fixtures (id INTEGER PRIMARY KEY, name TEXT, season_id INTEGER, venue_id INTEGER, localteam_id INTEGER, visitorteam_id INTEGER, winner_team_id INTEGER, starting_at TEXT)")
+    conn.executemany("INSERT INTO teams VALUES (?, ?, ?)", [(1, "Mumbai Indians", "MI"), (2, "Chennai Super Kings", "CSK")])
+    conn.execute("INSERT INTO venues VALUES (7, 'Wankhede Stadium', 'Mumbai')")
+    conn.executemany("INSERT INTO fixtures VALUES (?, NULL, 1, 7, ?, ?, ?, ?)", [(10, 1, 2, 1, "2023-04-01"), (11, 2, 1, 2, "2023-05-01"), (12, 1, 2, 1, "2024-04-01")])
+    conn.commit()
+    monkeypatch.setattr(probability_engine, "DB_PATH", path)
+    yield path, conn
+    conn.close()
+def _indexes(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_fixtures_%'")}
+def test_requests_run_no_ddl(archive):
+    path, conn = archive
+    assert probability_engine.get_head_to_head_stats(1, 2) == {"total": 3, "wins_a": 2, "wins_b": 1}
+    assert _indexes(conn) == set()
+def test_migration_builds_indexes_used_by_queries(archive):
+    path, conn = archive
+    assert run_archive_migrations(["archive_indexes"], path=path) == {"archive_indexes": "ok"}
+    assert _indexes(conn) == {"idx_fixtures_teams_date", "idx_fixtures_venue_date", "idx_fixtures_season_date"}
+    plan = " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN SELECT winner_team_id FROM fixtures WHERE localteam_id = 1 AND visitorteam_id = 2"))
+    assert "idx_fixtures_teams_date" in plan
+    assert run_archive_migrations(["archive_indexes"], path=path) == {"archive_indexes": "ok"}
+def test_prediction_from_archive(archive):
+    path, conn = archive
+    run_archive_migrations(path=path)
+    assert probability_engine.get_venue_win_rate(1, "Wankhede") == pytest.approx(66.67)
+    result = probability_engine.generate_prediction("mi", "Chennai Super Kings", "Mumbai")
+    assert result["ok"] and result["prediction"]["winner"] == "Mumbai Indians"
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter, endpoint_family, PRIORITY_INTERACTIVE, PRIORITY_LIVE, PRIORITY_BACKGROUND
+@pytest.fixture
+def limiter(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return RateLimiter(rate_per_sec=1.0, burst=10, hourly_quota=0)
+def _drain(limiter, priority):
+    taken = 0
+    while limiter.try_acquire(priority) == 0:
+        taken += 1
+    return taken
+def test_interactive_can_use_whole_bucket(limiter):
+    assert _drain(limiter, PRIORITY_INTERACTIVE) == 10
+def test_lower_lanes_leave_a_reserve(limiter):
+    assert _drain(limiter, PRIORITY_BACKGROUND) == 5
+    assert _drain(limiter, PRIORITY_LIVE) == 3
+    assert _drain(limiter, PRIORITY_INTERACTIVE) == 2
+def test_wait_covers_lane_reserve(limiter):
+    _drain(limiter, PRIORITY_BACKGROUND)
+    assert limiter.try_acquire(PRIORITY_BACKGROUND) == pytest.approx(1.0)
+def test_refill_over_time(limiter, clock):
+    _drain(limiter, PRIORITY_INTERACTIVE)
+    clock.advance(3)
+    assert _drain(limiter, PRIORITY_INTERACTIVE) == 3
+def test_lanes_back_off_at_their_quota_share(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    limiter = RateLimiter(rate_per_sec=100.0, burst=100, hourly_quota=10)
+    for _ in range(7):
+        limiter.record("/fixtures/1")
+    assert limiter.try_acquire(PRIORITY_BACKGROUND) > 0
+    assert limiter.try_acquire(PRIORITY_LIVE) == 0
+    limiter.record("/fixtures/2")
+    limiter.record("/fixtures/3")
+    assert limiter.try_acquire(PRIORITY_LIVE) > 0
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) == 0
+    clock.advance(3600)
+    assert limiter.try_acquire(PRIORITY_BACKGROUND) == 0
+def test_penalize_pauses_every_lane(limiter, clock):
+    limiter.penalize(retry_after="30")
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) == pytest.approx(30)
+    assert limiter.pressure() == 1.0
+    clock.advance(30)
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) == 0
+def test_acquire_gives_up_past_max_wait(limiter):
+    _drain(limiter, PRIORITY_BACKGROUND)
+    assert asyncio.run(limiter.acquire(PRIORITY_BACKGROUND, "/fixtures/1", max_wait=0.5)) is False
+    assert asyncio.run(limiter.acquire(PRIORITY_INTERACTIVE, "/fixtures/1", max_wait=0.5)) is True
+    assert limiter.get_quota_status()["by_endpoint"] == {"/fixtures/{id}": 1}
+def test_endpoint_family():
+    assert endpoint_family("/fixtures/123?include=balls") == "/fixtures/{id}"
+    assert endpoint_family("/teams/9/squad/2024") == "/teams/{id}/squad/{id}"
+    assert endpoint_family(None) == ""
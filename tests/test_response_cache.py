@@ -0,0 +1,77 @@
+import pytest
+from src.utils import response_cache
+from src.utils.response_cache import ResponseCache
+@pytest.fixture
+def cache(clock, monkeypatch):
+    monkeypatch.setattr(response_cache, "time", clock)
+    return ResponseCache(max_entries=3, max_bytes=10_000, sweep_interval=0)
+def test_get_within_ttl(cache, clock):
+    cache.set("a", {"v": 1}, ttl=10)
+    clock.advance(9)
+    assert cache.get("a") == {"v": 1}
+def test_expired_entry_is_dropped(cache, clock):
+    cache.set("a", {"v": 1}, ttl=10)
+    clock.advance(10)
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.get_stats()["expired"] == 1
+def test_shorter_max_age_misses_but_keeps_entry(cache, clock):
+    cache.set("a", {"v": 1}, ttl=100)
+    clock.advance(30)
+    assert cache.get_with_age("a", 20) is None
+    assert "a" in cache
+    assert cache.get_with_age("a") == ({"v": 1}, 30)
+def test_set_with_age_backdates_entry(cache, clock):
+    cache.set("a", [1], ttl=10, age=8)
+    assert cache.get_with_age("a") == ([1], 8)
+    clock.advance(2)
+    assert cache.get("a") is None
+def test_lru_eviction_by_entry_count(cache):
+    for key in ("a", "b", "c"):
+        cache.set(key, key, ttl=60)
+    cache.get("a")
+    cache.set("d", "d", ttl=60)
+    assert "b" not in cache
+    assert all(k in cache for k in ("a", "c", "d"))
+    assert cache.get_stats()["evictions"] == 1
+def test_eviction_by_byte_budget(clock, monkeypatch):
+    monkeypatch.setattr(response_cache, "time", clock)
+    cache = ResponseCache(max_entries=100, max_bytes=250, sweep_interval=0)
+    cache.set("a", "x" * 100, ttl=60)
+    cache.set("b", "x" * 100, ttl=60)
+    cache.set("c", "x" * 100, ttl=60)
+    assert "a" not in cache and len(cache) == 2
+    assert cache.get_stats()["bytes"] <= 250
+def test_oversized_entry_is_rejected(cache):
+    cache.set("big", "x" * 20_000, ttl=60)
+    assert "big" not in cache
+    assert cache.get_stats()["rejected"] == 1
+def test_overwrite_replaces_size(cache):
+    cache.set("a", "x" * 100, ttl=60)
+    cache.set("a", "x", ttl=60)
+    assert len(cache) == 1
+    assert cache.get_stats()["bytes"] == len('"x"')
+def test_sweep_removes_only_expired(cache, clock):
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=50)
+    clock.advance(10)
+    assert cache.sweep() == 1
+    assert "short" not in cache and "long" in cache
+def test_hit_rate(cache):
+    cache.set("a", 1, ttl=60)
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+def test_peek_does_not_count_or_reorder(cache, clock):
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=60)
+    clock.advance(5)
+    assert cache.peek("a") == (1, 5) and cache.peek("missing") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
+    cache.set("c", 3, ttl=60)
+    cache.set("d", 4, ttl=60)
+    assert "a" not in cache and "b" in cache
+    clock.advance(10)
+    assert cache.peek("b") == (2, 15) and cache.peek("c") == (3, 10)
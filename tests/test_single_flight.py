@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from src.utils.single_flight import SingleFlight
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    calls = []
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "v"
+    async def main():
+        return await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+    assert asyncio.run(main()) == ["v"] * 5
+    assert len(calls) == 1
+    stats = flight.get_stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    async def main():
+        return await asyncio.gather(flight.run("a", lambda: asyncio.sleep(0, "a")), flight.run("b", lambda: asyncio.sleep(0, "b")))
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.get_stats()["leaders"] == 2
+def test_finished_call_is_not_cached():
+    flight = SingleFlight()
+    calls = []
+    async def work():
+        calls.append(1)
+        return len(calls)
+    async def main():
+        return await flight.run("k", work), await flight.run("k", work)
+    assert asyncio.run(main()) == (1, 2)
+def test_error_reaches_every_caller():
+    flight = SingleFlight()
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    async def main():
+        return await asyncio.gather(*(flight.run("k", fail) for _ in range(3)), return_exceptions=True)
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert flight.in_flight() == 0
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    calls = []
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "v"
+    async def main():
+        leader = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+    assert asyncio.run(main()) == "v"
+    assert len(calls) == 2
+    assert flight.get_stats()["retried"] == 1
+def test_cancelled_follower_leaves_others_running():
+    flight = SingleFlight()
+    async def work():
+        await asyncio.sleep(0.02)
+        return "v"
+    async def main():
+        leader = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        quitter = asyncio.ensure_future(flight.run("k", work))
+        other = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0)
+        quitter.cancel()
+        return await leader, await other, quitter.cancelled()
+    assert asyncio.run(main()) == ("v", "v", True)
@@ -0,0 +1,29 @@
+import copy
+from src.utils import sportmonks_replay
+from src.utils.sportmonks_replay import LiveSimulator
+def _ball(ball, runs=0, scoreboard="S1", wicket=False, **extras):
+    return {"ball": ball, "scoreboard": scoreboard, "team_id": 1 if scoreboard == "S1" else 2, "score": {"runs": runs, "is_wicket": wicket, **extras}}
+def test_balls_are_revealed_over_time_with_wides_counted(clock, monkeypatch):
+    monkeypatch.setattr(sportmonks_replay, "time", clock)
+    fixture = {"id": 1, "status": "Finished", "balls": [_ball(0.1, 4), _ball(0.2, 0, wide=1), _ball(0.2, 1, wicket=True), _ball(0.1, 6, scoreboard="S2")]}
+    sim = LiveSimulator(speed=1.0)
+    payload = sim.apply({"data": copy.deepcopy(fixture)})
+    assert payload["data"]["balls"] == [] and payload["data"]["live"] is True
+    clock.advance(3)
+    data = sim.apply({"data": copy.deepcopy(fixture)})["data"]
+    assert data["runs"] == [{"team_id": 1, "inning": 1, "score": 6, "wickets": 1, "overs": 0.2}]
+    assert data["status"] == "1st Innings"
+    clock.advance(5)
+    assert sim.apply({"data": copy.deepcopy(fixture)})["data"]["status"] == "Finished"
+def test_livescores_without_balls_advance_from_runs(clock, monkeypatch):
+    monkeypatch.setattr(sportmonks_replay, "time", clock)
+    runs = [{"team_id": 2, "inning": 2, "score": 100, "wickets": 4, "overs": 10}, {"team_id": 1, "inning": 1, "score": 180, "wickets": 6, "overs": 20}]
+    sim = LiveSimulator(speed=1.0, start_ball=120)
+    data = sim.apply({"data": [{"id": 7, "status": "Finished", "runs": copy.deepcopy(runs)}]})["data"][0]
+    assert [(r["inning"], r["score"], r["overs"]) for r in data["runs"]] == [(1, 180, 20), (2, 0, 0.0)]
+    clock.advance(33)
+    data = sim.apply({"data": [{"id": 7, "status": "Finished", "runs": copy.deepcopy(runs)}]})["data"][0]
+    assert data["runs"][1] == {"team_id": 2, "inning": 2, "score": 55, "wickets": 2, "overs": 5.3}
+    assert (data["live"], data["status"]) == (True, "2nd Innings")
+    clock.advance(60)
+    assert sim.apply({"data": [{"id": 7, "status": "Finished", "runs": copy.deepcopy(runs)}]})["data"][0]["status"] == "Finished"